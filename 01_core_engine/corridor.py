@@ -0,0 +1,208 @@
+# corridor.py
+import numpy as np
+
+from signal_plan import SignalPlanSolver
+
+
+class Corridor:
+    """Green-wave offsets for a chain of signals along one arterial.
+
+    The corridor is a path of intersections joined by links with a length
+    (metres) and progression speed (km/h) per direction. All signals run a
+    common cycle; each has an arterial green time and an offset relative
+    to the first signal.
+
+    Bandwidth is evaluated on a time grid of ``step`` seconds: a departure
+    time is in the band if a vehicle leaving then at progression speed
+    meets green at every signal. Offsets are found by coordinate descent in
+    which every candidate offset of a signal is scored at once as a
+    (candidates x departure times) boolean matrix. When one intersection's
+    counts change only its split is recomputed and the search is re-run
+    around it, starting from the current offsets.
+    """
+
+    def __init__(self, intersection_ids, links, cycle=90.0, step=1.0, inbound_weight=1.0,
+                 arterial_phase=0, solver=None):
+        self.intersection_ids = list(intersection_ids)
+        self.index = {intersection_id: i for i, intersection_id in enumerate(self.intersection_ids)}
+        self.cycle = float(cycle)
+        self.step = step
+        self.inbound_weight = inbound_weight
+        self.arterial_phase = arterial_phase
+        self.solver = solver or SignalPlanSolver()
+
+        n = len(self.intersection_ids)
+        self.link_length = np.zeros(max(n - 1, 0))
+        self.outbound_speed = np.zeros(max(n - 1, 0))
+        self.inbound_speed = np.zeros(max(n - 1, 0))
+        self._set_links(links)
+
+        self.green = np.full(n, self.cycle / 2)  # arterial green per signal
+        self.offset = np.zeros(n)
+
+        self.times = np.arange(0.0, self.cycle, step)
+        self.candidates = self.times  # candidate offsets share the time grid
+        self._travel_times()
+        self.offset = self._ideal_offsets()
+
+    def _set_links(self, links):
+        """``links``: (from_id, to_id, length_m, speed_kmh[, inbound_speed_kmh]) between neighbours"""
+        seen = set()
+        for link in links:
+            from_id, to_id, length, speed = link[:4]
+            inbound = link[4] if len(link) > 4 else speed
+            a, b = self.index[from_id], self.index[to_id]
+            if abs(a - b) != 1:
+                raise ValueError(f"Link {from_id} -> {to_id} does not join neighbouring corridor signals")
+            k = min(a, b)
+            self.link_length[k] = length
+            self.outbound_speed[k], self.inbound_speed[k] = (speed, inbound) if a < b else (inbound, speed)
+            seen.add(k)
+        if len(seen) != len(self.link_length):
+            raise ValueError("Every pair of neighbouring signals needs a link")
+
+    def _travel_times(self):
+        """Cumulative travel time from the first (outbound) and last (inbound) signal"""
+        out_legs = self.link_length / (self.outbound_speed / 3.6)
+        in_legs = self.link_length / (self.inbound_speed / 3.6)
+        self.outbound_time = np.concatenate([[0.0], np.cumsum(out_legs)])
+        self.inbound_time = np.concatenate([np.cumsum(in_legs[::-1])[::-1], [0.0]])
+
+    def _ideal_offsets(self):
+        return np.mod(self.outbound_time, self.cycle)
+
+    # Bandwidth -----------------------------------------------------------
+
+    def _passes(self, node, offsets):
+        """(len(offsets), len(times)) green hits at ``node`` for each candidate offset, both directions"""
+        offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 1)
+        out_arrival = self.times + self.outbound_time[node]
+        in_arrival = self.times + self.inbound_time[node]
+        out_hit = np.mod(out_arrival - offsets, self.cycle) < self.green[node]
+        in_hit = np.mod(in_arrival - offsets, self.cycle) < self.green[node]
+        return out_hit, in_hit
+
+    def _all_passes(self):
+        out_hits, in_hits = zip(*(self._passes(i, [self.offset[i]]) for i in range(len(self.offset))))
+        return np.vstack(out_hits), np.vstack(in_hits)
+
+    def bandwidth(self):
+        """(outbound, inbound) through-band in seconds per cycle"""
+        out_hits, in_hits = self._all_passes()
+        return (float(out_hits.all(axis=0).sum() * self.step),
+                float(in_hits.all(axis=0).sum() * self.step))
+
+    def _score(self, outbound, inbound):
+        return outbound + self.inbound_weight * inbound
+
+    # Search ----------------------------------------------------------------
+
+    def _descend(self, nodes, max_sweeps=10):
+        """Coordinate descent over ``nodes``; returns the number of offsets changed"""
+        out_hits, in_hits = self._all_passes()
+        changed = 0
+        for _ in range(max_sweeps):
+            improved = False
+            for node in nodes:
+                others = np.ones(len(self.offset), dtype=bool)
+                others[node] = False
+                out_rest = out_hits[others].all(axis=0)
+                in_rest = in_hits[others].all(axis=0)
+
+                out_cand, in_cand = self._passes(node, self.candidates)
+                scores = self._score((out_cand & out_rest).sum(axis=1), (in_cand & in_rest).sum(axis=1))
+                current = self._score((out_hits[node] & out_rest).sum(), (in_hits[node] & in_rest).sum())
+                best = int(np.argmax(scores))
+                if scores[best] > current:
+                    self.offset[node] = self.candidates[best]
+                    out_hits[node], in_hits[node] = out_cand[best], in_cand[best]
+                    improved = True
+                    changed += 1
+            if not improved:
+                break
+        return changed
+
+    def optimize(self, starts=None):
+        """Full re-solve from several starting offset patterns; keeps the best"""
+        if starts is None:
+            starts = [
+                self._ideal_offsets(),                               # outbound progression
+                np.mod(self.inbound_time, self.cycle),               # inbound progression
+                np.mod(np.arange(len(self.offset)) % 2 * self.cycle / 2, self.cycle),  # alternating
+            ]
+        best_offset, best_score = None, -1.0
+        for start in starts:
+            self.offset = np.mod(np.asarray(start, dtype=np.float64), self.cycle)
+            self.offset -= self.offset[0]   # first signal is the reference
+            self.offset = np.mod(np.round(self.offset / self.step) * self.step, self.cycle)
+            self._descend(range(1, len(self.offset)))
+            score = self._score(*self.bandwidth())
+            if score > best_score:
+                best_offset, best_score = self.offset.copy(), score
+        self.offset = best_offset
+        return self.get_plan()
+
+    def set_green(self, intersection_id, green):
+        """Change one signal's arterial green and re-optimize offsets around it"""
+        node = self.index[intersection_id]
+        self.green[node] = min(max(float(green), 0.0), self.cycle)
+        return self.reoptimize(node)
+
+    def update_counts(self, intersection_id, phase_pcu, phase_mask=None, radius=2):
+        """New PCU counts for one signal: re-split it at the corridor cycle, then re-optimize locally"""
+        node = self.index[intersection_id]
+        plan = self.solver.solve(phase_pcu, phase_mask, fixed_cycle=self.cycle)
+        green = plan['green'][0, self.arterial_phase]
+        # Slack left by green bounds goes to the arterial so the cycle stays common
+        green += self.cycle - plan['cycle'][0]
+        self.green[node] = min(max(float(green), 0.0), self.cycle)
+        return self.reoptimize(node, radius)
+
+    def set_all_counts(self, phase_pcu, phase_mask=None):
+        """Split every signal from an (intersections, phases) PCU array and re-solve the corridor"""
+        plan = self.solver.solve(phase_pcu, phase_mask, fixed_cycle=self.cycle)
+        green = plan['green'][:, self.arterial_phase] + (self.cycle - plan['cycle'])
+        self.green = np.clip(green.astype(np.float64), 0.0, self.cycle)
+        return self.optimize()
+
+    def reoptimize(self, node, radius=2):
+        """Incremental update: descend on the changed signal and its neighbours, then one global sweep"""
+        lo, hi = max(node - radius, 1), min(node + radius, len(self.offset) - 1)
+        changed = self._descend(range(lo, hi + 1))
+        changed += self._descend(range(1, len(self.offset)), max_sweeps=1)
+        plan = self.get_plan()
+        plan['offsets_changed'] = changed
+        return plan
+
+    def get_plan(self):
+        outbound, inbound = self.bandwidth()
+        return {
+            'cycle': self.cycle,
+            'outbound_bandwidth': outbound,
+            'inbound_bandwidth': inbound,
+            'signals': [
+                {'intersection_id': intersection_id, 'offset': float(offset), 'arterial_green': float(green)}
+                for intersection_id, offset, green in zip(self.intersection_ids, self.offset, self.green)
+            ]
+        }
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(1)
+    ids = [f'J{i:02d}' for i in range(15)]
+    links = [(ids[i], ids[i + 1], float(rng.uniform(200, 600)), 40.0) for i in range(len(ids) - 1)]
+    corridor = Corridor(ids, links, cycle=90)
+    corridor.set_all_counts(rng.uniform(5, 40, size=(len(ids), 4)))
+
+    started = time.perf_counter()
+    plan = corridor.optimize()
+    print(f"Full solve: {(time.perf_counter() - started) * 1000:.1f}ms, "
+          f"bandwidth out/in {plan['outbound_bandwidth']:.0f}s/{plan['inbound_bandwidth']:.0f}s")
+
+    started = time.perf_counter()
+    plan = corridor.update_counts('J07', [[60, 5, 5, 5]])
+    print(f"Incremental: {(time.perf_counter() - started) * 1000:.1f}ms, "
+          f"bandwidth out/in {plan['outbound_bandwidth']:.0f}s/{plan['inbound_bandwidth']:.0f}s, "
+          f"{plan['offsets_changed']} offsets changed")
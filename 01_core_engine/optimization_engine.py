@@ -1,66 +1,184 @@
 ﻿# optimization_engine.py
+import time
 from datetime import datetime
 
+import numpy as np
+
+from optimization_history import OptimizationHistory
+from time_profiles import DEFAULT_ROW, SLOTS_PER_HOUR, get_profiles
+
+BASE_GREEN_TIME = 30  # seconds
+MIN_GREEN_TIME = 10
+MAX_GREEN_TIME = 60
+HIGH_VOLUME_THRESHOLD = 40
+
+# Congestion levels as integer codes for columnar batches; -1 = unknown
+CONGESTION_LEVELS = ('low', 'medium', 'high', 'severe')
+CONGESTION_CODES = {level: code for code, level in enumerate(CONGESTION_LEVELS)}
+# Indexed by code; the trailing entry is what code -1 (unknown) picks up
+CONGESTION_FACTORS = np.array([0.8, 1.0, 1.3, 1.6, 1.0])
+CONGESTED_CODES = np.array([False, False, True, True, False])
+
+# Optimization reasons as bit flags
+REASON_HIGH_VOLUME = 1
+REASON_CONGESTION = 2
+REASON_RUSH_HOUR = 4
+REASON_LABELS = (
+    (REASON_HIGH_VOLUME, 'high vehicle volume'),
+    (REASON_CONGESTION, 'congestion detected'),
+    (REASON_RUSH_HOUR, 'rush hour adjustment'),
+)
+
+
+def _reason_text(mask):
+    reasons = [label for flag, label in REASON_LABELS if mask & flag]
+    return ' + '.join(reasons) if reasons else 'normal traffic conditions'
+
+
+# Every possible bitmask rendered once
+REASON_TEXT = [_reason_text(mask) for mask in range(1 << len(REASON_LABELS))]
+
+
+def encode_congestion(levels):
+    """Congestion level names -> int8 codes (-1 for unknown levels)"""
+    return np.array([CONGESTION_CODES.get(level, -1) for level in levels], dtype=np.int8)
+
+
+def render_reasons(reason_codes):
+    """Reason bitmasks -> the human-readable strings optimize_intersection reports"""
+    return [REASON_TEXT[code] for code in np.asarray(reason_codes).tolist()]
+
+
 class TrafficOptimizer:
-    def __init__(self):
-        self.optimization_history = []
+    def __init__(self, history_size=1000, history_dir=None, profiles=None, forecaster=None):
+        # Last ``history_size`` decisions per intersection; older ones spill to history_dir
+        self.optimization_history = OptimizationHistory(capacity=history_size, spill_dir=history_dir)
+        # Time-of-day factors and rush hours per intersection
+        self.profiles = profiles or get_profiles()
+        # Optional next-interval forecaster (e.g. the training engine's PredictionService)
+        self.forecaster = forecaster
     
-    def calculate_optimal_green_time(self, intersection_data):
-        base_green_time = 30  # seconds
-        
-        # Factor 1: Vehicle count
-        vehicle_factor = intersection_data['vehicle_count'] / 50
-        
-        # Factor 2: Congestion level
-        congestion_factors = {
-            'low': 0.8,
-            'medium': 1.0, 
-            'high': 1.3,
-            'severe': 1.6
-        }
-        congestion_factor = congestion_factors.get(
-            intersection_data['congestion_level'], 1.0
-        )
+    def _planned_counts(self, intersection_ids, vehicle_counts, now):
+        """Counts to plan against: the forecast where available, else the observation"""
+        if self.forecaster is None or intersection_ids is None:
+            return vehicle_counts
+        self.forecaster.observe_many(intersection_ids, now or datetime.now(), vehicle_counts)
+        forecast = self.forecaster.forecast_many(intersection_ids)
+        return np.where(np.isnan(forecast), vehicle_counts, forecast)
+    
+    def optimize_many(self, vehicle_counts, congestion_codes, hours=None, now=None, intersection_ids=None):
+        """Green times for a whole batch of intersections in one vectorized pass.
         
-        # Factor 3: Time of day
-        current_hour = datetime.now().hour
-        if current_hour in [7, 8, 9, 16, 17, 18]:
-            time_factor = 1.2
+        Inputs are columns: vehicle counts, congestion codes (see
+        ``encode_congestion``) and optionally the hour of day per row.
+        Time factors come from each intersection's time-of-day profile at
+        ``now`` (default: the cached current slot); explicit ``hours`` use
+        the default profile at the start of each hour. Returns
+        ``{'green_time': int array, 'reasons': uint8 bitmask array}``;
+        use ``render_reasons`` to turn the masks into strings. Passing
+        ``intersection_ids`` records the batch in the optimization history
+        and, with a forecaster, plans against the next-interval forecast
+        (``planned_vehicle_count`` in the result) instead of the counts.
+        """
+        vehicle_counts = np.asarray(vehicle_counts, dtype=np.float64)
+        congestion_codes = np.asarray(congestion_codes, dtype=np.int64)
+        day, slot = self.profiles.current_slot() if now is None else self.profiles.slot_of(now)
+        if hours is not None:
+            rows, slot = DEFAULT_ROW, (np.asarray(hours, dtype=np.int64) % 24) * SLOTS_PER_HOUR
+        elif intersection_ids is not None:
+            rows = self.profiles.rows_for(intersection_ids)
         else:
-            time_factor = 0.9
+            rows = DEFAULT_ROW
+        time_factor, rush_hour = self.profiles.lookup_many(rows, day, slot)
         
-        # Calculate optimal green time
-        optimal_green = base_green_time * vehicle_factor * congestion_factor * time_factor
-        optimal_green = max(10, min(60, optimal_green))
+        planned_counts = self._planned_counts(intersection_ids, vehicle_counts, now)
+        green_time, reasons = self._decide(planned_counts, congestion_codes, time_factor, rush_hour)
+        result = {'green_time': green_time, 'reasons': reasons, 'planned_vehicle_count': planned_counts}
+        if intersection_ids is not None:
+            self.optimization_history.append_many(
+                intersection_ids, now.timestamp() if now else time.time(), vehicle_counts, congestion_codes,
+                result['green_time'], result['reasons']
+            )
+        return result
+    
+    @staticmethod
+    def _decide(vehicle_counts, congestion_codes, time_factor, rush_hour):
+        # Factor 1: Vehicle count / Factor 2: Congestion level / Factor 3: Time of day
+        vehicle_factor = vehicle_counts / 50
+        congestion_factor = CONGESTION_FACTORS[congestion_codes]
+        # Profiles are float32; round so 1.2 stays 1.2 in float64
+        time_factor = np.round(np.asarray(time_factor, dtype=np.float64), 4)
+        
+        optimal_green = BASE_GREEN_TIME * vehicle_factor * congestion_factor * time_factor
+        green_time = np.round(np.clip(optimal_green, MIN_GREEN_TIME, MAX_GREEN_TIME)).astype(np.int64)
         
-        return round(optimal_green)
+        reasons = np.where(vehicle_counts > HIGH_VOLUME_THRESHOLD, REASON_HIGH_VOLUME, 0)
+        reasons |= np.where(CONGESTED_CODES[congestion_codes], REASON_CONGESTION, 0)
+        reasons |= np.where(rush_hour, REASON_RUSH_HOUR, 0)
+        return green_time, np.broadcast_to(reasons, green_time.shape).astype(np.uint8)
+    
+    def _optimize_one(self, intersection_data, now, intersection_id=None):
+        green_time, reasons = self._decide(
+            np.array([intersection_data['vehicle_count']], dtype=np.float64),
+            encode_congestion([intersection_data['congestion_level']]),
+            *self.profiles.lookup(intersection_id, now)
+        )
+        return int(green_time[0]), int(reasons[0])
+    
+    def calculate_optimal_green_time(self, intersection_data, now=None, intersection_id=None):
+        return self._optimize_one(intersection_data, now, intersection_id)[0]
     
     def optimize_intersection(self, intersection_id, current_traffic):
-        optimal_green = self.calculate_optimal_green_time(current_traffic)
+        now = datetime.now()
+        planned_count = float(self._planned_counts(
+            [intersection_id], np.array([current_traffic['vehicle_count']], dtype=np.float64), now)[0])
+        optimal_green, reasons = self._optimize_one(
+            dict(current_traffic, vehicle_count=planned_count), now, intersection_id)
         
         optimization_result = {
             'intersection_id': intersection_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'current_vehicle_count': current_traffic['vehicle_count'],
+            'planned_vehicle_count': planned_count,
             'current_congestion': current_traffic['congestion_level'],
             'recommended_green_time': optimal_green,
-            'optimization_reason': self.get_optimization_reason(current_traffic, optimal_green)
+            'optimization_reason': REASON_TEXT[reasons]
         }
         
-        self.optimization_history.append(optimization_result)
+        self.optimization_history.append(
+            intersection_id, now.timestamp(), current_traffic['vehicle_count'],
+            CONGESTION_CODES.get(current_traffic['congestion_level'], -1), optimal_green, reasons
+        )
         return optimization_result
     
-    def get_optimization_reason(self, traffic_data, green_time):
-        reasons = []
-        
-        if traffic_data['vehicle_count'] > 40:
-            reasons.append('high vehicle volume')
-        if traffic_data['congestion_level'] in ['high', 'severe']:
-            reasons.append('congestion detected')
-        if datetime.now().hour in [7, 8, 9, 16, 17, 18]:
-            reasons.append('rush hour adjustment')
-            
-        return ' + '.join(reasons) if reasons else 'normal traffic conditions'
+    def get_optimization_reason(self, traffic_data, green_time, now=None, intersection_id=None):
+        return REASON_TEXT[self._optimize_one(traffic_data, now, intersection_id)[1]]
+    
+    def get_history(self, intersection_id=None, start=None, end=None):
+        """Past decisions as optimize_intersection-style dicts; start/end are datetimes"""
+        rows = self.optimization_history.query(
+            intersection_id,
+            start=start.timestamp() if start else None,
+            end=end.timestamp() if end else None
+        )
+        congestion = [CONGESTION_LEVELS[code] if code >= 0 else 'unknown' for code in rows['congestion'].tolist()]
+        return [
+            {
+                'intersection_id': intersection,
+                'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
+                'current_vehicle_count': vehicle_count,
+                'current_congestion': level,
+                'recommended_green_time': green_time,
+                'optimization_reason': reason
+            }
+            for intersection, timestamp, vehicle_count, level, green_time, reason in zip(
+                rows['intersection_id'].tolist(), rows['timestamp'].tolist(), rows['vehicle_count'].tolist(),
+                congestion, rows['green_time'].tolist(), render_reasons(rows['reasons']))
+        ]
+    
+    def close(self):
+        """Write history rows still waiting for a full segment (also runs at interpreter exit)"""
+        self.optimization_history.close()
 
 if __name__ == '__main__':
     # Test the optimizer
@@ -71,3 +189,16 @@ if __name__ == '__main__':
     }
     result = optimizer.optimize_intersection('test_intersection', test_traffic)
     print('Optimization Result:', result)
+    
+    # City-wide batch
+    import time
+    rng = np.random.default_rng(0)
+    n = 10000
+    started = time.perf_counter()
+    batch = optimizer.optimize_many(
+        rng.integers(0, 120, n),
+        rng.integers(0, len(CONGESTION_LEVELS), n),
+        rng.integers(0, 24, n)
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f'Batch of {n} intersections: {elapsed_ms:.2f}ms, first reasons:', render_reasons(batch['reasons'][:3]))
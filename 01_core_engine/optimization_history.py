@@ -0,0 +1,294 @@
+# optimization_history.py
+import atexit
+import glob
+import os
+import threading
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# One optimization decision per row
+HISTORY_COLUMNS = {
+    'timestamp': np.float64,      # unix seconds
+    'vehicle_count': np.int32,
+    'congestion': np.int8,        # congestion code, -1 = unknown
+    'green_time': np.int16,
+    'reasons': np.uint8,          # reason bitmask
+}
+
+
+def _empty_columns(size=0):
+    return {name: np.empty(size, dtype=dtype) for name, dtype in HISTORY_COLUMNS.items()}
+
+
+class _Ring:
+    """Fixed-capacity columnar ring buffer for one intersection"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = _empty_columns(capacity)
+        self.head = 0  # next write position
+        self.size = 0
+
+    def append(self, row):
+        """Store ``row`` and return the row it overwrote (None while not yet full)"""
+        evicted = None
+        if self.size == self.capacity:
+            evicted = {name: column[self.head] for name, column in self.columns.items()}
+        for name, column in self.columns.items():
+            column[self.head] = row[name]
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return evicted
+
+    def ordered(self):
+        """Columns oldest-first"""
+        if self.size < self.capacity:
+            return {name: column[:self.size].copy() for name, column in self.columns.items()}
+        order = np.roll(np.arange(self.capacity), -self.head)
+        return {name: column[order] for name, column in self.columns.items()}
+
+
+class OptimizationHistory:
+    """Bounded, queryable record of optimizer decisions.
+
+    Each intersection keeps its last ``capacity`` decisions in a columnar
+    ring buffer. With a ``spill_dir``, rows pushed out of a ring are
+    collected and written as immutable segment files (Arrow IPC when
+    pyarrow is installed, ``.npz`` otherwise) once ``segment_rows`` have
+    accumulated, so the full history survives without growing memory.
+    Queries by intersection and time range read the rings and only the
+    segments whose time span overlaps the range.
+
+    Segment files are written outside the lock, so appenders never wait
+    on disk I/O. Rows still below a full segment are written by
+    ``flush()``, which runs at interpreter exit (or on ``close()``).
+    """
+
+    def __init__(self, capacity=1000, spill_dir=None, segment_rows=10000):
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.segment_rows = segment_rows
+        self._rings = {}
+        self._spill_ids = []
+        self._spill_rows = []
+        self._segments = []  # (path, min_ts, max_ts)
+        self._writing = []   # (seq, ids, columns) detached from _spill_rows, segment not written yet
+        self._next_segment = 0
+        self._lock = threading.Lock()
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._segments = [self._segment_span(path) for path in self._segment_paths()]
+            self._next_segment = max((self._segment_seq(path) for path, _, _ in self._segments), default=-1) + 1
+            atexit.register(self.flush)
+
+    def append(self, intersection_id, timestamp, vehicle_count, congestion, green_time, reasons):
+        row = {
+            'timestamp': timestamp,
+            'vehicle_count': vehicle_count,
+            'congestion': congestion,
+            'green_time': green_time,
+            'reasons': reasons
+        }
+        with self._lock:
+            self._append(intersection_id, row)
+            pending = self._take_spill()
+        self._spill(pending)
+
+    def append_many(self, intersection_ids, timestamp, vehicle_counts, congestion, green_times, reasons):
+        """Record one batch (e.g. an optimize_many result); ``timestamp`` may be a scalar"""
+        n = len(intersection_ids)
+        columns = {
+            'timestamp': np.broadcast_to(np.asarray(timestamp, dtype=np.float64), (n,)),
+            'vehicle_count': np.asarray(vehicle_counts),
+            'congestion': np.asarray(congestion),
+            'green_time': np.asarray(green_times),
+            'reasons': np.asarray(reasons)
+        }
+        with self._lock:
+            for i, intersection_id in enumerate(intersection_ids):
+                self._append(intersection_id, {name: column[i] for name, column in columns.items()})
+            pending = self._take_spill()
+        self._spill(pending)
+
+    def _append(self, intersection_id, row):
+        ring = self._rings.get(intersection_id)
+        if ring is None:
+            ring = self._rings[intersection_id] = _Ring(self.capacity)
+        evicted = ring.append(row)
+        if evicted is not None and self.spill_dir:
+            self._spill_ids.append(str(intersection_id))
+            self._spill_rows.append(evicted)
+
+    def _take_spill(self, force=False):
+        """Detach a segment's worth of evicted rows for writing (lock held); None if not due"""
+        if not self._spill_rows or not (force or len(self._spill_rows) >= self.segment_rows):
+            return None
+        columns = {name: np.array([row[name] for row in self._spill_rows], dtype=dtype)
+                   for name, dtype in HISTORY_COLUMNS.items()}
+        pending = (self._next_segment, np.array(self._spill_ids), columns)
+        self._next_segment += 1
+        self._writing.append(pending)
+        self._spill_ids = []
+        self._spill_rows = []
+        return pending
+
+    def _spill(self, pending):
+        """Write a detached segment without holding the lock, then hand it to queries"""
+        if pending is None:
+            return
+        seq, ids, columns = pending
+        try:
+            segment = self._write_segment(seq, ids, columns)
+        except Exception:
+            with self._lock:
+                # Keep the rows pending so the next flush() retries them
+                self._writing = [entry for entry in self._writing if entry[0] != seq]
+                self._spill_ids = list(ids) + self._spill_ids
+                self._spill_rows = [{name: column[i] for name, column in columns.items()}
+                                    for i in range(len(ids))] + self._spill_rows
+            raise
+        with self._lock:
+            self._writing = [entry for entry in self._writing if entry[0] != seq]
+            self._segments.append(segment)
+
+    def flush(self):
+        """Write any evicted rows that have not reached a full segment yet"""
+        with self._lock:
+            pending = self._take_spill(force=True)
+        self._spill(pending)
+
+    def close(self):
+        """Flush and stop the exit hook (e.g. when the owning optimizer shuts down)"""
+        if self.spill_dir:
+            self.flush()
+            atexit.unregister(self.flush)
+
+    # Segment files -------------------------------------------------------
+
+    def _segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.spill_dir, 'history-*.arrow')) +
+                      glob.glob(os.path.join(self.spill_dir, 'history-*.npz')))
+
+    @staticmethod
+    def _segment_span(path):
+        # history-<seq>-<min_ms>-<max_ms>.<ext>
+        _, _, min_ms, max_ms = os.path.splitext(os.path.basename(path))[0].split('-')
+        return path, int(min_ms) / 1000, int(max_ms) / 1000
+
+    @staticmethod
+    def _segment_seq(path):
+        return int(os.path.basename(path).split('-')[1])
+
+    def _write_segment(self, seq, intersection_ids, columns):
+        """Write one segment file and return its (path, min_ts, max_ts)"""
+        timestamps = columns['timestamp']
+        min_ms = int(np.floor(timestamps.min() * 1000))
+        max_ms = int(np.ceil(timestamps.max() * 1000))
+        stem = os.path.join(self.spill_dir, f"history-{seq:06d}-{min_ms}-{max_ms}")
+
+        if PYARROW_AVAILABLE:
+            path = stem + '.arrow'
+            table = pa.table({'intersection_id': intersection_ids.astype(str), **columns})
+            with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            path = stem + '.npz'
+            np.savez(path, intersection_id=intersection_ids.astype(str), **columns)
+        return path, min_ms / 1000, max_ms / 1000
+
+    @staticmethod
+    def _read_segment(path):
+        if path.endswith('.arrow'):
+            with pa.memory_map(path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            ids = np.array(table.column('intersection_id').to_pylist())
+            return ids, {name: table.column(name).to_numpy() for name in HISTORY_COLUMNS}
+        with np.load(path) as data:
+            return data['intersection_id'], {name: data[name] for name in HISTORY_COLUMNS}
+
+    # Queries -------------------------------------------------------------
+
+    def query(self, intersection_id=None, start=None, end=None, include_spilled=True):
+        """Decisions in ``[start, end]`` (unix seconds), oldest first.
+
+        Returns ``{'intersection_id': array, <HISTORY_COLUMNS>: array}``.
+        """
+        parts = []
+        with self._lock:
+            if include_spilled:
+                parts.extend(self._query_spilled(intersection_id, start, end))
+            if intersection_id is None:
+                rings = list(self._rings.items())
+            else:
+                rings = [(intersection_id, self._rings[intersection_id])] if intersection_id in self._rings else []
+            for ring_id, ring in rings:
+                columns = ring.ordered()
+                parts.append((np.full(ring.size, str(ring_id)), columns))
+
+        ids = [part_ids for part_ids, _ in parts]
+        result = {'intersection_id': np.concatenate(ids) if ids else np.empty(0, dtype=str)}
+        for name, dtype in HISTORY_COLUMNS.items():
+            result[name] = np.concatenate([columns[name] for _, columns in parts]) if parts \
+                else np.empty(0, dtype=dtype)
+
+        keep = np.ones(len(result['timestamp']), dtype=bool)
+        if start is not None:
+            keep &= result['timestamp'] >= start
+        if end is not None:
+            keep &= result['timestamp'] <= end
+        order = np.argsort(result['timestamp'][keep], kind='stable')
+        return {name: column[keep][order] for name, column in result.items()}
+
+    def _query_spilled(self, intersection_id, start, end):
+        spilled = []
+        for path, min_ts, max_ts in self._segments:
+            if (start is not None and max_ts < start) or (end is not None and min_ts > end):
+                continue
+            spilled.append(self._read_segment(path))
+        # Segments being written right now
+        spilled.extend((ids, columns) for _, ids, columns in self._writing)
+        if self._spill_rows:
+            spilled.append((np.array(self._spill_ids), {
+                name: np.array([row[name] for row in self._spill_rows], dtype=dtype)
+                for name, dtype in HISTORY_COLUMNS.items()}))
+
+        if intersection_id is None:
+            return spilled
+        wanted = str(intersection_id)
+        filtered = []
+        for ids, columns in spilled:
+            mask = ids == wanted
+            filtered.append((ids[mask], {name: column[mask] for name, column in columns.items()}))
+        return filtered
+
+    def latest(self, intersection_id, n=1):
+        """Most recent ``n`` in-memory decisions for one intersection, newest last"""
+        with self._lock:
+            ring = self._rings.get(intersection_id)
+            if ring is None:
+                return _empty_columns()
+            return {name: column[-n:] for name, column in ring.ordered().items()}
+
+    def intersections(self):
+        return list(self._rings)
+
+    def __len__(self):
+        return sum(ring.size for ring in list(self._rings.values()))
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'intersections': len(self._rings),
+                'rows_in_memory': sum(ring.size for ring in self._rings.values()),
+                'capacity_per_intersection': self.capacity,
+                'pending_spill_rows': len(self._spill_rows) + sum(len(ids) for _, ids, _ in self._writing),
+                'segments': len(self._segments),
+                'spill_format': ('arrow' if PYARROW_AVAILABLE else 'npz') if self.spill_dir else None
+            }
@@ -0,0 +1,180 @@
+# signal_plan.py
+import numpy as np
+
+# Passenger-car-unit weights in motorcycle equivalents, as used by /api/optimize/ clients
+PCU_WEIGHTS = {
+    'motorcycle': 1.0,
+    'bicycle': 1.0,     # same road space as a motorcycle
+    'tuktuk': 1.5,
+    'car': 2.0,
+    'bus': 3.0,
+    'truck': 3.0,       # treated like a bus
+}
+DEFAULT_PCU_WEIGHT = 2.0  # unknown vehicle types count as a car
+
+WEBSTER = 'webster'
+MAX_PRESSURE = 'max_pressure'
+
+
+def pcu_count(vehicles, weights=PCU_WEIGHTS):
+    """PCU-weighted total of a {'car': 2, 'motorcycle': 5, ...} breakdown"""
+    return sum(count * weights.get(vehicle, DEFAULT_PCU_WEIGHT) for vehicle, count in vehicles.items())
+
+
+def pcu_matrix(intersections, weights=PCU_WEIGHTS):
+    """Stack per-phase vehicle breakdowns into a padded (intersections, phases) PCU array and mask"""
+    phases = max((len(phases) for phases in intersections), default=0)
+    pcu = np.zeros((len(intersections), phases))
+    mask = np.zeros((len(intersections), phases), dtype=bool)
+    for i, phase_vehicles in enumerate(intersections):
+        pcu[i, :len(phase_vehicles)] = [pcu_count(vehicles, weights) for vehicles in phase_vehicles]
+        mask[i, :len(phase_vehicles)] = True
+    return pcu, mask
+
+
+class SignalPlanSolver:
+    """Cycle length and phase splits for many intersections at once.
+
+    Inputs are (intersections, phases) arrays of PCU-weighted counts
+    observed over ``count_interval`` seconds (the critical lane of each
+    phase), padded with a phase mask where intersections have fewer
+    phases.
+
+    * ``webster`` - optimal cycle C = (1.5 L + 5) / (1 - Y) from the
+      critical flow ratios y = q / s, with effective green split in
+      proportion to y.
+    * ``max_pressure`` - fixed cycle, green split in proportion to phase
+      pressure (upstream minus downstream PCU), and the highest-pressure
+      phase reported as the one to serve next.
+
+    Both respect min/max green and per-phase lost time, and the returned
+    cycle always equals the sum of greens plus lost time.
+    """
+
+    def __init__(self, saturation_flow=3600.0, lost_time=4.0, min_green=10.0, max_green=60.0,
+                 min_cycle=40.0, max_cycle=150.0, count_interval=60.0, max_flow_ratio=0.95):
+        self.saturation_flow = saturation_flow  # PCU per hour of green, per phase
+        self.lost_time = lost_time              # seconds per phase (start-up + clearance)
+        self.min_green = min_green
+        self.max_green = max_green
+        self.min_cycle = min_cycle
+        self.max_cycle = max_cycle
+        self.count_interval = count_interval
+        self.max_flow_ratio = max_flow_ratio    # Y above this is treated as oversaturated
+
+    def solve(self, pcu, phase_mask=None, mode=WEBSTER, downstream_pcu=None, cycle_length=120.0,
+              fixed_cycle=None):
+        """Signal plans for a (intersections, phases) PCU array.
+
+        ``fixed_cycle`` forces the cycle in either mode, e.g. the common
+        cycle of a coordinated corridor; only the splits are optimized.
+
+        Returns a dict of arrays: ``cycle`` (I,), ``green`` (I, P) whole
+        seconds, ``flow_ratio`` (I, P), ``degree_of_saturation`` (I,),
+        ``oversaturated`` (I,) and ``next_phase`` (I,).
+        """
+        pcu = np.atleast_2d(np.asarray(pcu, dtype=np.float64))
+        mask = np.ones(pcu.shape, dtype=bool) if phase_mask is None else np.atleast_2d(phase_mask)
+        pcu = np.where(mask, pcu, 0.0)
+        phases = mask.sum(axis=1)
+        lost = phases * self.lost_time
+
+        flow_ratio = pcu * (3600.0 / self.count_interval) / self.saturation_flow
+        total_ratio = flow_ratio.sum(axis=1)
+
+        if mode == WEBSTER:
+            weights = flow_ratio
+            capped = np.minimum(total_ratio, self.max_flow_ratio)
+            cycle = np.where(total_ratio >= self.max_flow_ratio, self.max_cycle,
+                             (1.5 * lost + 5) / (1 - capped))
+            cycle = np.clip(cycle, self.min_cycle, self.max_cycle)
+        elif mode == MAX_PRESSURE:
+            pressure = pcu if downstream_pcu is None else pcu - np.where(mask, downstream_pcu, 0.0)
+            weights = np.where(mask, np.maximum(pressure, 0.0), 0.0)
+            cycle = np.broadcast_to(np.asarray(cycle_length, dtype=np.float64), total_ratio.shape)
+        else:
+            raise ValueError(f"Unknown signal plan mode: {mode}")
+        if fixed_cycle is not None:
+            cycle = np.broadcast_to(np.asarray(fixed_cycle, dtype=np.float64), total_ratio.shape)
+
+        # The green bounds may force the cycle outside the nominal range
+        min_green = np.where(mask, self.min_green, 0.0)
+        max_green = np.where(mask, self.max_green, 0.0)
+        cycle = np.clip(cycle, lost + min_green.sum(axis=1), lost + max_green.sum(axis=1))
+
+        green = np.round(self._split(cycle - lost, weights, min_green, max_green, mask))
+        cycle = green.sum(axis=1) + lost
+
+        capacity_ratio = np.where(green > 0, cycle[:, None] / np.maximum(green, 1e-9), 0.0)
+        degree_of_saturation = (flow_ratio * capacity_ratio).max(axis=1, initial=0.0)
+        next_phase = np.argmax(np.where(mask, weights, -np.inf), axis=1)
+
+        return {
+            'cycle': cycle,
+            'green': green.astype(np.int64),
+            'flow_ratio': flow_ratio,
+            'degree_of_saturation': degree_of_saturation,
+            'oversaturated': total_ratio >= self.max_flow_ratio,
+            'next_phase': next_phase
+        }
+
+    @staticmethod
+    def _split(total, weights, low, high, mask):
+        """Divide ``total`` green per row in proportion to ``weights`` within [low, high].
+
+        Phases pushed against a bound are fixed there and the remainder is
+        re-shared among the rest; at most one pass per phase.
+        """
+        green = np.zeros(weights.shape)
+        free = mask.copy()
+        for _ in range(weights.shape[1] + 1):
+            remaining = total - np.where(free, 0.0, green).sum(axis=1)
+            active = np.where(free, weights, 0.0)
+            weight_sum = active.sum(axis=1, keepdims=True)
+            free_count = np.maximum(free.sum(axis=1, keepdims=True), 1)
+            # Equal shares where nothing has weight (e.g. an empty junction)
+            share = np.where(weight_sum > 0, active / np.where(weight_sum > 0, weight_sum, 1.0), free / free_count)
+            candidate = remaining[:, None] * share
+
+            over = free & (candidate > high)
+            under = free & (candidate < low)
+            green = np.where(free, candidate, green)
+            if not (over.any() or under.any()):
+                break
+            green = np.where(over, high, np.where(under, low, green))
+            free &= ~(over | under)
+        return green
+
+    def solve_phases(self, phase_vehicles, mode=WEBSTER, downstream=None, cycle_length=120.0):
+        """Plan for one intersection from per-phase vehicle breakdowns"""
+        pcu, mask = pcu_matrix([phase_vehicles])
+        downstream_pcu = pcu_matrix([downstream])[0] if downstream else None
+        plan = self.solve(pcu, mask, mode=mode, downstream_pcu=downstream_pcu, cycle_length=cycle_length)
+        return {
+            'cycle': float(plan['cycle'][0]),
+            'green': plan['green'][0].tolist(),
+            'pcu': pcu[0].tolist(),
+            'flow_ratio': plan['flow_ratio'][0].tolist(),
+            'degree_of_saturation': float(plan['degree_of_saturation'][0]),
+            'oversaturated': bool(plan['oversaturated'][0]),
+            'next_phase': int(plan['next_phase'][0])
+        }
+
+
+if __name__ == '__main__':
+    import time
+
+    solver = SignalPlanSolver()
+    print('Single intersection:', solver.solve_phases([
+        {'car': 2, 'motorcycle': 5, 'tuktuk': 1},
+        {'car': 6, 'motorcycle': 20, 'bus': 1},
+        {'motorcycle': 3},
+        {'car': 1, 'motorcycle': 8},
+    ]))
+
+    rng = np.random.default_rng(0)
+    pcu = rng.uniform(0, 60, size=(1000, 4))
+    started = time.perf_counter()
+    plans = solver.solve(pcu)
+    print(f'1000 intersections: {(time.perf_counter() - started) * 1000:.2f}ms, '
+          f'cycles {plans["cycle"].min():.0f}-{plans["cycle"].max():.0f}s')
@@ -0,0 +1,313 @@
+# time_profiles.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES   # 96
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+DAYS = 7
+HOLIDAY = 7                               # extra day row used on holiday dates
+
+# The fixed rush hours every optimizer used before profiles existed
+DEFAULT_RUSH_HOURS = (7, 8, 9, 16, 17, 18)
+RUSH_FACTOR = 1.2
+OFF_PEAK_FACTOR = 0.9
+
+DEFAULT_ROW = 0  # row for intersections without a profile of their own
+
+# History read by from_sqlite; 03_database/backend/queries.py plan-checks the same statement
+PROFILE_HISTORY_SQL = 'SELECT intersection_id, timestamp, vehicle_count FROM traffic_data WHERE timestamp >= ?'
+DEFAULT_HISTORY_DAYS = 90
+
+
+def _default_day():
+    rush = np.zeros(SLOTS_PER_DAY, dtype=bool)
+    for hour in DEFAULT_RUSH_HOURS:
+        rush[hour * SLOTS_PER_HOUR:(hour + 1) * SLOTS_PER_HOUR] = True
+    return np.where(rush, RUSH_FACTOR, OFF_PEAK_FACTOR).astype(np.float32), rush
+
+
+def _to_datetime64(timestamps):
+    return np.asarray(timestamps, dtype='datetime64[m]')
+
+
+def to_local_naive(timestamps):
+    """Local wall-clock datetime64 values for pandas timestamps.
+
+    Profiles are indexed by local time of day. Timezone-aware input is
+    converted to this machine's local time (the clock current_slot uses)
+    instead of being slotted in UTC; naive input is taken as local already.
+    """
+    import pandas as pd
+    index = pd.DatetimeIndex(timestamps)
+    if index.tz is None:
+        return index.values
+    utc = index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[s]')
+    # One local UTC offset per distinct hour covers DST changes
+    hours, inverse = np.unique(utc.astype('datetime64[h]'), return_inverse=True)
+    epochs = hours.astype('datetime64[s]').astype(np.int64).tolist()
+    offsets = np.array([int(datetime.fromtimestamp(epoch, timezone.utc).astimezone().utcoffset().total_seconds())
+                        for epoch in epochs], dtype=np.int64)
+    return utc + offsets[inverse.reshape(-1)].astype('timedelta64[s]')
+
+
+class TimeProfiles:
+    """Per-intersection time-of-day factors in a compact (rows, 8, 96) table.
+
+    Each row holds a time factor and a rush-hour flag for every
+    fifteen-minute slot of each weekday (Monday = 0) plus a holiday day
+    used on the configured holiday dates. Row 0 is the default profile,
+    which reproduces the old fixed rush hours (7-9h and 16-18h: factor
+    1.2, otherwise 0.9) and serves intersections without a learned row.
+
+    Lookups are plain array indexing. The current (day, slot) is cached
+    until the next slot boundary, so hot paths do not call
+    ``datetime.now()`` per decision.
+    """
+
+    def __init__(self, factors=None, rush=None, intersection_ids=(), holidays=(), source=None):
+        self.source = source or ('default' if factors is None else 'custom')
+        if factors is None:
+            day_factors, day_rush = _default_day()
+            factors = np.broadcast_to(day_factors, (1, DAYS + 1, SLOTS_PER_DAY)).copy()
+            rush = np.broadcast_to(day_rush, (1, DAYS + 1, SLOTS_PER_DAY)).copy()
+        self.factors = np.asarray(factors, dtype=np.float32)
+        self.rush = np.asarray(rush, dtype=bool)
+        # Row i + 1 belongs to intersection_ids[i]
+        self.rows = {str(intersection_id): i + 1 for i, intersection_id in enumerate(intersection_ids)}
+        self.holidays = {self._as_date(day) for day in holidays}
+        self._holiday_array = np.array(sorted(self.holidays), dtype='datetime64[D]')
+        self._current = (0.0, 0, 0)  # (valid until, day, slot)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _as_date(day):
+        if isinstance(day, datetime):
+            return day.date()
+        if isinstance(day, date):
+            return day
+        return date.fromisoformat(str(day))
+
+    # Slots -----------------------------------------------------------------
+
+    def slot_of(self, when):
+        """(day row, slot) for a datetime; holidays map to the HOLIDAY row"""
+        day = HOLIDAY if when.date() in self.holidays else when.weekday()
+        return day, (when.hour * 60 + when.minute) // SLOT_MINUTES
+
+    def current_slot(self):
+        """(day row, slot) for now, recomputed only when a slot boundary has passed"""
+        valid_until, day, slot = self._current
+        if time.time() < valid_until:
+            return day, slot
+        with self._lock:
+            now = datetime.now()
+            day, slot = self.slot_of(now)
+            slot_start = now.replace(minute=now.minute - now.minute % SLOT_MINUTES, second=0, microsecond=0)
+            next_boundary = slot_start + timedelta(minutes=SLOT_MINUTES)
+            self._current = (next_boundary.timestamp(), day, slot)
+        return day, slot
+
+    def slots_of(self, timestamps):
+        """Vectorized slot_of: (day rows, slots) for an array of timestamps"""
+        minutes = _to_datetime64(timestamps)
+        days = minutes.astype('datetime64[D]')
+        slots = ((minutes - days).astype(np.int64) // SLOT_MINUTES).astype(np.int64)
+        weekdays = (days.astype(np.int64) + 3) % 7   # 1970-01-01 was a Thursday
+        if len(self._holiday_array):
+            weekdays = np.where(np.isin(days, self._holiday_array), HOLIDAY, weekdays)
+        return weekdays, slots
+
+    def fingerprint(self):
+        """Short hash of the table contents; models record it to detect train/serve skew"""
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(self.factors).tobytes())
+        digest.update(np.ascontiguousarray(self.rush).tobytes())
+        digest.update(json.dumps(sorted(self.rows.items())).encode())
+        digest.update(json.dumps(sorted(day.isoformat() for day in self.holidays)).encode())
+        return digest.hexdigest()[:16]
+
+    def identity(self):
+        """JSON-serializable description saved next to a trained model"""
+        return {'fingerprint': self.fingerprint(), 'source': self.source, 'intersections': len(self.rows)}
+
+    # Lookups ---------------------------------------------------------------
+
+    def row(self, intersection_id):
+        return self.rows.get(str(intersection_id), DEFAULT_ROW) if intersection_id is not None else DEFAULT_ROW
+
+    def rows_for(self, intersection_ids):
+        return np.array([self.row(intersection_id) for intersection_id in intersection_ids], dtype=np.int64)
+
+    def lookup(self, intersection_id=None, when=None):
+        """(time factor, is rush hour) for one intersection, now or at ``when``"""
+        day, slot = self.current_slot() if when is None else self.slot_of(when)
+        row = self.row(intersection_id)
+        return float(self.factors[row, day, slot]), bool(self.rush[row, day, slot])
+
+    def lookup_many(self, rows, days, slots):
+        """Factor and rush arrays for broadcastable row/day/slot index arrays"""
+        return self.factors[rows, days, slots], self.rush[rows, days, slots]
+
+    def lookup_times(self, intersection_ids, timestamps):
+        """Factor and rush arrays for per-row intersections and naive local timestamps (see to_local_naive)"""
+        days, slots = self.slots_of(timestamps)
+        return self.lookup_many(self.rows_for(intersection_ids), days, slots)
+
+    # Learning --------------------------------------------------------------
+
+    @classmethod
+    def learn(cls, intersection_ids, timestamps, vehicle_counts, holidays=(), min_samples=3,
+              rush_threshold=1.15):
+        """Build profiles from historical counts.
+
+        A slot's demand relative to the intersection's overall mean maps
+        linearly onto the old factor range (<= 1.0 -> 0.9, >=
+        ``rush_threshold`` -> 1.2) and marks rush hour above the
+        threshold. Slots with fewer than ``min_samples`` observations use
+        the hour they fall in (hourly data fills all four slots), then
+        the default profile. Holidays without data reuse Sunday.
+        """
+        profiles = cls(holidays=holidays)
+        ids = np.asarray([str(i) for i in intersection_ids])
+        counts = np.asarray(vehicle_counts, dtype=np.float64)
+        names, rows = np.unique(ids, return_inverse=True)
+        days, slots = profiles.slots_of(timestamps)
+
+        shape = (len(names), DAYS + 1, SLOTS_PER_DAY)
+        totals = np.zeros(shape)
+        samples = np.zeros(shape)
+        np.add.at(totals, (rows, days, slots), counts)
+        np.add.at(samples, (rows, days, slots), 1)
+
+        # Hour-level aggregates broadcast back onto the four slots of each hour
+        hour_shape = shape[:2] + (24, SLOTS_PER_HOUR)
+        hour_totals = np.repeat(totals.reshape(hour_shape).sum(axis=3), SLOTS_PER_HOUR, axis=2)
+        hour_samples = np.repeat(samples.reshape(hour_shape).sum(axis=3), SLOTS_PER_HOUR, axis=2)
+
+        use_slot = samples >= min_samples
+        use_hour = ~use_slot & (hour_samples >= min_samples)
+        mean = np.where(use_slot, totals / np.maximum(samples, 1),
+                        np.where(use_hour, hour_totals / np.maximum(hour_samples, 1), np.nan))
+
+        overall = np.bincount(rows, weights=counts, minlength=len(names)) / np.maximum(
+            np.bincount(rows, minlength=len(names)), 1)
+        relative = mean / np.maximum(overall, 1e-9)[:, None, None]
+
+        ramp = np.clip((relative - 1.0) / (rush_threshold - 1.0), 0.0, 1.0)
+        learned_factors = OFF_PEAK_FACTOR + (RUSH_FACTOR - OFF_PEAK_FACTOR) * ramp
+        learned_rush = relative >= rush_threshold
+
+        default_factors, default_rush = profiles.factors[DEFAULT_ROW], profiles.rush[DEFAULT_ROW]
+        known = ~np.isnan(mean)
+        factors = np.where(known, learned_factors, default_factors[None])
+        rush = np.where(known, learned_rush, default_rush[None])
+
+        # Holiday slots with no history behave like Sunday
+        holiday_known = known[:, HOLIDAY]
+        factors[:, HOLIDAY] = np.where(holiday_known, factors[:, HOLIDAY], factors[:, 6])
+        rush[:, HOLIDAY] = np.where(holiday_known, rush[:, HOLIDAY], rush[:, 6])
+
+        return cls(
+            factors=np.concatenate([profiles.factors, factors.astype(np.float32)]),
+            rush=np.concatenate([profiles.rush, rush]),
+            intersection_ids=names.tolist(),
+            holidays=holidays,
+            source='learned'
+        )
+
+    @classmethod
+    def from_dataframe(cls, df, holidays=(), **kwargs):
+        """Learn from a traffic_data frame with intersection_id, timestamp and vehicle_count"""
+        import pandas as pd
+        timestamps = to_local_naive(pd.to_datetime(df['timestamp']))
+        return cls.learn(df['intersection_id'], timestamps, df['vehicle_count'], holidays=holidays, **kwargs)
+
+    @classmethod
+    def from_sqlite(cls, db_path, days=DEFAULT_HISTORY_DAYS, holidays=(), **kwargs):
+        """Learn from the last ``days`` days of a SQLite database's traffic_data table"""
+        since = (datetime.now() - timedelta(days=days or DEFAULT_HISTORY_DAYS)).isoformat(sep=' ')
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(PROFILE_HISTORY_SQL, (since,)).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return cls(holidays=holidays)
+        intersection_ids, timestamps, counts = zip(*rows)
+        # Parse at full precision first; SQLite stores fractional seconds
+        timestamps = np.array(timestamps, dtype='datetime64[us]')
+        return cls.learn(intersection_ids, timestamps, counts,
+                         holidays=holidays, **kwargs)
+
+    # Persistence -----------------------------------------------------------
+
+    def save(self, path):
+        names = sorted(self.rows, key=self.rows.get)
+        np.savez_compressed(
+            path, factors=self.factors, rush=self.rush,
+            intersection_ids=np.array(names, dtype=str),
+            holidays=np.array([day.isoformat() for day in sorted(self.holidays)], dtype=str)
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                factors=data['factors'], rush=data['rush'],
+                intersection_ids=data['intersection_ids'].tolist(),
+                holidays=data['holidays'].tolist(),
+                source=os.path.basename(str(path))
+            )
+
+    def get_stats(self):
+        return {
+            'source': self.source,
+            'fingerprint': self.fingerprint(),
+            'intersections': len(self.rows),
+            'holidays': len(self.holidays),
+            'table_bytes': int(self.factors.nbytes + self.rush.nbytes)
+        }
+
+
+_profiles = None
+_profiles_lock = threading.Lock()
+
+
+def get_profiles():
+    """Process-wide profiles: loaded once from TIME_PROFILES_PATH, else the default profile"""
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                path = os.getenv('TIME_PROFILES_PATH')
+                _profiles = TimeProfiles.load(path) if path and os.path.exists(path) else TimeProfiles()
+    return _profiles
+
+
+def set_profiles(profiles):
+    """Install learned profiles for every optimizer in the process"""
+    global _profiles
+    _profiles = profiles
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Learn time-of-day profiles from a traffic_data SQLite database')
+    parser.add_argument('db_path')
+    parser.add_argument('output', help='.npz file to load via TIME_PROFILES_PATH')
+    parser.add_argument('--days', type=int, default=DEFAULT_HISTORY_DAYS, help='Only use the last N days')
+    parser.add_argument('--holiday', action='append', default=[], help='Holiday date (YYYY-MM-DD), repeatable')
+    args = parser.parse_args()
+
+    learned = TimeProfiles.from_sqlite(args.db_path, days=args.days, holidays=args.holiday)
+    learned.save(args.output)
+    print(f"✅ Saved profiles for {len(learned.rows)} intersections to {args.output} ({learned.get_stats()})")
@@ -1,32 +1,122 @@
-﻿from datetime import datetime
+﻿from collections import OrderedDict
+import os
+import sys
+import threading
+
+# Time-of-day profiles live in 01_core_engine
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '01_core_engine'))
+
+from time_profiles import get_profiles
+
+class FusionDecisionCache:
+    '''LRU cache of fusion decisions with hit/miss counters'''
+    
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        with self._lock:
+            decision = self._entries.get(key)
+            if decision is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decision
+    
+    def put(self, key, decision):
+        with self._lock:
+            self._entries[key] = decision
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0
+        }
 
 class SimpleFusionEngine:
+    def __init__(self, cache_size=256, profiles=None):
+        # Identical decisions are served from the cache; 0 disables it
+        self.cache = FusionDecisionCache(cache_size) if cache_size else None
+        # Per-intersection time-of-day factors (default: the old fixed rush hours)
+        self.profiles = profiles or get_profiles()
+    
     def fuse_data(self, vision_data, existing_traffic_data):
-        '''Combine camera data with existing PostgreSQL data'''
-        # Get current time for time-based adjustments
-        current_hour = datetime.now().hour
-        is_rush_hour = current_hour in [7, 8, 9, 16, 17, 18]
+        '''Combine camera data with existing PostgreSQL data.
+        
+        The green time and explanation are cached by quantized inputs; the
+        returned dict is built fresh on every call.
+        '''
+        # Time-of-day factor for this intersection's current 15-minute slot
+        time_factor, is_rush_hour = self.profiles.lookup(existing_traffic_data.get('intersection_id'))
         
         # Base green time from your existing system
         base_green = existing_traffic_data.get('current_green_time', 30)
         
+        if self.cache is None:
+            decision = self._decide(vision_data, base_green, time_factor, is_rush_hour)
+        else:
+            key = (
+                self._count_bucket(vision_data['vehicle_count']),
+                vision_data['congestion_level'],
+                round(time_factor, 3),
+                is_rush_hour,
+                base_green
+            )
+            decision = self.cache.get(key)
+            if decision is None:
+                decision = self._decide(vision_data, base_green, time_factor, is_rush_hour)
+                self.cache.put(key, decision)
+        
+        recommended_green_time, adjustment_reason = decision
+        return {
+            'recommended_green_time': recommended_green_time,
+            'adjustment_reason': adjustment_reason,
+            'confidence': 'High - Real-time visual confirmation',
+            'vision_data_used': vision_data,
+            'previous_green_time': base_green
+        }
+    
+    @staticmethod
+    def _count_bucket(vehicle_count):
+        '''Cache key part: counts that lead to the same adjustment and explanation share a bucket'''
+        if 3 <= vehicle_count <= 8:
+            return '3-8'
+        if 8 < vehicle_count <= 15:
+            return '9-15'
+        return vehicle_count  # the explanation quotes the exact count
+    
+    def _decide(self, vision_data, base_green, time_factor, is_rush_hour):
+        '''(recommended green time, explanation); an immutable tuple so cached entries can be shared'''
         # Simple vision-based adjustments
         vision_adjustment = self._calculate_vision_adjustment(vision_data)
         
         # Time-based adjustment
-        time_factor = 1.2 if is_rush_hour else 0.9
+        time_factor = round(time_factor, 3)
         
         # Calculate new green time
         new_green_time = base_green * vision_adjustment * time_factor
         new_green_time = max(10, min(60, new_green_time))
         
-        return {
-            'recommended_green_time': round(new_green_time),
-            'adjustment_reason': self._explain_adjustment(vision_data, is_rush_hour),
-            'confidence': 'High - Real-time visual confirmation',
-            'vision_data_used': vision_data,
-            'previous_green_time': base_green
-        }
+        return round(new_green_time), self._explain_adjustment(vision_data, is_rush_hour)
     
     def _calculate_vision_adjustment(self, vision_data):
         '''Simple rules instead of complex ML'''
@@ -63,6 +153,8 @@ def test_fusion():
     existing_data = {'current_green_time': 30}
     result = fusion.fuse_data(vision_data, existing_data)
     print('🔄 Fusion Test Result:', result)
+    fusion.fuse_data({'vehicle_count': 12, 'congestion_level': 'Medium'}, existing_data)
+    print('🔄 Decision cache:', fusion.cache.get_stats())
     return result
 
 if __name__ == '__main__':
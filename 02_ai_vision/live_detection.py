@@ -1,19 +1,31 @@
 import cv2
+import os
+import sys
 import time
-from ultralytics import YOLO
+from queue import Empty
 import numpy as np
 import threading
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vision_engine'))
+
+from frame_pipeline import FramePipeline
+from frame_sampler import AdaptiveFrameSampler
+from capture import CameraCapture
+from model_registry import get_model
+from postprocess import class_ids_for, extract_detections, to_dicts
+
 class LiveTrafficDetector:
     def __init__(self, model_path='../05_models/yolov8n.pt'):
         """Initialize live traffic detector with YOLO model"""
         print("🚀 Initializing Live Traffic Detector...")
-        self.model = YOLO(model_path)
+        self.model = get_model(model_path)
         self.cap = None
+        self.pipeline = None
         self.is_running = False
         self.detection_results = []
         self.vehicle_classes = ['car', 'motorcycle', 'bus', 'truck']
+        self.sampler = AdaptiveFrameSampler()
         
     def start_webcam(self, camera_id=0):
         """Start webcam detection"""
@@ -29,12 +41,13 @@ class LiveTrafficDetector:
         self._run_detection_loop()
         return True
     
-    def start_ip_camera(self, rtsp_url):
-        """Start IP camera detection"""
+    def start_ip_camera(self, rtsp_url, use_substream=True, decoder='auto'):
+        """Start IP camera detection (substream first when the URL format is known)"""
         print(f"🌐 Connecting to IP camera: {rtsp_url}")
-        self.cap = cv2.VideoCapture(rtsp_url)
+        # Every frame is displayed, so no sampler here: all frames are decoded
+        self.cap = CameraCapture(rtsp_url, backend=decoder, use_substream=use_substream)
         
-        if not self.cap.isOpened():
+        if not self.cap.open():
             print("❌ Error: Could not connect to IP camera")
             return False
             
@@ -44,25 +57,30 @@ class LiveTrafficDetector:
         return True
     
     def _run_detection_loop(self):
-        """Main detection loop"""
-        frame_count = 0
+        """Main detection loop.
+
+        Capture and YOLO inference run on their own threads, connected by
+        drop-oldest queues; this thread only draws and displays results, so
+        a slow model never lets camera frames pile up.
+        """
         start_time = time.time()
+        self.sampler = AdaptiveFrameSampler()
+        self.pipeline = FramePipeline(self._read_frame, self._infer_frame, name='live-detection')
+        self.pipeline.start()
         
-        while self.is_running:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("❌ Error: Could not read frame")
-                break
+        displayed = 0
+        while self.pipeline.is_running or len(self.pipeline.result_queue):
+            try:
+                frame, results = self.pipeline.get_result(timeout=0.5)
+            except Empty:
+                continue
             
-            # Run YOLO detection every 5 frames for performance
-            if frame_count % 5 == 0:
-                results = self.model(frame)
+            if results is not None:
                 self._process_detections(results, frame)
             
             # Display frame with detections
             self._display_frame(frame)
-            
-            frame_count += 1
+            displayed += 1
             
             # Break on 'q' key press
             if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -70,39 +88,50 @@ class LiveTrafficDetector:
         
         # Calculate FPS
         end_time = time.time()
-        fps = frame_count / (end_time - start_time)
+        fps = displayed / (end_time - start_time)
         print(f"📊 Average FPS: {fps:.2f}")
+        print(f"📊 Pipeline: {self.pipeline.get_stats()}")
+        print(f"📊 Sampler: {self.sampler.get_stats()}")
         
         self.stop()
     
+    def _read_frame(self):
+        """Capture stage"""
+        ret, frame = self.cap.read()
+        if not ret:
+            print("❌ Error: Could not read frame")
+            return None
+        return frame
+    
+    def _infer_frame(self, frame):
+        """Inference stage: YOLO only on frames the adaptive sampler picks"""
+        if not self.sampler.should_infer(frame):
+            return None
+        
+        started = time.time()
+        results = self.model(frame)
+        self.sampler.record_inference(time.time() - started)
+        return results
+    
     def _process_detections(self, results, frame):
         """Process YOLO detection results"""
         current_detections = []
-        vehicle_count = 0
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        class_ids = class_ids_for(self.model.names, self.vehicle_classes)
         
         for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                class_name = self.model.names[cls]
+            # Vehicles only, filtered as whole arrays
+            detections = to_dicts(extract_detections(result, class_ids=class_ids), self.model.names)
+            for detection in detections:
+                detection['timestamp'] = timestamp
                 
-                # Filter for vehicles only
-                if class_name in self.vehicle_classes:
-                    bbox = box.xyxy[0].tolist()
-                    current_detections.append({
-                        'vehicle': class_name,
-                        'confidence': round(conf, 2),
-                        'bbox': bbox,
-                        'timestamp': datetime.now().strftime("%H:%M:%S")
-                    })
-                    vehicle_count += 1
-                    
-                    # Draw bounding box on frame
-                    x1, y1, x2, y2 = map(int, bbox)
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(frame, f'{class_name} {conf:.2f}', 
-                               (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+                # Draw bounding box on frame
+                x1, y1, x2, y2 = map(int, detection['bbox'])
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                cv2.putText(frame, f"{detection['vehicle']} {detection['confidence']:.2f}", 
+                           (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+            current_detections.extend(detections)
+        vehicle_count = len(current_detections)
         
         # Update results
         self.detection_results = current_detections
@@ -125,6 +154,8 @@ class LiveTrafficDetector:
             'total_vehicles': len(self.detection_results),
             'vehicles_by_type': self._count_vehicles_by_type(),
             'latest_detections': self.detection_results[-5:] if self.detection_results else [],
+            'pipeline': self.pipeline.get_stats() if self.pipeline else None,
+            'sampler': self.sampler.get_stats(),
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
     
@@ -139,6 +170,8 @@ class LiveTrafficDetector:
     def stop(self):
         """Stop detection and cleanup"""
         self.is_running = False
+        if self.pipeline:
+            self.pipeline.stop()
         if self.cap:
             self.cap.release()
         cv2.destroyAllWindows()
@@ -0,0 +1,158 @@
+"""Compare inference backends on a folder of local images.
+
+Reports per-image latency and detection drift for each backend, using the
+PyTorch model's detections as reference boxes (mAP@0.5 of 1.0 means the
+backend reproduces PyTorch exactly).
+
+    python backend_benchmark.py ../../05_models/yolov8n.pt ../../test_images
+"""
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from inference_backends import BACKENDS, PYTORCH, available_backends, load_model
+from postprocess import boxes_of, box_iou, extract_detections
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_images(image_dir, limit=None):
+    names = sorted(f for f in os.listdir(image_dir) if f.lower().endswith(IMAGE_EXTENSIONS))[:limit]
+    images = [(name, cv2.imread(os.path.join(image_dir, name))) for name in names]
+    return [(name, image) for name, image in images if image is not None]
+
+
+def run_backend(model, images, conf=0.25, warmup=2):
+    """Detections and per-image latency (seconds) for one backend"""
+    for _ in range(warmup):
+        model(images[0][1], conf=conf, verbose=False)
+
+    detections, latencies = [], []
+    for _, image in images:
+        started = time.perf_counter()
+        results = model(image, conf=conf, verbose=False)
+        latencies.append(time.perf_counter() - started)
+        detections.append(extract_detections(results[0]))
+    return detections, np.array(latencies)
+
+
+def average_precision(recall, precision):
+    """All-point interpolated area under the precision/recall curve"""
+    recall = np.concatenate(([0.0], recall, [1.0]))
+    precision = np.concatenate(([1.0], precision, [0.0]))
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    steps = np.flatnonzero(recall[1:] != recall[:-1])
+    return float(np.sum((recall[steps + 1] - recall[steps]) * precision[steps + 1]))
+
+
+def mean_average_precision(predictions, references, iou_threshold=0.5):
+    """mAP of ``predictions`` against ``references`` (lists of per-image detection arrays)"""
+    classes = np.unique(np.concatenate([ref['cls'] for ref in references] or [np.empty(0, np.int16)]))
+    if classes.size == 0:
+        return 1.0 if all(len(p) == 0 for p in predictions) else 0.0
+
+    aps = []
+    for cls in classes:
+        scores, matched = [], []
+        total_refs = 0
+        for preds, refs in zip(predictions, references):
+            preds = preds[preds['cls'] == cls]
+            refs = refs[refs['cls'] == cls]
+            total_refs += len(refs)
+            if not len(preds):
+                continue
+
+            preds = preds[np.argsort(-preds['conf'])]
+            hits = np.zeros(len(preds), dtype=bool)
+            if len(refs):
+                iou = box_iou(boxes_of(preds), boxes_of(refs))
+                taken = np.zeros(len(refs), dtype=bool)
+                for i in range(len(preds)):
+                    candidates = np.where(taken, -1.0, iou[i])
+                    best = int(np.argmax(candidates))
+                    if candidates[best] >= iou_threshold:
+                        taken[best] = True
+                        hits[i] = True
+            scores.append(preds['conf'])
+            matched.append(hits)
+
+        if not total_refs:
+            continue
+        if not scores:
+            aps.append(0.0)
+            continue
+
+        order = np.argsort(-np.concatenate(scores))
+        hits = np.concatenate(matched)[order]
+        true_positives = np.cumsum(hits)
+        recall = true_positives / total_refs
+        precision = true_positives / np.arange(1, len(hits) + 1)
+        aps.append(average_precision(recall, precision))
+
+    return float(np.mean(aps)) if aps else 1.0
+
+
+def compare_backends(weights, image_dir, backends=None, limit=None, conf=0.25):
+    """Latency and mAP@0.5 drift (vs PyTorch) for each backend"""
+    images = load_images(image_dir, limit)
+    if not images:
+        raise ValueError(f"No images found in {image_dir}")
+
+    backends = list(backends or available_backends())
+    if PYTORCH in backends:
+        backends.remove(PYTORCH)
+    backends.insert(0, PYTORCH)
+
+    report = {}
+    reference = None
+    for backend in backends:
+        model, backend_used = load_model(weights, backend)
+        if backend_used != backend:
+            report[backend] = {'error': 'backend unavailable, fell back to PyTorch'}
+            continue
+
+        detections, latencies = run_backend(model, images, conf=conf)
+        if reference is None:
+            reference = detections
+        map50 = mean_average_precision(detections, reference)
+        report[backend] = {
+            'images': len(images),
+            'mean_latency_ms': round(float(latencies.mean()) * 1000, 2),
+            'p95_latency_ms': round(float(np.percentile(latencies, 95)) * 1000, 2),
+            'speedup_vs_pytorch': None,
+            'detections': int(sum(len(d) for d in detections)),
+            'map50_vs_pytorch': round(map50, 4),
+            'map50_drift': round(1.0 - map50, 4)
+        }
+
+    baseline = report[PYTORCH]['mean_latency_ms']
+    for stats in report.values():
+        if 'mean_latency_ms' in stats and stats['mean_latency_ms']:
+            stats['speedup_vs_pytorch'] = round(baseline / stats['mean_latency_ms'], 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare YOLO inference backends on local images')
+    parser.add_argument('weights', help='PyTorch .pt weights to export and compare')
+    parser.add_argument('image_dir', help='Folder of test images')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, help='Backends to compare (default: all installed)')
+    parser.add_argument('--limit', type=int, help='Only use the first N images')
+    args = parser.parse_args()
+
+    report = compare_backends(args.weights, args.image_dir, args.backends, args.limit)
+
+    print(f"\n{'Backend':<12}{'mean ms':>10}{'p95 ms':>10}{'speedup':>10}{'mAP50':>10}{'drift':>10}")
+    for backend, stats in report.items():
+        if 'error' in stats:
+            print(f"{backend:<12}  {stats['error']}")
+            continue
+        print(f"{backend:<12}{stats['mean_latency_ms']:>10}{stats['p95_latency_ms']:>10}"
+              f"{stats['speedup_vs_pytorch']:>10}{stats['map50_vs_pytorch']:>10}{stats['map50_drift']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import re
+import time
+
+import cv2
+
+# Decoder backends selectable per camera (or via LIVE_DETECTION_DECODER)
+DECODER_BACKENDS = {
+    'auto': cv2.CAP_ANY,
+    'ffmpeg': cv2.CAP_FFMPEG,
+    'gstreamer': cv2.CAP_GSTREAMER,
+}
+
+# Main stream -> substream URL rewrites for common IP camera firmwares
+SUBSTREAM_RULES = [
+    (re.compile(r'(/Streaming/Channels/\d*?)01\b', re.IGNORECASE), r'\g<1>02'),  # Hikvision
+    (re.compile(r'([?&]subtype=)0\b', re.IGNORECASE), r'\g<1>1'),                # Dahua / Amcrest
+    (re.compile(r'/stream1\b', re.IGNORECASE), '/stream2'),                       # TP-Link / Tapo
+    (re.compile(r'([_/])main\b', re.IGNORECASE), r'\g<1>sub'),                   # Reolink-style
+]
+
+GSTREAMER_RTSP_PIPELINE = (
+    'rtspsrc location={url} latency=0 ! decodebin ! videoconvert ! '
+    'video/x-raw,format=BGR ! appsink drop=true max-buffers=1 sync=false'
+)
+
+
+def substream_url(url):
+    """The camera's low-resolution substream URL, or None if the format is unknown"""
+    if not isinstance(url, str):
+        return None
+    for pattern, replacement in SUBSTREAM_RULES:
+        rewritten = pattern.sub(replacement, url, count=1)
+        if rewritten != url:
+            return rewritten
+    return None
+
+
+class CameraCapture:
+    """cv2.VideoCapture wrapper that only converts the frames it hands out.
+
+    Every frame is pulled with ``grab()`` so the stream keeps up, but
+    ``retrieve()`` - colour conversion into a BGR array - runs only for
+    frames the sampler marks as due. For network cameras the substream is
+    tried first (falling back to the main stream), and the decoder backend
+    is selectable. Note that ``grab()`` still has to decode inter-coded
+    video, so the substream is where most of the decode CPU is saved.
+    """
+
+    def __init__(self, source, backend='auto', use_substream=True, sampler=None, buffer_size=1):
+        if backend not in DECODER_BACKENDS:
+            raise ValueError(f"Unknown decoder backend: {backend} (expected one of {list(DECODER_BACKENDS)})")
+        self.source = source
+        self.backend = backend
+        self.use_substream = use_substream
+        self.sampler = sampler
+        self.buffer_size = buffer_size
+
+        self.cap = None
+        self.url = None
+        self.is_substream = False
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self.retrieve_time = 0.0
+
+    def open(self):
+        """Open the substream if one exists, else the source itself. Returns True on success"""
+        candidates = []
+        if self.use_substream:
+            substream = substream_url(self.source)
+            if substream:
+                candidates.append((substream, True))
+        candidates.append((self.source, False))
+
+        for url, is_substream in candidates:
+            cap = self._open(url)
+            if cap is not None and cap.isOpened():
+                self.cap, self.url, self.is_substream = cap, url, is_substream
+                self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                self.fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+                return True
+            if cap is not None:
+                cap.release()
+        return False
+
+    def _open(self, url):
+        api = DECODER_BACKENDS[self.backend]
+        if self.backend == 'gstreamer' and isinstance(url, str) and url.lower().startswith('rtsp://'):
+            # appsink with drop=true keeps only the newest decoded frame
+            url = GSTREAMER_RTSP_PIPELINE.format(url=url)
+        try:
+            cap = cv2.VideoCapture(url, api)
+        except cv2.error:
+            return None
+        if self.buffer_size:
+            # Honoured by some backends only; harmless elsewhere
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return cap
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, decode=False):
+        """(ok, frame) - frame is None when the sampler skipped this one.
+
+        ``decode=True`` always returns the frame without consulting the sampler.
+        """
+        if not self.cap.grab():
+            return False, None
+        self.frames_grabbed += 1
+
+        if not decode and self.sampler is not None and not self.sampler.is_due():
+            return True, None
+        return self.retrieve()
+
+    def retrieve(self):
+        started = time.time()
+        ok, frame = self.cap.retrieve()
+        self.retrieve_time += time.time() - started
+        if not ok:
+            return False, None
+        self.frames_decoded += 1
+        return True, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def get_stats(self):
+        return {
+            'url': self.url if isinstance(self.url, int) else re.sub(r'//[^@/]*@', '//***@', str(self.url)),
+            'backend': self.backend,
+            'substream': self.is_substream,
+            'resolution': f"{self.width}x{self.height}",
+            'fps': round(self.fps, 1),
+            'frames_grabbed': self.frames_grabbed,
+            'frames_decoded': self.frames_decoded,
+            'avg_retrieve_ms': round(self.retrieve_time / self.frames_decoded * 1000, 2) if self.frames_decoded else 0
+        }
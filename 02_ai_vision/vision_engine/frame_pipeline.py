@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import deque
+from queue import Empty
+
+
+class DropOldestQueue:
+    """Bounded ring buffer that evicts the oldest item instead of blocking.
+
+    Producers never wait: when the buffer is full the oldest entry is
+    dropped and counted, so consumers always see the most recent items.
+    """
+
+    def __init__(self, maxsize=2):
+        self.maxsize = max(1, int(maxsize))
+        self._items = deque(maxlen=self.maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self.maxsize:
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Pop the oldest item; raises queue.Empty on timeout or once closed and drained"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout=timeout):
+                raise Empty
+            if not self._items:
+                raise Empty
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_stats(self):
+        return {
+            'depth': len(self._items),
+            'capacity': self.maxsize,
+            'received': self.put_count,
+            'dropped': self.dropped
+        }
+
+
+class FramePipeline:
+    """Capture -> inference -> post-processing, each stage on its own thread.
+
+    ``read_frame()`` returns a frame or None when the source is exhausted.
+    ``infer(frame)`` returns detection results (or None to pass the frame
+    through untouched) and ``postprocess(frame, results)`` consumes them.
+    Stages are joined by DropOldestQueues, so a slow stage only ever works
+    on the newest frame instead of a growing backlog.
+
+    When ``postprocess`` is None the caller drives the last stage itself
+    via ``get_result()`` - needed for OpenCV windows, which must be drawn
+    from the main thread.
+    """
+
+    def __init__(self, read_frame, infer, postprocess=None, capture_queue_size=2,
+                 result_queue_size=2, name='camera'):
+        self.read_frame = read_frame
+        self.infer = infer
+        self.postprocess = postprocess
+        self.name = name
+
+        self.capture_queue = DropOldestQueue(capture_queue_size)
+        self.result_queue = DropOldestQueue(result_queue_size)
+
+        self.is_running = False
+        self._threads = []
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self.frames_postprocessed = 0
+        self.inference_time = 0.0   # EWMA seconds per inference call
+        self.result_age = 0.0       # EWMA capture -> post-process delay
+
+    def start(self):
+        self.is_running = True
+        stages = [('capture', self._capture_loop), ('inference', self._inference_loop)]
+        if self.postprocess:
+            stages.append(('postprocess', self._postprocess_loop))
+        self._threads = [
+            threading.Thread(target=target, name=f'{self.name}-{stage}', daemon=True)
+            for stage, target in stages
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self.is_running = False
+        self.capture_queue.close()
+        self.result_queue.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2)
+
+    def wait(self):
+        """Block until the pipeline stops (source exhausted or stop() called)"""
+        for thread in self._threads:
+            thread.join()
+
+    def get_result(self, timeout=None):
+        """Next (frame, results) pair for callers that post-process themselves"""
+        frame, results, captured_at = self.result_queue.get(timeout=timeout)
+        self._record_age(captured_at)
+        return frame, results
+
+    def _capture_loop(self):
+        try:
+            while self.is_running:
+                frame = self.read_frame()
+                if frame is None:
+                    break
+                self.frames_captured += 1
+                self.capture_queue.put((frame, time.time()))
+        except Exception as e:
+            print(f"❌ Capture error ({self.name}): {str(e)}")
+        finally:
+            self.is_running = False
+            self.capture_queue.close()
+
+    def _inference_loop(self):
+        try:
+            while True:
+                try:
+                    frame, captured_at = self.capture_queue.get(timeout=0.5)
+                except Empty:
+                    if not self.is_running:
+                        break
+                    continue
+
+                started = time.time()
+                results = self.infer(frame)
+                if results is not None:
+                    self.frames_inferred += 1
+                    self.inference_time = self._ewma(self.inference_time, time.time() - started)
+                self.result_queue.put((frame, results, captured_at))
+        except Exception as e:
+            print(f"❌ Inference error ({self.name}): {str(e)}")
+            self.is_running = False
+        finally:
+            self.result_queue.close()
+
+    def _postprocess_loop(self):
+        while True:
+            try:
+                frame, results = self.get_result(timeout=0.5)
+            except Empty:
+                if not self.is_running and not len(self.result_queue):
+                    break
+                continue
+            try:
+                self.postprocess(frame, results)
+            except Exception as e:
+                print(f"❌ Post-processing error ({self.name}): {str(e)}")
+
+    def _record_age(self, captured_at):
+        self.frames_postprocessed += 1
+        self.result_age = self._ewma(self.result_age, time.time() - captured_at)
+
+    @staticmethod
+    def _ewma(current, sample, alpha=0.2):
+        return sample if current == 0 else current + alpha * (sample - current)
+
+    def get_stats(self):
+        """Per-stage queue depth, drop counters and latency"""
+        return {
+            'capture': {
+                'frames': self.frames_captured,
+                **self.capture_queue.get_stats()
+            },
+            'inference': {
+                'frames': self.frames_inferred,
+                'avg_inference_ms': round(self.inference_time * 1000, 1),
+                **self.result_queue.get_stats()
+            },
+            'postprocess': {
+                'frames': self.frames_postprocessed,
+                'avg_result_age_ms': round(self.result_age * 1000, 1)
+            }
+        }
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class AdaptiveFrameSampler:
+    """Decide which frames go to YOLO instead of a fixed ``frame_count % 5``.
+
+    The detection stride (run inference on every Nth frame) is steered by
+    three signals:
+
+    * CPU budget - the share of wall time this camera may spend inferring,
+      given the measured inference latency and frame interval.
+    * Target latency - when inference calls take longer than this (e.g. a
+      shared batch scheduler is saturated) the stride backs off, and it
+      recovers once latency falls below the target again.
+    * Scene activity - a cheap frame-difference score on a tiny grayscale
+      thumbnail. Empty roads are sampled up to ``idle_stride_factor`` times
+      less often than busy ones.
+
+    ``is_due`` and ``sample`` may be called from different threads (a
+    capture thread deciding what to decode, an inference thread scoring
+    what it got); the shared counters are guarded by a lock.
+    """
+
+    THUMBNAIL_SIZE = (64, 36)
+
+    def __init__(self, cpu_budget=0.5, target_latency=None, min_stride=1, max_stride=30,
+                 initial_stride=5, idle_motion=0.01, active_motion=0.05, idle_stride_factor=4):
+        self.cpu_budget = cpu_budget
+        self.target_latency = target_latency
+        self.min_stride = max(1, int(min_stride))
+        self.max_stride = max(self.min_stride, int(max_stride))
+        self.idle_motion = idle_motion
+        self.active_motion = max(active_motion, idle_motion + 1e-6)
+        self.idle_stride_factor = idle_stride_factor
+
+        self.stride = min(max(int(initial_stride), self.min_stride), self.max_stride)
+        self.frames_since_sample = self.stride - 1  # sample the very first frame
+        self.frame_interval = 0.0   # EWMA seconds between frames
+        self.inference_time = 0.0   # EWMA seconds per inference
+        self.motion = 0.0
+        self.load_factor = 1.0
+
+        self.frames_seen = 0
+        self.frames_sampled = 0
+        self._last_frame_at = None
+        self._last_thumbnail = None
+        self._lock = threading.Lock()
+
+    def is_due(self):
+        """Count a frame and report whether it should be sampled.
+
+        A due frame restarts the stride count right away, so frames
+        grabbed while its inference is still running are not due as well.
+        Needs no pixels, so callers can use it to skip decoding frames
+        that will not be inferred.
+        """
+        now = time.time()
+        with self._lock:
+            if self._last_frame_at is not None:
+                self.frame_interval = self._ewma(self.frame_interval, now - self._last_frame_at)
+            self._last_frame_at = now
+            self.frames_seen += 1
+            self.frames_since_sample += 1
+            if self.frames_since_sample < self.stride:
+                return False
+            self.frames_since_sample = 0
+            self.frames_sampled += 1
+            return True
+
+    def should_infer(self, frame):
+        """True if this frame should go to the detector"""
+        if not self.is_due():
+            return False
+        self.sample(frame)
+        return True
+
+    def sample(self, frame):
+        """Retune the stride from the motion score of a frame ``is_due`` picked"""
+        motion = self.motion_score(frame)
+        with self._lock:
+            self.motion = motion
+            self.stride = self._next_stride()
+
+    def record_inference(self, seconds):
+        """Feed back how long the last inference call took"""
+        with self._lock:
+            self.inference_time = self._ewma(self.inference_time, seconds)
+            if self.target_latency:
+                # Gentle multiplicative correction towards the target latency
+                ratio = self.inference_time / self.target_latency
+                self.load_factor = min(max(self.load_factor * ratio ** 0.5, 1.0), float(self.max_stride))
+
+    def motion_score(self, frame):
+        """Mean absolute difference (0-1) against the previously sampled frame (inference thread only)"""
+        thumbnail = cv2.resize(frame, self.THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        if thumbnail.ndim == 3:
+            thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+
+        previous, self._last_thumbnail = self._last_thumbnail, thumbnail
+        if previous is None:
+            return 1.0  # nothing to compare against yet, treat as active
+        return float(np.mean(cv2.absdiff(thumbnail, previous))) / 255.0
+
+    def _next_stride(self):
+        stride = float(self.min_stride)
+
+        # Stride needed to keep inference inside the CPU budget
+        if self.cpu_budget and self.frame_interval and self.inference_time:
+            stride = max(stride, self.inference_time / (self.frame_interval * self.cpu_budget))
+        stride *= self.load_factor
+
+        # 0 for an idle scene, 1 for a busy one
+        activity = (self.motion - self.idle_motion) / (self.active_motion - self.idle_motion)
+        activity = min(max(activity, 0.0), 1.0)
+        stride *= self.idle_stride_factor ** (1.0 - activity)
+
+        return int(min(max(round(stride), self.min_stride), self.max_stride))
+
+    @staticmethod
+    def _ewma(current, sample, alpha=0.2):
+        return sample if current == 0 else current + alpha * (sample - current)
+
+    def get_stats(self):
+        return {
+            'stride': self.stride,
+            'motion_score': round(self.motion, 4),
+            'frames_seen': self.frames_seen,
+            'frames_sampled': self.frames_sampled,
+            'sample_rate': round(self.frames_sampled / self.frames_seen, 3) if self.frames_seen else 0,
+            'avg_inference_ms': round(self.inference_time * 1000, 1),
+            'avg_frame_interval_ms': round(self.frame_interval * 1000, 1),
+            'load_factor': round(self.load_factor, 2)
+        }
@@ -0,0 +1,83 @@
+import os
+
+from ultralytics import YOLO
+
+try:
+    import onnxruntime
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    import openvino
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    OPENVINO_AVAILABLE = False
+
+# Values match AIModel.INFERENCE_BACKENDS
+PYTORCH = 'pytorch'
+ONNX = 'onnx'
+ONNX_INT8 = 'onnx_int8'
+OPENVINO = 'openvino'
+BACKENDS = (PYTORCH, ONNX, ONNX_INT8, OPENVINO)
+
+
+def available_backends():
+    """Backends whose runtime is installed on this machine"""
+    backends = [PYTORCH]
+    if ONNXRUNTIME_AVAILABLE:
+        backends += [ONNX, ONNX_INT8]
+    if OPENVINO_AVAILABLE:
+        backends.append(OPENVINO)
+    return backends
+
+
+def export_weights(weights, backend, imgsz=640):
+    """Export PyTorch ``weights`` for ``backend`` and return the exported path.
+
+    Exports are written next to the .pt file and reused on later calls.
+    ONNX models use a dynamic batch axis so the batch scheduler and the
+    batch endpoint can feed them several frames at once.
+    """
+    if backend == PYTORCH:
+        return weights
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    stem, _ = os.path.splitext(weights)
+    if backend in (ONNX, ONNX_INT8):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed")
+        onnx_path = f"{stem}.onnx"
+        if not os.path.exists(onnx_path):
+            onnx_path = YOLO(weights).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+        if backend == ONNX:
+            return onnx_path
+
+        int8_path = f"{stem}_int8.onnx"
+        if not os.path.exists(int8_path):
+            quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+        return int8_path
+
+    if not OPENVINO_AVAILABLE:
+        raise RuntimeError("openvino is not installed")
+    openvino_dir = f"{stem}_openvino_model"
+    if not os.path.exists(openvino_dir):
+        openvino_dir = YOLO(weights).export(format='openvino', imgsz=imgsz)
+    return openvino_dir
+
+
+def load_model(weights, backend=PYTORCH, imgsz=640):
+    """Load ``weights`` on ``backend``, falling back to PyTorch if that fails.
+
+    Returns ``(model, backend_used)``. Every backend is wrapped by
+    ultralytics' YOLO class, so results and post-processing are identical;
+    ONNX models run on onnxruntime's CPU execution provider.
+    """
+    if backend and backend != PYTORCH:
+        try:
+            return YOLO(export_weights(weights, backend, imgsz=imgsz), task='detect'), backend
+        except Exception as e:
+            print(f"⚠️ {backend} backend unavailable for {weights} ({e}), falling back to PyTorch")
+    return YOLO(weights), PYTORCH
@@ -0,0 +1,167 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchInferenceScheduler:
+    """Share one YOLO model between many cameras by batching their frames.
+
+    Each registered camera holds at most one pending frame. A worker thread
+    wakes up when frames arrive, waits up to ``max_wait`` seconds for more
+    cameras to report in, then runs a single forward pass over at most
+    ``max_batch_size`` frames and hands each camera its own result.
+    """
+
+    def __init__(self, model, max_batch_size=8, max_wait=0.05, **predict_kwargs):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self.predict_kwargs = {'verbose': False, **predict_kwargs}
+
+        self._cameras = {}
+        self._pending = {}  # camera_id -> (frame, future, submitted_at)
+        self._order = []    # camera ids with a pending frame, oldest first
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        self.batches_run = 0
+        self.frames_inferred = 0
+        self.frames_replaced = 0
+        self.last_batch_size = 0
+        self.last_batch_time = 0.0
+
+    def register_camera(self, camera_id, on_result=None):
+        """Register a camera; ``on_result(results)`` is called after each batch"""
+        with self._cond:
+            self._cameras[camera_id] = on_result
+        self.start()
+
+    def unregister_camera(self, camera_id):
+        """Forget a camera and cancel any frame it still has queued"""
+        with self._cond:
+            self._cameras.pop(camera_id, None)
+            pending = self._pending.pop(camera_id, None)
+            if camera_id in self._order:
+                self._order.remove(camera_id)
+        if pending:
+            pending[1].cancel()
+
+    def submit(self, camera_id, frame):
+        """Queue a frame for the next batch and return a Future for its results.
+
+        A camera that submits again before its previous frame was picked up
+        replaces it, so a slow tick never builds a backlog of stale frames.
+        """
+        future = Future()
+        with self._cond:
+            if camera_id not in self._cameras:
+                raise KeyError(f"Camera {camera_id!r} is not registered")
+            replaced = self._pending.pop(camera_id, None)
+            if replaced:
+                self._order.remove(camera_id)
+                self.frames_replaced += 1
+            self._pending[camera_id] = (frame, future, time.time())
+            self._order.append(camera_id)
+            self._cond.notify()
+        if replaced:
+            replaced[1].cancel()
+
+        callback = self._cameras.get(camera_id)
+        if callback:
+            future.add_done_callback(lambda f: None if f.cancelled() or f.exception() else callback(f.result()))
+        return future
+
+    def infer(self, camera_id, frame, timeout=None):
+        """Blocking helper: submit a frame and wait for its results"""
+        return self.submit(camera_id, frame).result(timeout=timeout)
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='batch-inference', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._order.clear()
+            self._cond.notify_all()
+        for _, future, _ in pending:
+            future.cancel()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def _collect_batch(self):
+        """Wait for frames, then gather up to max_batch_size of them"""
+        with self._cond:
+            while self._running and not self._order:
+                self._cond.wait(timeout=0.5)
+            if not self._running:
+                return []
+
+            # Give other cameras a chance to join this tick
+            deadline = self._pending[self._order[0]][2] + self.max_wait
+            while self._running and len(self._order) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(timeout=remaining)
+
+            batch = []
+            for camera_id in self._order[:self.max_batch_size]:
+                frame, future, _ = self._pending.pop(camera_id)
+                batch.append((camera_id, frame, future))
+            del self._order[:len(batch)]
+            return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect_batch()
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.time()
+            try:
+                results = self.model([frame for _, frame, _ in batch], **self.predict_kwargs)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.frames_inferred += len(batch)
+            self.last_batch_size = len(batch)
+            self.last_batch_time = time.time() - started
+
+            # YOLO returns one Results object per input image, in order
+            results = list(results)
+            for (_, _, future), result in zip(batch, results):
+                future.set_result([result])
+            # Never leave a camera waiting on a frame the model dropped
+            for _, _, future in batch[len(results):]:
+                future.set_exception(RuntimeError(
+                    f"Model returned {len(results)} results for a batch of {len(batch)} frames"))
+
+    def get_stats(self):
+        """Scheduler counters for the live stats endpoint"""
+        with self._cond:
+            cameras = len(self._cameras)
+            queued = len(self._order)
+        return {
+            'registered_cameras': cameras,
+            'queued_frames': queued,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': round(self.max_wait * 1000, 1),
+            'batches_run': self.batches_run,
+            'frames_inferred': self.frames_inferred,
+            'frames_replaced': self.frames_replaced,
+            'avg_batch_size': round(self.frames_inferred / self.batches_run, 2) if self.batches_run else 0,
+            'last_batch_size': self.last_batch_size,
+            'last_batch_ms': round(self.last_batch_time * 1000, 1)
+        }
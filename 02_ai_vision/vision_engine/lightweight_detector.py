@@ -1,12 +1,14 @@
 ﻿import cv2
 import numpy as np
-from ultralytics import YOLO
 from datetime import datetime
+from model_registry import get_model
+from postprocess import extract_detections
 
 class LightweightTrafficAnalyzer:
     def __init__(self):
         # Use tiny YOLO model - 5MB download, works on CPU!
-        self.model = YOLO('yolov8n.pt')  # 'n' = nano version
+        # Shared through the registry, so creating analyzers is cheap
+        self.model = get_model('yolov8n.pt')  # 'n' = nano version
         self.vehicle_classes = [2, 3, 5, 7]  # car, motorcycle, bus, truck
         
     def analyze_traffic(self, camera_source=0):  # 0 = default webcam
@@ -39,12 +41,9 @@ class LightweightTrafficAnalyzer:
         }
     
     def count_vehicles(self, results):
-        count = 0
-        if results and results[0].boxes is not None:
-            for box in results[0].boxes:
-                if int(box.cls) in self.vehicle_classes and box.conf > 0.5:
-                    count += 1
-        return count
+        if not results:
+            return 0
+        return len(extract_detections(results[0], class_ids=self.vehicle_classes, min_conf=0.5))
 
 # Test function
 def test_vision():
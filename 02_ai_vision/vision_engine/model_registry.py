@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from inference_backends import PYTORCH, load_model
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def _process_memory():
+    """Current resident memory of this process in bytes, or None without psutil"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process(os.getpid()).memory_info().rss
+    return None
+
+
+class SharedModel:
+    """One loaded YOLO instance shared by every caller in the process.
+
+    Ultralytics predictors keep per-call state, so inference is serialized
+    with a lock. Attribute access (``names``, ``export`` ...) passes through
+    to the wrapped model.
+    """
+
+    def __init__(self, key, weights, model, load_time, memory_bytes, backend=PYTORCH):
+        self.key = key
+        self.weights = weights
+        self.backend = backend
+        self.model = model
+        self.load_time = load_time
+        self.memory_bytes = memory_bytes
+        self.warmup_time = None
+        self.inference_count = 0
+        self.loaded_at = time.time()
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.inference_count += 1
+            return self.model(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def warmup(self, imgsz=640):
+        """Run one dummy inference so the first real request is not the slow one"""
+        started = time.time()
+        with self._lock:
+            self.model(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), verbose=False)
+        self.warmup_time = time.time() - started
+        return self.warmup_time
+
+    def get_stats(self):
+        return {
+            'key': self.key,
+            'weights': self.weights,
+            'backend': self.backend,
+            'load_time_ms': round(self.load_time * 1000, 1),
+            'warmup_time_ms': round(self.warmup_time * 1000, 1) if self.warmup_time is not None else None,
+            'memory_mb': round(self.memory_bytes / (1024 * 1024), 1) if self.memory_bytes is not None else None,
+            'inference_count': self.inference_count,
+            'loaded_at': self.loaded_at
+        }
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded detection models.
+
+    Models are keyed by the resolved weight file and inference backend, so
+    relative paths, symlinks and ``AIModel`` rows (which carry their own
+    ``inference_backend``) naming the same file share one instance. Each
+    model is loaded once, warmed up, and handed out as a SharedModel.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, source, backend=None):
+        """Map a weight path or AIModel row to (registry key, weight path, backend)"""
+        if hasattr(source, 'model_type'):
+            if source.model_file:
+                weights = source.model_file.path
+            else:
+                weights = f"{source.model_type}.pt"
+            backend = backend or getattr(source, 'inference_backend', None) or PYTORCH
+        else:
+            weights = os.fspath(source)
+            backend = backend or PYTORCH
+        return f"{os.path.realpath(weights)}:{backend}", weights, backend
+
+    def get(self, source, warmup=True, backend=None):
+        """Return the shared model for ``source``, loading it on first use"""
+        key, weights, backend = self.resolve(source, backend)
+
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        # Per-key lock: concurrent first requests load once, other models are not blocked
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(key, weights, backend, warmup)
+                self._models[key] = model
+        return model
+
+    def _load(self, key, weights, backend, warmup):
+        memory_before = _process_memory()
+        started = time.time()
+        yolo, backend_used = load_model(weights, backend)
+        load_time = time.time() - started
+
+        memory_bytes = max(0, _process_memory() - memory_before) if memory_before is not None else None
+        model = SharedModel(key, weights, yolo, load_time, memory_bytes, backend=backend_used)
+        if warmup:
+            model.warmup()
+        memory = f"{memory_bytes / (1024 * 1024):.0f}MB" if memory_bytes is not None else "memory n/a"
+        print(f"✅ Model loaded: {weights} on {backend_used} ({model.load_time * 1000:.0f}ms load, {memory})")
+        return model
+
+    def unload(self, source, backend=None):
+        key, _, _ = self.resolve(source, backend)
+        with self._lock:
+            self._loading.pop(key, None)
+            return self._models.pop(key, None) is not None
+
+    def get_stats(self):
+        return [model.get_stats() for model in list(self._models.values())]
+
+
+# Global registry instance
+registry = ModelRegistry()
+
+
+def get_model(source, warmup=True, backend=None):
+    """Shortcut for ``registry.get``"""
+    return registry.get(source, warmup=warmup, backend=backend)
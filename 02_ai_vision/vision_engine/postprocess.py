@@ -0,0 +1,113 @@
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+# Compact per-detection record: class id, confidence and xyxy box
+DETECTION_DTYPE = np.dtype([
+    ('cls', np.int16),
+    ('conf', np.float32),
+    ('x1', np.float32),
+    ('y1', np.float32),
+    ('x2', np.float32),
+    ('y2', np.float32),
+])
+
+BOX_FIELDS = ['x1', 'y1', 'x2', 'y2']
+
+# COCO ids for car, motorcycle, bus, truck
+VEHICLE_CLASS_IDS = (2, 3, 5, 7)
+
+
+def _to_numpy(values):
+    """Torch tensor (any device) or array-like -> NumPy array"""
+    if hasattr(values, 'cpu'):
+        values = values.cpu()
+    if hasattr(values, 'numpy'):
+        values = values.numpy()
+    return np.asarray(values)
+
+
+def class_ids_for(names, class_names):
+    """Model class ids whose name is in ``class_names`` (``names`` is YOLO's id -> name map)"""
+    wanted = set(class_names)
+    return np.array(sorted(cls for cls, name in names.items() if name in wanted), dtype=np.int16)
+
+
+def extract_detections(result, class_ids=None, min_conf=0.0, scale=None):
+    """Turn one YOLO result into a structured DETECTION_DTYPE array.
+
+    Class filtering, confidence thresholding and rescaling of boxes (e.g.
+    from a downsized inference frame back to the original) happen as whole
+    array operations instead of a Python loop over ``result.boxes``.
+    ``scale`` is an ``(sx, sy)`` pair.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty(0, dtype=DETECTION_DTYPE)
+
+    cls = _to_numpy(boxes.cls).astype(np.int16, copy=False)
+    conf = _to_numpy(boxes.conf).astype(np.float32, copy=False)
+    xyxy = _to_numpy(boxes.xyxy).astype(np.float32, copy=False).reshape(-1, 4)
+
+    keep = conf >= min_conf
+    if class_ids is not None:
+        keep &= np.isin(cls, class_ids)
+
+    detections = np.empty(int(keep.sum()), dtype=DETECTION_DTYPE)
+    detections['cls'] = cls[keep]
+    detections['conf'] = conf[keep]
+    kept_boxes = xyxy[keep]
+    if scale is not None:
+        kept_boxes = kept_boxes * np.array([scale[0], scale[1], scale[0], scale[1]], dtype=np.float32)
+    for i, field in enumerate(BOX_FIELDS):
+        detections[field] = kept_boxes[:, i]
+    return detections
+
+
+def boxes_of(detections):
+    """(N, 4) float array of xyxy boxes"""
+    return structured_to_unstructured(detections[BOX_FIELDS])
+
+
+def centers_of(detections):
+    """(N, 2) float array of box centres"""
+    return np.stack([
+        (detections['x1'] + detections['x2']) / 2,
+        (detections['y1'] + detections['y2']) / 2,
+    ], axis=1)
+
+
+def count_by_class(detections, num_classes=0):
+    """Detections per class id, as a bincount array"""
+    return np.bincount(detections['cls'], minlength=num_classes)
+
+
+def counts_by_name(detections, names):
+    """{'car': 3, 'motorcycle': 12, ...} for the classes present"""
+    counts = count_by_class(detections)
+    return {names[int(cls)]: int(counts[cls]) for cls in np.flatnonzero(counts)}
+
+
+def to_dicts(detections, names, decimals=2):
+    """JSON-ready list of {'vehicle', 'confidence', 'bbox'} dicts"""
+    labels = [names[int(cls)] for cls in detections['cls']]
+    confidences = np.round(detections['conf'].astype(np.float64), decimals).tolist()
+    boxes = boxes_of(detections).astype(np.float64).tolist()
+    return [
+        {'vehicle': label, 'confidence': conf, 'bbox': bbox}
+        for label, conf, bbox in zip(labels, confidences, boxes)
+    ]
+
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes, as an (N, M) matrix"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
@@ -0,0 +1,217 @@
+import cv2
+import numpy as np
+
+from postprocess import DETECTION_DTYPE, box_iou, extract_detections
+
+# Raster value for pixels that belong to no lane
+NO_LANE = -1
+
+
+def _polygon_array(points):
+    return np.asarray(points, dtype=np.float32).reshape(-1, 2)
+
+
+def _reference_size(size):
+    if not size:
+        return None
+    if len(size) != 2 or not all(isinstance(v, int) and not isinstance(v, bool) and v > 0 for v in size):
+        raise ValueError(f"reference_size must be [width, height] in pixels, got {size!r}")
+    return tuple(size)
+
+
+def nms(detections, iou_threshold=0.5):
+    """Class-aware non-maximum suppression over a DETECTION_DTYPE array.
+
+    Only needed when overlapping tiles report the same vehicle twice.
+    """
+    if len(detections) < 2:
+        return detections
+
+    order = np.argsort(-detections['conf'], kind='stable')
+    detections = detections[order]
+    boxes = np.stack([detections[f] for f in ('x1', 'y1', 'x2', 'y2')], axis=1)
+    overlap = box_iou(boxes, boxes) > iou_threshold
+    overlap &= detections['cls'][:, None] == detections['cls'][None, :]
+
+    keep = np.ones(len(detections), dtype=bool)
+    for i in range(len(detections)):
+        if keep[i]:
+            suppressed = overlap[i].copy()
+            suppressed[:i + 1] = False
+            keep &= ~suppressed
+    return detections[keep]
+
+
+class _Geometry:
+    """Masks and rectangles for one frame size, built once and reused"""
+
+    def __init__(self, regions, height, width):
+        sx, sy = regions.scale_for(width, height)
+        scale = np.array([sx, sy], dtype=np.float32)
+        size = (height, width)
+
+        if regions.rois:
+            self.roi_mask = np.zeros(size, dtype=np.uint8)
+            polygons = [np.round(p * scale).astype(np.int32) for p in regions.rois]
+            cv2.fillPoly(self.roi_mask, polygons, 1)
+            ys, xs = np.nonzero(self.roi_mask)
+            if len(xs):
+                self.crop_rect = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+            else:
+                self.crop_rect = (0, 0, width, height)
+        else:
+            self.roi_mask = None
+            self.crop_rect = (0, 0, width, height)
+
+        # Lane index per pixel; later polygons win where lanes overlap
+        self.lane_raster = np.full(size, NO_LANE, dtype=np.int16)
+        for index, polygon in enumerate(regions.lanes.values()):
+            cv2.fillPoly(self.lane_raster, [np.round(polygon * scale).astype(np.int32)], index)
+
+        self.tiles = self._tile_rects(regions.tile_size, regions.tile_overlap)
+
+        x1, y1, x2, y2 = self.crop_rect
+        self.pixel_fraction = (x2 - x1) * (y2 - y1) / float(width * height)
+
+    def _tile_rects(self, tile_size, overlap):
+        x1, y1, x2, y2 = self.crop_rect
+        if not tile_size:
+            return [self.crop_rect]
+
+        def starts(lo, hi):
+            if hi - lo <= tile_size:
+                return [lo]
+            step = max(int(tile_size * (1 - overlap)), 1)
+            positions = list(range(lo, hi - tile_size, step)) + [hi - tile_size]
+            return sorted(set(positions))
+
+        return [
+            (tx, ty, min(tx + tile_size, x2), min(ty + tile_size, y2))
+            for ty in starts(y1, y2) for tx in starts(x1, x2)
+        ]
+
+
+class CameraRegions:
+    """Per-camera regions of interest and lane polygons.
+
+    Inference runs only on the bounding rectangle of the ROI polygons
+    (optionally split into overlapping tiles), with pixels outside the
+    polygons blanked. Detections are shifted back to full-frame
+    coordinates, dropped if they fall outside the ROI, and assigned to a
+    lane by looking up their ground point (bottom centre of the box) in a
+    precomputed lane raster.
+
+    Polygons are given in pixels of ``reference_size`` (width, height) and
+    rescaled to whatever frame size the camera actually delivers, so the
+    same config works for the main stream and the substream.
+    """
+
+    def __init__(self, rois=None, lanes=None, reference_size=None, tile_size=None,
+                 tile_overlap=0.2, mask_outside=True):
+        self.rois = [_polygon_array(p) for p in (rois or [])]
+        self.lanes = {name: _polygon_array(p) for name, p in (lanes or {}).items()}
+        self.lane_names = list(self.lanes)
+        self.reference_size = _reference_size(reference_size)
+        self.tile_size = int(tile_size) if tile_size else None
+        self.tile_overlap = tile_overlap
+        self.mask_outside = mask_outside
+        self._geometry = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """Build from a JSON-style dict (see ``to_config``)"""
+        return cls(
+            rois=config.get('rois'),
+            lanes=config.get('lanes'),
+            reference_size=config.get('reference_size'),
+            tile_size=config.get('tile_size'),
+            tile_overlap=config.get('tile_overlap', 0.2),
+            mask_outside=config.get('mask_outside', True)
+        )
+
+    def to_config(self):
+        return {
+            'rois': [p.tolist() for p in self.rois],
+            'lanes': {name: p.tolist() for name, p in self.lanes.items()},
+            'reference_size': list(self.reference_size) if self.reference_size else None,
+            'tile_size': self.tile_size,
+            'tile_overlap': self.tile_overlap,
+            'mask_outside': self.mask_outside
+        }
+
+    def scale_for(self, width, height):
+        if not self.reference_size:
+            return 1.0, 1.0
+        return width / float(self.reference_size[0]), height / float(self.reference_size[1])
+
+    def geometry(self, frame_shape):
+        height, width = frame_shape[:2]
+        geometry = self._geometry.get((height, width))
+        if geometry is None:
+            geometry = self._geometry[(height, width)] = _Geometry(self, height, width)
+        return geometry
+
+    def crops(self, frame):
+        """(image, (x_offset, y_offset)) per tile to send to the detector"""
+        geometry = self.geometry(frame.shape)
+        if self.mask_outside and geometry.roi_mask is not None:
+            x1, y1, x2, y2 = geometry.crop_rect
+            region = cv2.bitwise_and(frame[y1:y2, x1:x2], frame[y1:y2, x1:x2],
+                                     mask=geometry.roi_mask[y1:y2, x1:x2])
+            return [
+                (region[ty1 - y1:ty2 - y1, tx1 - x1:tx2 - x1], (tx1, ty1))
+                for tx1, ty1, tx2, ty2 in geometry.tiles
+            ]
+        # Slicing returns views, so unmasked crops cost no copy
+        return [(frame[ty1:ty2, tx1:tx2], (tx1, ty1)) for tx1, ty1, tx2, ty2 in geometry.tiles]
+
+    def merge(self, frame_shape, results, offsets, class_ids=None, min_conf=0.0, iou_threshold=0.5):
+        """Combine per-tile YOLO results into one full-frame DETECTION_DTYPE array"""
+        parts = []
+        for result, (x_offset, y_offset) in zip(results, offsets):
+            detections = extract_detections(result, class_ids=class_ids, min_conf=min_conf)
+            detections['x1'] += x_offset
+            detections['x2'] += x_offset
+            detections['y1'] += y_offset
+            detections['y2'] += y_offset
+            parts.append(detections)
+
+        detections = np.concatenate(parts) if parts else np.empty(0, dtype=DETECTION_DTYPE)
+        if len(offsets) > 1:
+            detections = nms(detections, iou_threshold)
+
+        geometry = self.geometry(frame_shape)
+        if geometry.roi_mask is not None and len(detections):
+            xs, ys = self._ground_points(detections, frame_shape)
+            detections = detections[geometry.roi_mask[ys, xs].astype(bool)]
+        return detections
+
+    def lanes_of(self, detections, frame_shape):
+        """Lane index (NO_LANE if none) for each detection's ground point"""
+        if not self.lanes or len(detections) == 0:
+            return np.full(len(detections), NO_LANE, dtype=np.int16)
+        xs, ys = self._ground_points(detections, frame_shape)
+        return self.geometry(frame_shape).lane_raster[ys, xs]
+
+    def lane_labels(self, lane_indices):
+        return [self.lane_names[i] if i != NO_LANE else None for i in lane_indices.tolist()]
+
+    @staticmethod
+    def _ground_points(detections, frame_shape):
+        height, width = frame_shape[:2]
+        xs = np.clip(((detections['x1'] + detections['x2']) / 2).astype(np.int32), 0, width - 1)
+        ys = np.clip((detections['y2'] - 1).astype(np.int32), 0, height - 1)
+        return xs, ys
+
+    def get_stats(self, frame_shape=None):
+        stats = {
+            'rois': len(self.rois),
+            'lanes': self.lane_names,
+            'tile_size': self.tile_size
+        }
+        if frame_shape is not None:
+            geometry = self.geometry(frame_shape)
+            stats['tiles'] = len(geometry.tiles)
+            stats['crop_rect'] = geometry.crop_rect
+            stats['pixel_fraction'] = round(geometry.pixel_fraction, 3)
+        return stats
@@ -0,0 +1,139 @@
+import numpy as np
+
+from postprocess import box_iou
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+class MultiObjectTracker:
+    """Frame-to-frame vehicle tracker with vectorized data association.
+
+    Track state is kept in parallel NumPy arrays. Each update builds the
+    full detection x track cost matrix in one step (centroid distance or
+    1 - IoU), blocks pairs of different classes or beyond the gate, then
+    solves the assignment with the Hungarian algorithm (scipy) or a greedy
+    lowest-cost-first pass. Unmatched detections start new tracks; tracks
+    unseen for ``remove_after`` frames are dropped.
+    """
+
+    def __init__(self, metric='centroid', max_distance=50.0, min_iou=0.3, max_age=30,
+                 remove_after=60, class_gating=True, method='hungarian'):
+        if metric not in ('centroid', 'iou'):
+            raise ValueError(f"Unknown tracking metric: {metric}")
+        self.metric = metric
+        self.max_distance = max_distance
+        self.min_iou = min_iou
+        self.max_age = max_age              # frames a track may go unseen and still be matched
+        self.remove_after = max(remove_after, max_age)
+        self.class_gating = class_gating
+        self.method = method if SCIPY_AVAILABLE else 'greedy'
+
+        self.next_id = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.boxes = np.empty((0, 4), dtype=np.float32)
+        self.classes = np.empty(0, dtype=object)
+        self.first_seen = np.empty(0, dtype=np.int64)
+        self.last_seen = np.empty(0, dtype=np.int64)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.removed_ids = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _centers(boxes):
+        return (boxes[:, :2] + boxes[:, 2:]) / 2
+
+    def cost_matrix(self, boxes, classes, frame_num):
+        """(detections, tracks) association cost; np.inf marks forbidden pairs"""
+        if self.metric == 'iou':
+            cost = 1.0 - box_iou(boxes, self.boxes)
+            gated = cost > 1.0 - self.min_iou
+        else:
+            delta = self._centers(boxes)[:, None, :] - self._centers(self.boxes)[None, :, :]
+            cost = np.sqrt(np.einsum('ijk,ijk->ij', delta, delta))
+            gated = cost >= self.max_distance
+
+        gated |= (frame_num - self.last_seen > self.max_age)[None, :]
+        if self.class_gating:
+            gated |= classes[:, None] != self.classes[None, :]
+        return np.where(gated, np.inf, cost)
+
+    def _assign(self, cost):
+        """Matched (detection_idx, track_idx) arrays for a cost matrix"""
+        if cost.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        finite = np.isfinite(cost)
+        if self.method == 'hungarian':
+            padded = np.where(finite, cost, 1e9)
+            rows, cols = linear_sum_assignment(padded)
+            keep = finite[rows, cols]
+            return rows[keep], cols[keep]
+
+        # Greedy: accept the cheapest remaining pair whose row and column are still free
+        rows, cols = np.nonzero(finite)
+        order = np.argsort(cost[rows, cols], kind='stable')
+        row_taken = np.zeros(cost.shape[0], dtype=bool)
+        col_taken = np.zeros(cost.shape[1], dtype=bool)
+        matched_rows, matched_cols = [], []
+        for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+            if row_taken[r] or col_taken[c]:
+                continue
+            row_taken[r] = col_taken[c] = True
+            matched_rows.append(r)
+            matched_cols.append(c)
+        return np.array(matched_rows, dtype=np.int64), np.array(matched_cols, dtype=np.int64)
+
+    def update(self, boxes, classes, frame_num):
+        """Associate this frame's detections with tracks.
+
+        ``boxes`` is an (N, 4) xyxy array and ``classes`` any N labels (class
+        ids or names). Returns the track id assigned to each detection;
+        ids of tracks dropped by this update are left in ``removed_ids``.
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        classes = np.asarray(classes, dtype=object).reshape(-1)
+        track_ids = np.empty(len(boxes), dtype=np.int64)
+
+        det_idx, trk_idx = self._assign(self.cost_matrix(boxes, classes, frame_num))
+        track_ids[det_idx] = self.ids[trk_idx]
+        self.boxes[trk_idx] = boxes[det_idx]
+        self.last_seen[trk_idx] = frame_num
+        self.hits[trk_idx] += 1
+
+        # Track birth for everything left unmatched
+        unmatched = np.ones(len(boxes), dtype=bool)
+        unmatched[det_idx] = False
+        births = int(unmatched.sum())
+        if births:
+            new_ids = np.arange(self.next_id, self.next_id + births, dtype=np.int64)
+            self.next_id += births
+            track_ids[unmatched] = new_ids
+            self.ids = np.concatenate([self.ids, new_ids])
+            self.boxes = np.concatenate([self.boxes, boxes[unmatched]])
+            self.classes = np.concatenate([self.classes, classes[unmatched]])
+            self.first_seen = np.concatenate([self.first_seen, np.full(births, frame_num, dtype=np.int64)])
+            self.last_seen = np.concatenate([self.last_seen, np.full(births, frame_num, dtype=np.int64)])
+            self.hits = np.concatenate([self.hits, np.ones(births, dtype=np.int64)])
+
+        # Track death
+        alive = frame_num - self.last_seen <= self.remove_after
+        self.removed_ids = self.ids[~alive]
+        if not alive.all():
+            self.ids = self.ids[alive]
+            self.boxes = self.boxes[alive]
+            self.classes = self.classes[alive]
+            self.first_seen = self.first_seen[alive]
+            self.last_seen = self.last_seen[alive]
+            self.hits = self.hits[alive]
+
+        return track_ids
+
+    def active_tracks(self, frame_num):
+        """Ids of tracks updated in ``frame_num``"""
+        return self.ids[self.last_seen == frame_num]
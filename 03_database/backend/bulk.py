@@ -0,0 +1,63 @@
+"""
+Parsing and validation for bulk traffic_data uploads (JSON arrays or NDJSON)
+"""
+
+import json
+from typing import AsyncIterator, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+MAX_BULK_ROWS = 10000  # 60s of readings from a few hundred controllers
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def is_ndjson(content_type: str) -> bool:
+    return any(kind in (content_type or "") for kind in NDJSON_TYPES)
+
+
+async def read_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line index, parsed object or ValueError) from a streamed NDJSON body"""
+    buffer = b""
+    index = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _parse_line(line)
+                index += 1
+    if buffer.strip():
+        yield index, _parse_line(buffer)
+
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+def validate_row(index: int, row, model: Type[BaseModel]):
+    """(model instance, None) or (None, per-row error dict)"""
+    if isinstance(row, ValueError):
+        return None, {"index": index, "errors": [{"loc": [], "msg": str(row)}]}
+    try:
+        return model.model_validate(row), None
+    except ValidationError as e:
+        return None, {
+            "index": index,
+            "errors": [{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()]
+        }
+
+
+def validate_rows(indexed_rows, model: Type[BaseModel]) -> Tuple[List[BaseModel], List[dict]]:
+    """Validate (index, row) pairs, e.g. ``enumerate(array)`` or read_ndjson output"""
+    valid, errors = [], []
+    for index, row in indexed_rows:
+        item, error = validate_row(index, row, model)
+        if error:
+            errors.append(error)
+        else:
+            valid.append(item)
+    return valid, errors
@@ -1,20 +1,74 @@
 from typing import List, Optional, Union
+from backend.bulk import validate_rows
+from backend.ingest_buffer import IngestBuffer
 from backend.database.config import DatabaseConfig
 from backend.models.base import TrafficDataMongo, TrafficDataBase
 
 if DatabaseConfig.DATABASE_TYPE == "mongodb":
     from backend.database.mongo_db import traffic_data_collection
     from bson import ObjectId
+elif DatabaseConfig.DATABASE_TYPE == "postgresql":
+    from backend.database.postgres_db import engine
+
+# Column order used for COPY into traffic_data
+COPY_COLUMNS = ["intersection_id", "vehicle_count", "average_speed", "traffic_light_id", "timestamp"]
 
 class TrafficCRUD:
-    async def create_traffic_data(self, data: Union[TrafficDataBase, TrafficDataMongo]):
+    def __init__(self):
+        # Write-behind group commit for single readings, off until enabled
+        self.buffer: Optional[IngestBuffer] = None
+    
+    async def enable_write_behind(self, **buffer_options):
+        """Queue create_traffic_data calls and write them in batches (call from a running loop)"""
+        if self.buffer is None:
+            self.buffer = IngestBuffer(self._write_many, **buffer_options)
+            await self.buffer.start()
+    
+    async def disable_write_behind(self):
+        """Flush queued readings and go back to one write per call"""
+        if self.buffer is not None:
+            await self.buffer.stop()
+            self.buffer = None
+    
+    async def create_traffic_data(self, data: Union[TrafficDataBase, TrafficDataMongo], durable: bool = False):
+        if self.buffer is not None:
+            # Returns the new id only when durable; otherwise None once queued
+            return await self.buffer.submit(data, durable=durable)
         if DatabaseConfig.DATABASE_TYPE == "mongodb":
             data_dict = data.dict(by_alias=True) if hasattr(data, 'dict') else data
             result = await traffic_data_collection.insert_one(data_dict)
             return str(result.inserted_id)
         else:
-            # PostgreSQL implementation would go here
-            pass
+            return (await self._write_many([data]))[0]
+    
+    async def _write_many(self, rows: List[TrafficDataBase]) -> list:
+        """One round trip for validated readings; returns one id per row (None for COPY)"""
+        if DatabaseConfig.DATABASE_TYPE == "mongodb":
+            result = await traffic_data_collection.insert_many(
+                [data.model_dump(by_alias=True) for data in rows], ordered=False)
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+        elif DatabaseConfig.DATABASE_TYPE == "postgresql":
+            records = [tuple(getattr(data, column) for column in COPY_COLUMNS) for data in rows]
+            async with engine.begin() as conn:
+                raw = await conn.get_raw_connection()
+                # asyncpg's binary COPY FROM STDIN
+                await raw.driver_connection.copy_records_to_table(
+                    "traffic_data", records=records, columns=COPY_COLUMNS)
+            return [None] * len(records)
+        raise ValueError(f"Unsupported database type: {DatabaseConfig.DATABASE_TYPE}")
+    
+    async def create_many(self, rows: List[Union[dict, TrafficDataBase]]):
+        """Insert a batch of readings in one round trip.
+        
+        Dicts are validated first; returns ``{'inserted': n, 'errors': [...]}``
+        with one error entry per rejected row index.
+        """
+        valid, errors = validate_rows(
+            ((i, row.model_dump() if isinstance(row, TrafficDataBase) else row) for i, row in enumerate(rows)),
+            TrafficDataBase
+        )
+        inserted = len(await self._write_many(valid)) if valid else 0
+        return {"inserted": inserted, "errors": errors}
     
     async def get_traffic_data(self, data_id: str) -> Optional[TrafficDataMongo]:
         if DatabaseConfig.DATABASE_TYPE == "mongodb":
@@ -1,11 +1,22 @@
+import asyncio
+import base64
+import json
 import os
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
+from .migrations import migrate_sqlite
+from .queries import (
+    SQLITE_DELETE_TRAFFIC, SQLITE_INSERT_TRAFFIC, SQLITE_INTERSECTION_STATS, SQLITE_STATS_SUMMARY,
+    SQLITE_TRAFFIC_COLUMNS as TRAFFIC_COLUMNS, sqlite_traffic_page
+)
+from .stats import rebuild_sqlite_stats, verify_sqlite_stats
 
 MONGO_URI = "mongodb+srv://<username>:<password>@cluster0.mongodb.net/traffic_optimizer?retryWrites=true&w=majority"
 client = AsyncIOMotorClient(MONGO_URI)
@@ -15,6 +26,14 @@ load_dotenv()
 
 # Database configuration
 DATABASE_PATH = "traffic_data.db"
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+DB_READ_WORKERS = int(os.getenv("DB_READ_WORKERS", 4))
+
+# Keyset pagination over (timestamp, id), newest first
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_CHUNK_ROWS = 1000
 
 class TrafficData(BaseModel):
     id: Optional[int] = None
@@ -24,134 +43,230 @@ class TrafficData(BaseModel):
     traffic_light_id: str
     timestamp: datetime = Field(default_factory=datetime.now)
 
+class ConnectionPool:
+    """One SQLite connection per thread, configured once and reused.
+
+    WAL lets readers run alongside the single writer, so queries are
+    split over two bounded executors: ``DB_READ_WORKERS`` reader threads
+    and one writer thread. Writes are serialized in-process instead of
+    contending for the database lock, and neither side waits on the
+    other or on the event loop.
+    """
+
+    def __init__(self, path, read_workers=DB_READ_WORKERS):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="sqlite-read")
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-write")
+
+    def _connect(self):
+        # check_same_thread=False only so close_all() can close it from another thread
+        conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # This enables column access by name
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self):
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    async def read(self, fn, *args):
+        """Run ``fn(conn, *args)`` on a reader thread"""
+        return await asyncio.get_running_loop().run_in_executor(self.read_executor, self._call, fn, args)
+
+    async def write(self, fn, *args):
+        """Run ``fn(conn, *args)`` on the writer thread"""
+        return await asyncio.get_running_loop().run_in_executor(self.write_executor, self._call, fn, args)
+
+    def _call(self, fn, args):
+        with self.transaction() as conn:
+            return fn(conn, *args)
+
+    @contextmanager
+    def transaction(self):
+        """This thread's connection; uncommitted work is rolled back on error"""
+        conn = self.connection()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+
+    def close_all(self):
+        self.read_executor.shutdown(wait=True)
+        self.write_executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+
+pool = ConnectionPool(DATABASE_PATH)
+
 # SQLite database setup
 def init_database():
-    """Initialize SQLite database and create tables"""
+    """Initialize SQLite database: apply pending schema migrations"""
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Create traffic data table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS traffic_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                intersection_id TEXT NOT NULL,
-                vehicle_count INTEGER NOT NULL,
-                average_speed REAL NOT NULL,
-                traffic_light_id TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create index for better performance
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_intersection_id 
-            ON traffic_data(intersection_id)
-        ''')
-        
-        conn.commit()
+        migrate_sqlite(conn)
     print("✅ SQLite database initialized!")
 
-@contextmanager
 def get_db_connection():
-    """Database connection context manager"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This enables column access by name
-    try:
-        yield conn
-    finally:
-        conn.close()
+    """This thread's pooled connection; uncommitted work is rolled back on error"""
+    return pool.transaction()
 
 async def test_connection():
     """Test database connection"""
     try:
-        with get_db_connection() as conn:
-            conn.execute("SELECT 1")
+        await pool.read(lambda conn: conn.execute("SELECT 1"))
         print("✅ SQLite database connected successfully!")
         return True
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         return False
 
+def _insert_traffic_data(conn, data: TrafficData) -> int:
+    cursor = conn.cursor()
+    cursor.execute(SQLITE_INSERT_TRAFFIC, (data.intersection_id, data.vehicle_count, data.average_speed, 
+                                           data.traffic_light_id, data.timestamp))
+    
+    conn.commit()
+    return cursor.lastrowid
+
 async def create_traffic_data(data: TrafficData) -> int:
     """Create new traffic data record"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO traffic_data 
-            (intersection_id, vehicle_count, average_speed, traffic_light_id, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (data.intersection_id, data.vehicle_count, data.average_speed, 
-              data.traffic_light_id, data.timestamp))
-        
-        conn.commit()
-        return cursor.lastrowid
-
-async def get_all_traffic_data() -> List[TrafficData]:
-    """Get all traffic data"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT * FROM traffic_data ORDER BY timestamp DESC
-        ''')
-        
-        rows = cursor.fetchall()
-        data = []
-        for row in rows:
-            data.append(TrafficData(
-                id=row['id'],
-                intersection_id=row['intersection_id'],
-                vehicle_count=row['vehicle_count'],
-                average_speed=row['average_speed'],
-                traffic_light_id=row['traffic_light_id'],
-                timestamp=datetime.fromisoformat(row['timestamp'])
-            ))
-        return data
-
-async def get_traffic_by_intersection(intersection_id: str) -> List[TrafficData]:
-    """Get traffic data for specific intersection"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT * FROM traffic_data 
-            WHERE intersection_id = ? 
-            ORDER BY timestamp DESC
-        ''', (intersection_id,))
-        
-        rows = cursor.fetchall()
-        data = []
-        for row in rows:
-            data.append(TrafficData(
-                id=row['id'],
-                intersection_id=row['intersection_id'],
-                vehicle_count=row['vehicle_count'],
-                average_speed=row['average_speed'],
-                traffic_light_id=row['traffic_light_id'],
-                timestamp=datetime.fromisoformat(row['timestamp'])
-            ))
-        return data
+    return await pool.write(_insert_traffic_data, data)
+
+def _insert_traffic_batch(conn, rows: List[TrafficData]) -> List[int]:
+    with conn:  # one transaction, one commit for the whole batch
+        conn.executemany(SQLITE_INSERT_TRAFFIC, [(data.intersection_id, data.vehicle_count, data.average_speed,
+                                                  data.traffic_light_id, data.timestamp) for data in rows])
+        # The single writer thread inserts the batch back to back, so the ids are consecutive
+        last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+async def create_traffic_data_many(rows: List[TrafficData]) -> List[int]:
+    """Insert many traffic data records in a single transaction; returns their ids"""
+    if not rows:
+        return []
+    return await pool.write(_insert_traffic_batch, rows)
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    """Opaque page cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, row_id]).encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(timestamp), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def _as_stored_timestamp(value: Optional[datetime]) -> Optional[str]:
+    # Timestamps are stored as text in sqlite3's 'YYYY-MM-DD HH:MM:SS[.ffffff]' form
+    return str(value) if value is not None else None
+
+def _select_traffic_page(conn, limit: int, after=None, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None, intersection_id: Optional[str] = None):
+    """Up to ``limit`` rows older than the ``after`` (timestamp, id) key, newest first"""
+    params = [value for value in (intersection_id, _as_stored_timestamp(start), _as_stored_timestamp(end))
+              if value is not None]
+    if after is not None:
+        params.extend(after)
+    sql = sqlite_traffic_page(intersection_id is not None, start is not None, end is not None, after is not None)
+    return conn.execute(sql, params + [limit]).fetchall()
+
+def row_to_dict(row) -> dict:
+    """API form of a traffic_data row, with an ISO 'T' timestamp"""
+    data = dict(row)
+    data['timestamp'] = data['timestamp'].replace(' ', 'T')
+    return data
+
+async def get_traffic_page(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                           start: Optional[datetime] = None, end: Optional[datetime] = None,
+                           intersection_id: Optional[str] = None) -> dict:
+    """One page of traffic data, newest first, with the cursor for the next page (None at the end)"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+    rows = await pool.read(_select_traffic_page, limit + 1, after, start, end, intersection_id)
+    page = rows[:limit]
+    has_more = len(rows) > limit
+    return {
+        "data": [row_to_dict(row) for row in page],
+        "next_cursor": encode_cursor(page[-1]['timestamp'], page[-1]['id']) if has_more else None
+    }
+
+async def iter_traffic_data(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            intersection_id: Optional[str] = None, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield lists of sqlite3.Row chunk by chunk, walking the same keyset as get_traffic_page"""
+    after = None
+    while True:
+        rows = await pool.read(_select_traffic_page, chunk_rows, after, start, end, intersection_id)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_rows:
+            return
+        after = (rows[-1]['timestamp'], rows[-1]['id'])
+
+def _select_traffic_stats(conn):
+    # One row kept current by the traffic_data triggers, not a scan
+    row = conn.execute(SQLITE_STATS_SUMMARY).fetchone()
+    total = row['total_records'] if row else 0
+    
+    return {
+        "total_records": total,
+        "unique_intersections": row['intersections'] if row else 0,
+        "average_vehicles": round(row['vehicle_sum'] / total, 2) if total else 0
+    }
 
 async def get_traffic_stats():
     """Get traffic statistics"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Total records
-        cursor.execute('SELECT COUNT(*) as total FROM traffic_data')
-        total = cursor.fetchone()['total']
-        
-        # Unique intersections
-        cursor.execute('SELECT COUNT(DISTINCT intersection_id) as intersections FROM traffic_data')
-        intersections = cursor.fetchone()['intersections']
-        
-        # Average vehicle count
-        cursor.execute('SELECT AVG(vehicle_count) as avg_vehicles FROM traffic_data')
-        avg_vehicles = cursor.fetchone()['avg_vehicles'] or 0
-        
-        return {
-            "total_records": total,
-            "unique_intersections": intersections,
-            "average_vehicles": round(avg_vehicles, 2)
+    return await pool.read(_select_traffic_stats)
+
+def _select_intersection_stats(conn):
+    return [
+        {
+            "intersection_id": row['intersection_id'],
+            "total_records": row['record_count'],
+            "average_vehicles": round(row['vehicle_sum'] / row['record_count'], 2)
         }
+        for row in conn.execute(SQLITE_INTERSECTION_STATS).fetchall()
+    ]
+
+async def get_intersection_stats():
+    """Per-intersection record counts and average vehicles"""
+    return await pool.read(_select_intersection_stats)
+
+async def verify_traffic_stats(repair: bool = True) -> dict:
+    """Check the maintained stats against the full aggregate; rebuild them on drift"""
+    result = await pool.read(verify_sqlite_stats)
+    if repair and not result["consistent"]:
+        await pool.write(rebuild_sqlite_stats)
+        result["repaired"] = True
+    return result
+
+def _delete_traffic_data(conn, data_id: int) -> int:
+    cursor = conn.cursor()
+    cursor.execute(SQLITE_DELETE_TRAFFIC, (data_id,))
+    conn.commit()
+    return cursor.rowcount
+
+async def delete_traffic_data(data_id: int) -> bool:
+    """Delete one traffic data record; False if it did not exist"""
+    return await pool.write(_delete_traffic_data, data_id) > 0
+
+def close_database():
+    """Close every pooled connection (application shutdown)"""
+    pool.close_all()
 
 # Initialize database on import
 init_database()
\ No newline at end of file
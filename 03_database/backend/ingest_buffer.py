@@ -0,0 +1,232 @@
+"""
+Write-behind buffer with group commit for traffic_data writers
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", 500))
+INGEST_MAX_DELAY_MS = float(os.getenv("INGEST_MAX_DELAY_MS", 50))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 10000))
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", 3))
+INGEST_RETRY_BACKOFF_MS = float(os.getenv("INGEST_RETRY_BACKOFF_MS", 100))
+INGEST_STOP_TIMEOUT = float(os.getenv("INGEST_STOP_TIMEOUT", 30))
+INGEST_DEAD_LETTER_PATH = os.getenv("INGEST_DEAD_LETTER_PATH", "ingest_dead_letter.ndjson")
+
+
+class IngestBufferFull(Exception):
+    """The queue stayed full for longer than the caller was willing to wait"""
+
+
+class IngestBuffer:
+    """Queue in front of a batch writer that commits many readings at once.
+
+    ``submit`` acknowledges as soon as the reading is queued; with
+    ``durable=True`` it waits until the group commit holding the reading
+    has finished and returns the writer's result for it (e.g. its id).
+    A background task drains the queue into batches of up to
+    ``max_batch`` items, or whatever arrived within ``max_delay_ms`` of
+    the first one, and hands each batch to ``flush_fn`` - a coroutine
+    taking a list of items and returning one result per item.
+
+    The queue is bounded: when it is full ``submit`` waits (up to
+    ``timeout`` seconds, then raises IngestBufferFull), which pushes back
+    on senders instead of growing memory.
+
+    Queued readings have already been acknowledged, so a failed group
+    commit is never just dropped. It is retried ``max_retries`` times with
+    exponential backoff (e.g. SQLITE_BUSY while a long write holds the
+    lock); if it still fails the batch is bisected to isolate the rows
+    that fail on their own, the rest are written, and the failing rows
+    are appended to the ``dead_letter_path`` NDJSON file for replay (or
+    kept in ``dead_letters`` if even that write fails).
+    """
+
+    def __init__(self, flush_fn: Callable[[List[Any]], Awaitable[List[Any]]], max_batch: int = INGEST_MAX_BATCH,
+                 max_delay_ms: float = INGEST_MAX_DELAY_MS, max_queue: int = INGEST_QUEUE_SIZE,
+                 max_retries: int = INGEST_MAX_RETRIES, retry_backoff_ms: float = INGEST_RETRY_BACKOFF_MS,
+                 dead_letter_path: Optional[str] = INGEST_DEAD_LETTER_PATH):
+        self.flush_fn = flush_fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.dead_letter_path = dead_letter_path
+        self.dead_letters: List[dict] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: List[tuple] = []
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.failed = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.batches = 0
+        self.flush_time = 0.0
+        self.max_flush_time = 0.0
+        self.last_flush_time = 0.0
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        """Start the flusher on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: Optional[float] = INGEST_STOP_TIMEOUT):
+        """Flush everything still queued, then stop the flusher.
+
+        If the writer can't drain the queue within ``timeout`` seconds, the
+        batch being written and everything still queued are dead-lettered
+        so shutdown doesn't hang. The interrupted batch may already have
+        been committed; replaying it can then duplicate those rows.
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Ingest queue not drained within {timeout}s, dead-lettering what is left")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        leftover, self._inflight = self._inflight, []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+            self._queue.task_done()
+        if leftover:
+            await self._fail(leftover, RuntimeError("Ingest buffer stopped before the batch was written"))
+
+    async def submit(self, item, durable: bool = False, timeout: Optional[float] = None):
+        """Queue ``item``; returns its flush result when ``durable``, else None"""
+        if self._task is None:
+            raise RuntimeError("IngestBuffer.start() has not been called")
+        future = asyncio.get_running_loop().create_future() if durable else None
+        try:
+            await asyncio.wait_for(self._queue.put((item, future)), timeout)
+        except asyncio.TimeoutError:
+            raise IngestBufferFull(f"Ingest queue full ({self.max_queue} readings)")
+        self.enqueued += 1
+        return await future if durable else None
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            self._inflight = list(batch)
+            started = time.perf_counter()
+            try:
+                await self._flush(batch, self.max_retries)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.batches += 1
+                self.flush_time += elapsed
+                self.last_flush_time = elapsed
+                self.max_flush_time = max(self.max_flush_time, elapsed)
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch, retries):
+        """Write ``batch``, retrying and then bisecting; rows failing on their own are dead-lettered"""
+        items = [item for item, _ in batch]
+        for attempt in range(retries + 1):
+            try:
+                results = await self.flush_fn(items)
+                break
+            except Exception as e:
+                self.last_error = str(e)
+                if attempt == retries:
+                    if len(batch) == 1:
+                        await self._fail(batch, e)
+                        return
+                    print(f"❌ Ingest flush of {len(batch)} readings failed, bisecting: {e}")
+                    middle = len(batch) // 2
+                    # The halves were just retried as a whole; only isolate the bad rows now
+                    await self._flush(batch[:middle], 0)
+                    await self._flush(batch[middle:], 0)
+                    return
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+        self.flushed += len(batch)
+        self._settle(batch)
+        for (_, future), result in zip(batch, results):
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    def _settle(self, batch):
+        # Whatever is left in _inflight when the flusher is cancelled goes to stop()'s dead-letter
+        settled = {id(entry) for entry in batch}
+        self._inflight = [entry for entry in self._inflight if id(entry) not in settled]
+
+    async def _fail(self, batch, error):
+        """Dead-letter readings that could not be written and fail their durable waiters"""
+        self._settle(batch)
+        self.failed += len(batch)
+        self.last_error = str(error)
+        records = [{"error": str(error), "failed_at": time.time(), "reading": _as_json(item)} for item, _ in batch]
+        try:
+            if not self.dead_letter_path:
+                raise OSError("no dead-letter file configured")
+            await asyncio.to_thread(_append_ndjson, self.dead_letter_path, records)
+            print(f"❌ {len(batch)} readings could not be written, dead-lettered to {self.dead_letter_path}: {error}")
+        except OSError as e:
+            self.dead_letters.extend(records)
+            print(f"❌ {len(batch)} readings could not be written, kept in memory ({e}): {error}")
+        self.dead_lettered += len(batch)
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    def get_stats(self):
+        return {
+            "running": self._task is not None,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue,
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "dead_lettered": self.dead_lettered,
+            "dead_letters_in_memory": len(self.dead_letters),
+            "dead_letter_path": self.dead_letter_path,
+            "batches": self.batches,
+            "avg_batch_size": round(self.flushed / self.batches, 1) if self.batches else 0,
+            "avg_flush_ms": round(self.flush_time / self.batches * 1000, 2) if self.batches else 0,
+            "last_flush_ms": round(self.last_flush_time * 1000, 2),
+            "max_flush_ms": round(self.max_flush_time * 1000, 2),
+            "last_error": self.last_error
+        }
+
+
+def _as_json(item):
+    return item.model_dump(mode="json") if hasattr(item, "model_dump") else item
+
+
+def _append_ndjson(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
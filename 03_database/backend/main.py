@@ -1,9 +1,27 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from .database import (
-    test_connection, create_traffic_data, get_all_traffic_data, 
-    get_traffic_by_intersection, get_traffic_stats, TrafficData
+    test_connection, create_traffic_data_many, get_traffic_page, iter_traffic_data,
+    get_traffic_stats, get_intersection_stats, verify_traffic_stats, delete_traffic_data as delete_traffic_record,
+    close_database, row_to_dict, TrafficData, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, TRAFFIC_COLUMNS
 )
+from .bulk import MAX_BULK_ROWS, is_ndjson, read_ndjson, validate_rows
+from .ingest_buffer import IngestBuffer, IngestBufferFull
+from .stats import STATS_VERIFY_INTERVAL
+
+# Single-row writes are group-committed by a write-behind buffer
+traffic_buffer = IngestBuffer(create_traffic_data_many)
+
+# Last check of the trigger-maintained stats against the full aggregate
+last_stats_verification: Optional[dict] = None
+stats_verify_task: Optional[asyncio.Task] = None
 
 app = FastAPI(
     title="Smart Traffic Optimizer API",
@@ -24,11 +42,39 @@ app.add_middleware(
 async def startup_event():
     """Initialize application on startup"""
     print("🚀 Starting Smart Traffic Optimizer API...")
+    global stats_verify_task
+    await traffic_buffer.start()
     connected = await test_connection()
     if connected:
         print("✅ SQLite database connected successfully!")
     else:
         print("❌ Database connection failed!")
+    if STATS_VERIFY_INTERVAL > 0:
+        stats_verify_task = asyncio.create_task(_verify_stats_periodically())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued readings, then close pooled database connections"""
+    if stats_verify_task is not None:
+        stats_verify_task.cancel()
+    await traffic_buffer.stop()
+    close_database()
+
+async def _run_stats_verification():
+    global last_stats_verification
+    result = await verify_traffic_stats()
+    if not result["consistent"]:
+        print(f"⚠️ Traffic stats drifted from traffic_data, rebuilt: {result['drift']}")
+    last_stats_verification = result
+    return result
+
+async def _verify_stats_periodically():
+    while True:
+        await asyncio.sleep(STATS_VERIFY_INTERVAL)
+        try:
+            await _run_stats_verification()
+        except Exception as e:
+            print(f"❌ Traffic stats verification failed: {e}")
 
 @app.get("/")
 async def root():
@@ -51,46 +97,141 @@ async def health_check():
     }
 
 @app.post("/traffic-data/")
-async def add_traffic_data(data: TrafficData):
-    """Add new traffic data"""
+async def add_traffic_data(data: TrafficData, durable: bool = False, timeout: Optional[float] = 5.0):
+    """Add new traffic data.
+    
+    Acknowledged once queued for the next group commit (``id`` is then
+    null); ``durable=true`` waits for the commit and returns the id.
+    """
     try:
-        data_id = await create_traffic_data(data)
+        data_id = await traffic_buffer.submit(data, durable=durable, timeout=timeout)
         return {
-            "message": "Traffic data added successfully",
+            "message": "Traffic data added successfully" if durable else "Traffic data queued",
             "id": data_id,
             "intersection_id": data.intersection_id,
             "timestamp": data.timestamp
         }
+    except IngestBufferFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to add traffic data: {str(e)}")
+
+@app.post("/traffic-data/bulk")
+async def add_traffic_data_bulk(request: Request):
+    """Add many readings from a JSON array or an NDJSON stream (application/x-ndjson)"""
+    too_many = HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} readings per request")
+    if is_ndjson(request.headers.get("content-type")):
+        rows = []
+        async for row in read_ndjson(request.stream()):
+            rows.append(row)
+            if len(rows) > MAX_BULK_ROWS:
+                raise too_many
+    else:
+        try:
+            body = await request.json()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of traffic readings")
+        rows = list(enumerate(body))
+    if len(rows) > MAX_BULK_ROWS:
+        raise too_many
+    
+    valid, errors = validate_rows(rows, TrafficData)
+    try:
+        inserted = len(await create_traffic_data_many(valid))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add traffic data: {str(e)}")
+    return {
+        "message": f"Added {inserted} of {len(rows)} readings",
+        "received": len(rows),
+        "inserted": inserted,
+        "rejected": len(errors),
+        "errors": errors
+    }
 
 @app.get("/traffic-data/")
-async def get_traffic_data():
-    """Get all traffic data"""
+async def get_traffic_data(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    intersection_id: Optional[str] = None
+):
+    """Get traffic data newest first, one page at a time.
+    
+    Pass ``next_cursor`` from the response as ``cursor`` for the next
+    page; ``start``/``end`` bound the timestamp range (end exclusive).
+    """
     try:
-        data = await get_all_traffic_data()
+        page = await get_traffic_page(limit, cursor, start, end, intersection_id)
         stats = await get_traffic_stats()
         return {
-            "count": len(data),
+            "count": len(page["data"]),
             "stats": stats,
-            "data": data
+            "data": page["data"],
+            "next_cursor": page["next_cursor"]
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get traffic data: {str(e)}")
 
 @app.get("/traffic-data/intersection/{intersection_id}")
-async def get_intersection_data(intersection_id: str):
-    """Get traffic data for specific intersection"""
+async def get_intersection_data(
+    intersection_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get traffic data for specific intersection, one page at a time"""
     try:
-        data = await get_traffic_by_intersection(intersection_id)
+        page = await get_traffic_page(limit, cursor, intersection_id=intersection_id)
         return {
             "intersection_id": intersection_id,
-            "count": len(data),
-            "data": data
+            "count": len(page["data"]),
+            "data": page["data"],
+            "next_cursor": page["next_cursor"]
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get intersection data: {str(e)}")
 
+async def _export_ndjson(chunks):
+    async for rows in chunks:
+        yield "".join(json.dumps(row_to_dict(row)) + "\n" for row in rows)
+
+async def _export_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(TRAFFIC_COLUMNS)
+    async for rows in chunks:
+        writer.writerows(row_to_dict(row).values() for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@app.get("/traffic-data/export")
+async def export_traffic_data(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    intersection_id: Optional[str] = None
+):
+    """Stream matching traffic data as NDJSON or CSV without loading it all into memory"""
+    chunks = iter_traffic_data(start, end, intersection_id)
+    if format == "csv":
+        return StreamingResponse(_export_csv(chunks), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=traffic_data.csv"})
+    return StreamingResponse(_export_ndjson(chunks), media_type="application/x-ndjson")
+
+@app.get("/ingest/metrics")
+async def get_ingest_metrics():
+    """Write-behind queue depth and group commit latency"""
+    return traffic_buffer.get_stats()
+
 @app.get("/stats")
 async def get_statistics():
     """Get traffic statistics"""
@@ -100,19 +241,34 @@ async def get_statistics():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
+@app.get("/stats/intersections")
+async def get_intersection_statistics():
+    """Record count and average vehicles for every intersection"""
+    try:
+        return {"intersections": await get_intersection_stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
+
+@app.get("/stats/verification")
+async def get_stats_verification():
+    """Result of the last periodic check of the maintained stats"""
+    return {"interval_seconds": STATS_VERIFY_INTERVAL, "last": last_stats_verification}
+
+@app.post("/stats/verify")
+async def run_stats_verification():
+    """Check the maintained stats against a full scan now, rebuilding them on drift"""
+    try:
+        return await _run_stats_verification()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to verify statistics: {str(e)}")
+
 @app.delete("/traffic-data/{data_id}")
 async def delete_traffic_data(data_id: int):
     """Delete specific traffic data record"""
     try:
-        from backend.database import get_db_connection
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM traffic_data WHERE id = ?', (data_id,))
-            conn.commit()
-            
-            if cursor.rowcount == 0:
-                raise HTTPException(status_code=404, detail="Traffic data not found")
-                
+        if not await delete_traffic_record(data_id):
+            raise HTTPException(status_code=404, detail="Traffic data not found")
+        
         return {"message": "Traffic data deleted successfully"}
     except HTTPException:
         raise
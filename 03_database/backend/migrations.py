@@ -0,0 +1,266 @@
+"""
+Versioned schema migrations for the SQLite backend and the PostgreSQL API database
+"""
+
+from .queries import PG_STATS_REBUILD, SQLITE_STATS_REBUILD
+
+# Trigger bodies for the running traffic_data aggregates (migration 3). A
+# reading entering or leaving an intersection adjusts that intersection's
+# row and the single traffic_stats row; ``intersections`` only moves when an
+# intersection gains its first reading or loses its last one.
+
+
+def _sqlite_stats_add(row):
+    return f'''
+        UPDATE traffic_stats SET
+            total_records = total_records + 1,
+            vehicle_sum = vehicle_sum + {row}.vehicle_count,
+            intersections = intersections + NOT EXISTS (
+                SELECT 1 FROM traffic_intersection_stats WHERE intersection_id = {row}.intersection_id)
+        WHERE id = 1;
+        INSERT INTO traffic_intersection_stats (intersection_id, record_count, vehicle_sum)
+        VALUES ({row}.intersection_id, 1, {row}.vehicle_count)
+        ON CONFLICT(intersection_id) DO UPDATE SET
+            record_count = record_count + 1, vehicle_sum = vehicle_sum + excluded.vehicle_sum;
+    '''
+
+
+def _sqlite_stats_remove(row):
+    return f'''
+        UPDATE traffic_intersection_stats SET
+            record_count = record_count - 1, vehicle_sum = vehicle_sum - {row}.vehicle_count
+        WHERE intersection_id = {row}.intersection_id;
+        UPDATE traffic_stats SET
+            total_records = total_records - 1,
+            vehicle_sum = vehicle_sum - {row}.vehicle_count,
+            intersections = intersections - EXISTS (
+                SELECT 1 FROM traffic_intersection_stats
+                WHERE intersection_id = {row}.intersection_id AND record_count = 0)
+        WHERE id = 1;
+        DELETE FROM traffic_intersection_stats WHERE intersection_id = {row}.intersection_id AND record_count = 0;
+    '''
+
+
+def _postgres_stats_apply(rows, sign):
+    """PL/pgSQL applying a whole statement's transition table at once, so a COPY costs one update"""
+    return f'''
+        WITH grouped AS (
+            SELECT intersection_id, COUNT(*) AS n, COALESCE(SUM(vehicle_count), 0) AS vehicles
+            FROM {rows} GROUP BY intersection_id
+        ), changed AS (
+            INSERT INTO traffic_intersection_stats AS s (intersection_id, record_count, vehicle_sum)
+            SELECT intersection_id, {sign} * n, {sign} * vehicles FROM grouped
+            ON CONFLICT (intersection_id) DO UPDATE SET
+                record_count = s.record_count + EXCLUDED.record_count,
+                vehicle_sum = s.vehicle_sum + EXCLUDED.vehicle_sum
+            RETURNING xmax = 0 AS created, record_count
+        )
+        SELECT COUNT(*) FILTER (WHERE created) - COUNT(*) FILTER (WHERE record_count = 0)
+        INTO delta FROM changed;
+        DELETE FROM traffic_intersection_stats
+        WHERE record_count = 0 AND intersection_id IN (SELECT intersection_id FROM {rows});
+        UPDATE traffic_stats SET
+            total_records = total_records + {sign} * (SELECT COUNT(*) FROM {rows}),
+            vehicle_sum = vehicle_sum + {sign} * (SELECT COALESCE(SUM(vehicle_count), 0) FROM {rows}),
+            speed_sum = speed_sum + {sign} * (SELECT COALESCE(SUM(avg_speed), 0) FROM {rows}),
+            speed_count = speed_count + {sign} * (SELECT COUNT(avg_speed) FROM {rows}),
+            intersections = intersections + delta
+        WHERE id = 1;
+    '''
+
+
+def _postgres_stats_function(name, body):
+    return f'''
+        CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+        DECLARE
+            delta INTEGER;
+        BEGIN
+            {body}
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    '''
+
+# (version, name, statements); append new migrations, never edit applied ones
+
+SQLITE_MIGRATIONS = [
+    (1, 'create traffic_data', [
+        '''
+        CREATE TABLE IF NOT EXISTS traffic_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            intersection_id TEXT NOT NULL,
+            vehicle_count INTEGER NOT NULL,
+            average_speed REAL NOT NULL,
+            traffic_light_id TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (2, 'traffic_data indexes', [
+        # Per-intersection history and keyset pages; rowid breaks ties on timestamp
+        'CREATE INDEX IF NOT EXISTS idx_traffic_intersection_time ON traffic_data(intersection_id, timestamp)',
+        # Time-range reads (dashboards, training loader, export)
+        'CREATE INDEX IF NOT EXISTS idx_traffic_timestamp ON traffic_data(timestamp)',
+        # Covers COUNT(DISTINCT intersection_id) and AVG(vehicle_count) without touching the table
+        'CREATE INDEX IF NOT EXISTS idx_traffic_intersection_count ON traffic_data(intersection_id, vehicle_count)',
+        # Prefix of idx_traffic_intersection_time
+        'DROP INDEX IF EXISTS idx_intersection_id',
+    ]),
+    (3, 'trigger-maintained traffic stats', [
+        '''
+        CREATE TABLE IF NOT EXISTS traffic_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_records INTEGER NOT NULL DEFAULT 0,
+            vehicle_sum INTEGER NOT NULL DEFAULT 0,
+            intersections INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS traffic_intersection_stats (
+            intersection_id TEXT PRIMARY KEY,
+            record_count INTEGER NOT NULL,
+            vehicle_sum INTEGER NOT NULL
+        )
+        ''',
+        *SQLITE_STATS_REBUILD,
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_traffic_stats_insert AFTER INSERT ON traffic_data
+        BEGIN {_sqlite_stats_add('NEW')} END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_traffic_stats_delete AFTER DELETE ON traffic_data
+        BEGIN {_sqlite_stats_remove('OLD')} END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_traffic_stats_update
+        AFTER UPDATE OF intersection_id, vehicle_count ON traffic_data
+        BEGIN {_sqlite_stats_remove('OLD')} {_sqlite_stats_add('NEW')} END
+        ''',
+    ]),
+]
+
+POSTGRES_MIGRATIONS = [
+    (1, 'create traffic_data', [
+        '''
+        CREATE TABLE IF NOT EXISTS traffic_data (
+            id SERIAL PRIMARY KEY,
+            intersection_id VARCHAR(50) NOT NULL,
+            vehicle_count INTEGER NOT NULL,
+            avg_speed NUMERIC(6, 2),
+            queue_length INTEGER DEFAULT 0,
+            congestion_level VARCHAR(20) DEFAULT 'medium',
+            traffic_light_id VARCHAR(50) DEFAULT 'default_light',
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (2, 'traffic_data indexes', [
+        # Latest readings per intersection, answered from the index alone
+        '''
+        CREATE INDEX IF NOT EXISTS idx_traffic_intersection_time
+        ON traffic_data (intersection_id, timestamp DESC) INCLUDE (vehicle_count, avg_speed)
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_traffic_timestamp ON traffic_data (timestamp DESC)',
+    ]),
+    (3, 'trigger-maintained traffic stats', [
+        '''
+        CREATE TABLE IF NOT EXISTS traffic_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_records BIGINT NOT NULL DEFAULT 0,
+            vehicle_sum BIGINT NOT NULL DEFAULT 0,
+            speed_sum NUMERIC NOT NULL DEFAULT 0,
+            speed_count BIGINT NOT NULL DEFAULT 0,
+            intersections INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS traffic_intersection_stats (
+            intersection_id VARCHAR(50) PRIMARY KEY,
+            record_count BIGINT NOT NULL,
+            vehicle_sum BIGINT NOT NULL
+        )
+        ''',
+        *PG_STATS_REBUILD,
+        _postgres_stats_function('traffic_stats_insert', _postgres_stats_apply('new_rows', 1)),
+        _postgres_stats_function('traffic_stats_delete', _postgres_stats_apply('old_rows', -1)),
+        _postgres_stats_function('traffic_stats_update',
+                                 _postgres_stats_apply('old_rows', -1) + _postgres_stats_apply('new_rows', 1)),
+        '''
+        CREATE TRIGGER trg_traffic_stats_insert AFTER INSERT ON traffic_data
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION traffic_stats_insert()
+        ''',
+        '''
+        CREATE TRIGGER trg_traffic_stats_delete AFTER DELETE ON traffic_data
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION traffic_stats_delete()
+        ''',
+        '''
+        CREATE TRIGGER trg_traffic_stats_update AFTER UPDATE ON traffic_data
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION traffic_stats_update()
+        ''',
+    ]),
+]
+
+
+def sqlite_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate_sqlite(conn, migrations=SQLITE_MIGRATIONS):
+    """Apply pending migrations; the schema version lives in PRAGMA user_version.
+
+    Each migration runs in its own transaction together with the version
+    bump. Returns the versions applied.
+    """
+    current = sqlite_version(conn)
+    applied = []
+    for version, name, statements in migrations:
+        if version <= current:
+            continue
+        conn.execute('BEGIN')
+        try:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"✅ SQLite migration {version}: {name}")
+        applied.append(version)
+    return applied
+
+
+def migrate_postgres(conn, migrations=POSTGRES_MIGRATIONS):
+    """Apply pending migrations recorded in schema_migrations (psycopg2 connection).
+
+    An advisory lock keeps concurrently starting workers from racing.
+    Returns the versions applied.
+    """
+    applied = []
+    with conn.cursor() as cursor:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.commit()
+        for version, name, statements in migrations:
+            try:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('traffic_data_migrations'))")
+                cursor.execute('SELECT 1 FROM schema_migrations WHERE version = %s', (version,))
+                if cursor.fetchone():
+                    conn.rollback()
+                    continue
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute('INSERT INTO schema_migrations (version, name) VALUES (%s, %s)', (version, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"✅ PostgreSQL migration {version}: {name}")
+            applied.append(version)
+    return applied
@@ -0,0 +1,142 @@
+"""
+Every SQL statement issued against traffic_data, kept in one place so
+query_plans.py can EXPLAIN all of them against the migrated schema
+"""
+
+from collections import namedtuple
+from itertools import product
+
+# name, sql, sample params, and how much scanning the plan may do:
+#   bounded          - has a LIMIT, so an ordered index walk stops early
+#   aggregate        - whole-table aggregate; a covering index scan is fine
+#   allow_full_scan  - reads the whole table on purpose (offline jobs)
+Query = namedtuple('Query', ['name', 'sql', 'params', 'bounded', 'aggregate', 'allow_full_scan'])
+Query.__new__.__defaults__ = (False, False, False)
+
+SAMPLE_TIMESTAMP = '2025-01-01 00:00:00'
+
+# SQLite (03_database/backend) --------------------------------------------
+
+SQLITE_TRAFFIC_COLUMNS = ('id', 'intersection_id', 'vehicle_count', 'average_speed', 'traffic_light_id', 'timestamp')
+
+SQLITE_INSERT_TRAFFIC = '''
+    INSERT INTO traffic_data
+    (intersection_id, vehicle_count, average_speed, traffic_light_id, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+SQLITE_DELETE_TRAFFIC = 'DELETE FROM traffic_data WHERE id = ?'
+
+# Running aggregates kept by triggers (migration 3); the full query is only for verification
+STATS_FIELDS = ('total_records', 'vehicle_sum', 'intersections')
+SQLITE_STATS_SUMMARY = f"SELECT {', '.join(STATS_FIELDS)} FROM traffic_stats WHERE id = 1"
+# Grouping walks idx_traffic_intersection_count in order; COUNT(DISTINCT) would need a temp B-tree
+SQLITE_STATS_FULL = '''
+    SELECT COALESCE(SUM(n), 0), COALESCE(SUM(vehicles), 0), COUNT(*)
+    FROM (SELECT COUNT(*) AS n, SUM(vehicle_count) AS vehicles FROM traffic_data GROUP BY intersection_id)
+'''
+SQLITE_INTERSECTION_STATS = '''
+    SELECT intersection_id, record_count, vehicle_sum
+    FROM traffic_intersection_stats ORDER BY intersection_id
+'''
+SQLITE_STATS_REBUILD = [
+    'DELETE FROM traffic_intersection_stats',
+    '''
+    INSERT INTO traffic_intersection_stats (intersection_id, record_count, vehicle_sum)
+    SELECT intersection_id, COUNT(*), SUM(vehicle_count) FROM traffic_data GROUP BY intersection_id
+    ''',
+    '''
+    INSERT OR REPLACE INTO traffic_stats (id, total_records, vehicle_sum, intersections)
+    SELECT 1, COALESCE(SUM(record_count), 0), COALESCE(SUM(vehicle_sum), 0), COUNT(*)
+    FROM traffic_intersection_stats
+    ''',
+]
+
+# DataLoader.load_historical_data (05_models/training_engine/src/data_loader.py) keeps its own copy
+SQLITE_TRAINING_HISTORY = '''
+    SELECT * FROM traffic_data
+    WHERE timestamp >= ? AND timestamp <= ?
+    ORDER BY timestamp
+'''
+# TimeProfiles.from_sqlite (01_core_engine/time_profiles.py) keeps its own copy
+SQLITE_PROFILE_HISTORY_SINCE = 'SELECT intersection_id, timestamp, vehicle_count FROM traffic_data WHERE timestamp >= ?'
+
+
+def sqlite_traffic_page(intersection=False, start=False, end=False, after=False):
+    """Keyset page query, newest first; parameters follow the clause order, then LIMIT"""
+    clauses = []
+    if intersection:
+        clauses.append('intersection_id = ?')
+    if start:
+        clauses.append('timestamp >= ?')
+    if end:
+        clauses.append('timestamp < ?')
+    if after:
+        clauses.append('(timestamp, id) < (?, ?)')
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return (f"SELECT {', '.join(SQLITE_TRAFFIC_COLUMNS)} FROM traffic_data{where} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT ?")
+
+
+def sqlite_queries():
+    queries = [
+        Query('insert_traffic', SQLITE_INSERT_TRAFFIC, ('i1', 10, 30.0, 'l1', SAMPLE_TIMESTAMP)),
+        Query('delete_traffic', SQLITE_DELETE_TRAFFIC, (1,)),
+        Query('stats_summary', SQLITE_STATS_SUMMARY, ()),
+        Query('stats_full', SQLITE_STATS_FULL, (), aggregate=True),
+        Query('intersection_stats', SQLITE_INTERSECTION_STATS, (), allow_full_scan=True),  # one row per intersection
+        Query('training_history', SQLITE_TRAINING_HISTORY, (SAMPLE_TIMESTAMP, SAMPLE_TIMESTAMP)),
+        Query('profile_history_since', SQLITE_PROFILE_HISTORY_SINCE, (SAMPLE_TIMESTAMP,)),
+    ]
+    # Every filter combination the paginated endpoints and the export can produce
+    for intersection, start, end, after in product((False, True), repeat=4):
+        params = (('i1',) if intersection else ()) + ((SAMPLE_TIMESTAMP,) if start else ()) + \
+                 ((SAMPLE_TIMESTAMP,) if end else ()) + ((SAMPLE_TIMESTAMP, 1) if after else ()) + (100,)
+        name = 'traffic_page' + ''.join(f'_{flag}' for flag, on in (
+            ('intersection', intersection), ('start', start), ('end', end), ('after', after)) if on)
+        queries.append(Query(name, sqlite_traffic_page(intersection, start, end, after), params, bounded=True))
+    return queries
+
+
+# PostgreSQL (04_api/final_api.py) ----------------------------------------
+
+PG_TRAFFIC_COLUMNS = ('id, intersection_id, vehicle_count, avg_speed, queue_length, congestion_level, '
+                      'traffic_light_id, timestamp')
+
+PG_RECENT_TRAFFIC = f'SELECT {PG_TRAFFIC_COLUMNS} FROM traffic_data ORDER BY timestamp DESC LIMIT 50'
+PG_INTERSECTION_TRAFFIC = (f'SELECT {PG_TRAFFIC_COLUMNS} FROM traffic_data WHERE intersection_id = %s '
+                           f'ORDER BY timestamp DESC LIMIT 50')
+PG_STATS_FIELDS = ('total_records', 'vehicle_sum', 'speed_sum', 'speed_count', 'intersections')
+PG_STATS_SUMMARY = f"SELECT {', '.join(PG_STATS_FIELDS)} FROM traffic_stats WHERE id = 1"
+PG_STATS_FULL = '''
+    SELECT COUNT(*), COALESCE(SUM(vehicle_count), 0), COALESCE(SUM(avg_speed), 0), COUNT(avg_speed),
+           COUNT(DISTINCT intersection_id)
+    FROM traffic_data
+'''
+PG_STATS_REBUILD = [
+    'LOCK TABLE traffic_data IN SHARE MODE',  # no writes while the aggregates are recomputed
+    'DELETE FROM traffic_intersection_stats',
+    '''
+    INSERT INTO traffic_intersection_stats (intersection_id, record_count, vehicle_sum)
+    SELECT intersection_id, COUNT(*), SUM(vehicle_count) FROM traffic_data GROUP BY intersection_id
+    ''',
+    '''
+    INSERT INTO traffic_stats (id, total_records, vehicle_sum, speed_sum, speed_count, intersections)
+    SELECT 1, COUNT(*), COALESCE(SUM(vehicle_count), 0), COALESCE(SUM(avg_speed), 0), COUNT(avg_speed),
+           COUNT(DISTINCT intersection_id)
+    FROM traffic_data
+    ON CONFLICT (id) DO UPDATE SET
+        total_records = EXCLUDED.total_records, vehicle_sum = EXCLUDED.vehicle_sum,
+        speed_sum = EXCLUDED.speed_sum, speed_count = EXCLUDED.speed_count,
+        intersections = EXCLUDED.intersections
+    ''',
+]
+
+
+def postgres_queries():
+    return [
+        Query('recent_traffic', PG_RECENT_TRAFFIC, (), bounded=True),
+        Query('intersection_traffic', PG_INTERSECTION_TRAFFIC, ('i1',), bounded=True),
+        Query('stats_summary', PG_STATS_SUMMARY, ()),
+        Query('stats_full', PG_STATS_FULL, (), aggregate=True),
+    ]
@@ -0,0 +1,130 @@
+"""
+EXPLAIN every registered traffic_data query against the migrated schema and
+fail on full scans or sorts.
+
+    python -m backend.query_plans                      # fresh in-memory SQLite schema
+    python -m backend.query_plans --sqlite traffic_data.db
+    python -m backend.query_plans --postgres postgresql://...
+
+Exits with status 1 if any query's plan is rejected.
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+
+from .migrations import migrate_postgres, migrate_sqlite
+from .queries import postgres_queries, sqlite_queries
+
+SQLITE_TABLE_SCAN = re.compile(r'^SCAN (\w+)$')
+SQLITE_INDEX_SCAN = re.compile(r'^SCAN (\w+) USING (COVERING )?INDEX')
+
+
+def check_sqlite_plan(query, plan_lines):
+    """Problems with one SQLite plan (EXPLAIN QUERY PLAN detail strings)"""
+    problems = []
+    for line in plan_lines:
+        if SQLITE_TABLE_SCAN.match(line) and not query.allow_full_scan:
+            problems.append(f"full table scan: {line}")
+        elif SQLITE_INDEX_SCAN.match(line):
+            covering = 'COVERING' in line
+            if not (query.bounded or (query.aggregate and covering) or query.allow_full_scan):
+                problems.append(f"unbounded index scan: {line}")
+        elif 'USE TEMP B-TREE' in line:
+            problems.append(f"sort without an index: {line}")
+    return problems
+
+
+def explain_sqlite(conn, queries=None):
+    """[(query, plan lines, problems)] for every registered SQLite query"""
+    results = []
+    for query in queries or sqlite_queries():
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {query.sql}', query.params).fetchall()
+        plan = [row[3] for row in rows]
+        results.append((query, plan, check_sqlite_plan(query, plan)))
+    return results
+
+
+def _postgres_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _postgres_nodes(child)
+
+
+def check_postgres_plan(query, plan):
+    """Problems with one PostgreSQL plan (EXPLAIN (FORMAT JSON) root node)"""
+    problems = []
+    for node in _postgres_nodes(plan):
+        node_type = node['Node Type']
+        if node_type == 'Seq Scan' and not query.allow_full_scan:
+            problems.append(f"sequential scan on {node.get('Relation Name')}")
+        elif node_type == 'Sort':
+            problems.append(f"sort on {node.get('Sort Key')}")
+        elif node_type in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in node:
+            if not (query.bounded or (query.aggregate and node_type == 'Index Only Scan') or query.allow_full_scan):
+                problems.append(f"unbounded {node_type.lower()} on {node.get('Index Name')}")
+    return problems
+
+
+def explain_postgres(conn, queries=None):
+    """Same as explain_sqlite for PostgreSQL; seq scans are disabled so a missing index shows up"""
+    results = []
+    with conn.cursor() as cursor:
+        # Small test tables always favour a seq scan; this asks whether an index path exists at all
+        cursor.execute('SET enable_seqscan = off')
+        for query in queries or postgres_queries():
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {query.sql}', query.params)
+            document = cursor.fetchone()[0]
+            plan = (json.loads(document) if isinstance(document, str) else document)[0]['Plan']
+            lines = [node['Node Type'] + (f" ({node['Index Name']})" if 'Index Name' in node else '')
+                     for node in _postgres_nodes(plan)]
+            results.append((query, lines, check_postgres_plan(query, plan)))
+    conn.rollback()
+    return results
+
+
+def report(title, results):
+    print(f"🔍 {title}")
+    failures = 0
+    for query, plan, problems in results:
+        status = '❌' if problems else '✅'
+        print(f"  {status} {query.name}: {' | '.join(plan)}")
+        for problem in problems:
+            print(f"       {problem}")
+        failures += bool(problems)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check traffic_data query plans for full scans')
+    parser.add_argument('--sqlite', default=':memory:', help='SQLite database (default: fresh in-memory schema)')
+    parser.add_argument('--postgres', help='PostgreSQL DSN to check as well')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.sqlite)
+    try:
+        migrate_sqlite(conn)
+        failures = report(f'SQLite ({args.sqlite})', explain_sqlite(conn))
+    finally:
+        conn.close()
+
+    if args.postgres:
+        import psycopg2
+        pg_conn = psycopg2.connect(args.postgres)
+        try:
+            migrate_postgres(pg_conn)
+            failures += report('PostgreSQL', explain_postgres(pg_conn))
+        finally:
+            pg_conn.close()
+
+    if failures:
+        print(f"❌ {failures} queries with rejected plans")
+        return 1
+    print('✅ Every query uses an index')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
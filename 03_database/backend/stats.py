@@ -0,0 +1,78 @@
+"""
+Checks for the trigger-maintained traffic_data aggregates (migration 3).
+
+Reads come from the one-row traffic_stats summary; these functions compare
+it with the full-table aggregate it stands for and rebuild it on drift.
+"""
+
+import os
+import time
+
+from .queries import (
+    PG_STATS_FIELDS, PG_STATS_FULL, PG_STATS_REBUILD, PG_STATS_SUMMARY, SQLITE_STATS_FULL, SQLITE_STATS_REBUILD,
+    SQLITE_STATS_SUMMARY, STATS_FIELDS
+)
+
+STATS_VERIFY_INTERVAL = float(os.getenv("STATS_VERIFY_INTERVAL", 3600))  # seconds; 0 disables
+
+
+def _compare(fields, summary, actual, started):
+    summary = dict(zip(fields, summary or (0,) * len(fields)))
+    actual = dict(zip(fields, actual))
+    drift = {field: {"summary": summary[field], "actual": actual[field]}
+             for field in fields if summary[field] != actual[field]}
+    return {
+        "consistent": not drift,
+        "drift": drift,
+        "repaired": False,
+        "checked_at": time.time(),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def verify_sqlite_stats(conn):
+    """Compare traffic_stats with the full aggregate, both read from one snapshot"""
+    started = time.perf_counter()
+    conn.execute("BEGIN")  # a WAL read transaction, so concurrent writes can't skew the comparison
+    try:
+        summary = conn.execute(SQLITE_STATS_SUMMARY).fetchone()
+        actual = conn.execute(SQLITE_STATS_FULL).fetchone()
+    finally:
+        conn.commit()
+    return _compare(STATS_FIELDS, summary and tuple(summary), tuple(actual), started)
+
+
+def rebuild_sqlite_stats(conn):
+    """Recompute the summary tables from traffic_data in one transaction"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in SQLITE_STATS_REBUILD:
+            conn.execute(statement)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def verify_postgres_stats(conn, repair=True):
+    """verify_sqlite_stats for a psycopg2 connection; rebuilds the summary on drift when ``repair``"""
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute(PG_STATS_SUMMARY)
+            summary = cursor.fetchone()
+            cursor.execute(PG_STATS_FULL)
+            actual = cursor.fetchone()
+        conn.commit()
+        result = _compare(PG_STATS_FIELDS, summary, actual, started)
+        if repair and not result["consistent"]:
+            with conn.cursor() as cursor:
+                for statement in PG_STATS_REBUILD:
+                    cursor.execute(statement)
+            conn.commit()
+            result["repaired"] = True
+        return result
+    except Exception:
+        conn.rollback()
+        raise
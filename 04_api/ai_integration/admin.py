@@ -1,12 +1,18 @@
 from django.contrib import admin
-from .models import AIModel, DetectionJob, ModelPerformance
+from .models import AIModel, CameraConfig, DetectionJob, ModelPerformance
 
 @admin.register(AIModel)
 class AIModelAdmin(admin.ModelAdmin):
-    list_display = ['name', 'version', 'model_type', 'is_active', 'accuracy', 'created_at']
-    list_filter = ['model_type', 'is_active', 'created_at']
+    list_display = ['name', 'version', 'model_type', 'inference_backend', 'is_active', 'accuracy', 'created_at']
+    list_filter = ['model_type', 'inference_backend', 'is_active', 'created_at']
     search_fields = ['name', 'version']
 
+@admin.register(CameraConfig)
+class CameraConfigAdmin(admin.ModelAdmin):
+    list_display = ['camera_id', 'name', 'tile_size', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    search_fields = ['camera_id', 'name']
+
 @admin.register(DetectionJob)
 class DetectionJobAdmin(admin.ModelAdmin):
     list_display = ['id', 'model_used', 'status', 'created_at', 'processing_time']
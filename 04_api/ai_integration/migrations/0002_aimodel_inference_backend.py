@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_integration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimodel',
+            name='inference_backend',
+            field=models.CharField(choices=[('pytorch', 'PyTorch (eager)'), ('onnx', 'ONNX Runtime (CPU)'), ('onnx_int8', 'ONNX Runtime INT8 (CPU)'), ('openvino', 'OpenVINO (CPU)')], default='pytorch', max_length=20),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_integration', '0002_aimodel_inference_backend'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CameraConfig',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('camera_id', models.CharField(max_length=100, unique=True)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('camera_url', models.CharField(blank=True, max_length=255)),
+                ('roi_polygons', models.JSONField(default=list)),
+                ('lane_polygons', models.JSONField(default=dict)),
+                ('reference_width', models.PositiveIntegerField(blank=True, null=True)),
+                ('reference_height', models.PositiveIntegerField(blank=True, null=True)),
+                ('tile_size', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
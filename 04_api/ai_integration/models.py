@@ -7,11 +7,18 @@ class AIModel(models.Model):
         ('yolov8m', 'YOLOv8 Medium'),
         ('custom', 'Custom Model'),
     ]
+    INFERENCE_BACKENDS = [
+        ('pytorch', 'PyTorch (eager)'),
+        ('onnx', 'ONNX Runtime (CPU)'),
+        ('onnx_int8', 'ONNX Runtime INT8 (CPU)'),
+        ('openvino', 'OpenVINO (CPU)'),
+    ]
     
     name = models.CharField(max_length=100)
     version = models.CharField(max_length=20, default='1.0.0')
     model_type = models.CharField(max_length=20, choices=MODEL_TYPES)
     model_file = models.FileField(upload_to='ai_models/', null=True, blank=True)
+    inference_backend = models.CharField(max_length=20, choices=INFERENCE_BACKENDS, default='pytorch')
     is_active = models.BooleanField(default=False)
     accuracy = models.FloatField(null=True, blank=True)
     classes = models.JSONField(default=list)  # List of class names
@@ -20,6 +27,34 @@ class AIModel(models.Model):
     def __str__(self):
         return f"{self.name} v{self.version}"
 
+class CameraConfig(models.Model):
+    """Per-camera detection regions: ROI polygons, lane polygons and tiling"""
+    camera_id = models.CharField(max_length=100, unique=True)
+    name = models.CharField(max_length=100, blank=True)
+    camera_url = models.CharField(max_length=255, blank=True)
+    roi_polygons = models.JSONField(default=list)  # [[[x, y], ...], ...] in reference pixels
+    lane_polygons = models.JSONField(default=dict)  # {"northbound_1": [[x, y], ...], ...}
+    reference_width = models.PositiveIntegerField(null=True, blank=True)
+    reference_height = models.PositiveIntegerField(null=True, blank=True)
+    tile_size = models.PositiveIntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def regions_config(self):
+        """Config dict for vision_engine's CameraRegions.from_config"""
+        reference_size = None
+        if self.reference_width and self.reference_height:
+            reference_size = [self.reference_width, self.reference_height]
+        return {
+            'rois': self.roi_polygons,
+            'lanes': self.lane_polygons,
+            'reference_size': reference_size,
+            'tile_size': self.tile_size
+        }
+    
+    def __str__(self):
+        return self.name or self.camera_id
+
 class DetectionJob(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -1,3 +1,165 @@
-from django.test import TestCase
+import io
+import json
+import zipfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import cv2
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.test import RequestFactory, TestCase
+
+from . import views
+from .models import CameraConfig
+from .uploads import decode_image, decode_upload, upload_buffer
+from .views import LiveTrafficDetector
+
+# views puts 02_ai_vision/vision_engine on sys.path, so these come after it.
+from postprocess import DETECTION_DTYPE
+from roi import CameraRegions
+
+
+def encoded_image(width=32, height=24, ext='.png'):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[:, :width // 2] = (0, 0, 255)
+    return cv2.imencode(ext, image)[1].tobytes()
+
+
+class UploadDecodeTests(TestCase):
+    def test_in_memory_upload_is_decoded_from_its_own_buffer(self):
+        upload = SimpleUploadedFile('frame.png', encoded_image())
+        self.assertEqual(bytes(upload_buffer(upload)), encoded_image())
+        self.assertEqual(decode_upload(upload).shape, (24, 32, 3))
+
+    def test_disk_backed_upload_is_read_into_one_buffer(self):
+        data = encoded_image(640, 480, '.jpg')
+        upload = TemporaryUploadedFile('frame.jpg', 'image/jpeg', len(data), None)
+        upload.write(data)
+        upload.flush()
+        try:
+            self.assertEqual(bytes(upload_buffer(upload)), data)
+            self.assertEqual(decode_upload(upload).shape, (480, 640, 3))
+        finally:
+            upload.close()
+
+    def test_unreadable_images_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            decode_image(b'not an image')
+
+    def test_detect_rejects_unreadable_uploads_with_400(self):
+        request = RequestFactory().post('/api/detect/', {'image': SimpleUploadedFile('frame.png', b'garbage')})
+        with mock.patch.object(views, 'YOLO_AVAILABLE', True):
+            response = views.detect_vehicles(request)
+        self.assertEqual(response.status_code, 400)
+
+
+class FakeBoxes:
+    def __init__(self, count):
+        self.cls = np.full(count, 2)
+        self.conf = np.full(count, 0.9)
+        self.xyxy = np.tile([0.0, 0.0, 10.0, 10.0], (count, 1))
+
+    def __len__(self):
+        return len(self.cls)
+
+
+class FakeYOLO:
+    """One car per 8 pixels of image width; records batch sizes"""
+    names = {2: 'car', 0: 'person'}
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, images, **kwargs):
+        self.batches.append(len(images))
+        return [SimpleNamespace(boxes=FakeBoxes(image.shape[1] // 8), speed={'inference': 1.0}) for image in images]
+
+
+class BatchDetectionTests(TestCase):
+    def setUp(self):
+        self.model = FakeYOLO()
+        patches = [mock.patch.object(views, 'YOLO_AVAILABLE', True), mock.patch.object(views, 'yolo_model', self.model)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def archive(self, members):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name, data in members:
+                archive.writestr(name, data)
+        return SimpleUploadedFile('frames.zip', buffer.getvalue(), content_type='application/zip')
+
+    def post(self, files, query=''):
+        return views.detect_vehicles_batch(RequestFactory().post(f'/api/detect/batch/{query}', files))
+
+    def test_images_and_archive_members_are_batched_in_upload_order(self):
+        response = self.post({
+            'images': [SimpleUploadedFile('a.png', encoded_image(16)), SimpleUploadedFile('b.png', encoded_image(24))],
+            'archive': self.archive([('c.png', encoded_image(32)), ('notes.txt', b'skip me'), ('d.png', b'broken')]),
+        }, '?batch_size=2')
+
+        body = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['image'] for item in body['results']], ['a.png', 'b.png', 'd.png', 'c.png'])
+        self.assertEqual([item['success'] for item in body['results']], [True, True, False, True])
+        self.assertEqual(body['vehicles_detected'], 2 + 3 + 4)
+        self.assertEqual(self.model.batches, [2, 1])
+
+    def test_ndjson_stream_has_one_line_per_image(self):
+        response = self.post({'images': [SimpleUploadedFile('a.png', encoded_image()),
+                                         SimpleUploadedFile('b.png', encoded_image())]}, '?stream=ndjson')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['image'] for line in lines], ['a.png', 'b.png'])
+
+    def test_requests_without_images_are_rejected(self):
+        self.assertEqual(self.post({}).status_code, 400)
+        self.assertEqual(self.post({'images': [SimpleUploadedFile('a.png', encoded_image())]},
+                                   '?batch_size=many').status_code, 400)
+
+
+class LaneAssignmentTests(TestCase):
+    def test_lanes_use_the_shape_of_the_frame_the_detections_came_from(self):
+        # Left and right halves of a 100x100 reference image
+        regions = CameraRegions(lanes={'west': [[0, 0], [50, 0], [50, 100], [0, 100]],
+                                       'east': [[50, 0], [100, 0], [100, 100], [50, 100]]},
+                                reference_size=[100, 100])
+        detector = LiveTrafficDetector(SimpleNamespace(names={2: 'car'}), regions=regions)
+        detector.frame_shape = (100, 100, 3)  # capture has already moved on to another stream size
+
+        detections = np.array([(2, 0.9, 70, 40, 90, 90)], dtype=DETECTION_DTYPE)
+        detector._postprocess_frame(np.zeros((100, 200, 3), dtype=np.uint8), detections)
+
+        self.assertEqual(detector.detection_results[-1]['lane'], 'west')
+
+
+class LiveInferenceFailureTests(TestCase):
+    def test_failed_inference_skips_the_frame(self):
+        scheduler = mock.Mock()
+        scheduler.submit.return_value.result.side_effect = RuntimeError('cuda out of memory')
+        detector = LiveTrafficDetector(SimpleNamespace(names={2: 'car'}), scheduler=scheduler)
+
+        self.assertIsNone(detector._infer_frame(np.zeros((24, 32, 3), dtype=np.uint8)))
+        scheduler.submit.return_value.result.assert_called_once_with(timeout=views.INFERENCE_TIMEOUT)
+
+
+class CameraConfigTests(TestCase):
+    url = '/api/live-detection/cameras/'
+
+    def post(self, payload):
+        return self.client.post(self.url, data=json.dumps(payload), content_type='application/json')
+
+    def test_saves_regions(self):
+        response = self.post({'camera_id': 'junction_1', 'reference_size': [1920, 1080],
+                              'rois': [[[0, 0], [1920, 0], [1920, 1080]]]})
+
+        self.assertEqual(response.status_code, 200)
+        config = CameraConfig.objects.get(camera_id='junction_1')
+        self.assertEqual((config.reference_width, config.reference_height), (1920, 1080))
+
+    def test_rejects_malformed_reference_size(self):
+        for reference_size in ([1920], [1920, 1080, 3], [1920, -1], ['wide', 'tall'], 1920):
+            response = self.post({'camera_id': 'junction_1', 'reference_size': reference_size})
+            self.assertEqual(response.status_code, 400, reference_size)
+        self.assertFalse(CameraConfig.objects.exists())
@@ -0,0 +1,84 @@
+import io
+import tarfile
+import zipfile
+
+import cv2
+import numpy as np
+
+
+def upload_buffer(uploaded_file):
+    """Return the raw bytes of an uploaded file without extra copies.
+
+    Small uploads (below FILE_UPLOAD_MAX_MEMORY_SIZE) already sit in a
+    BytesIO, whose buffer is exposed as-is. Larger ones are read in chunks
+    straight into a single preallocated buffer.
+    """
+    raw = getattr(uploaded_file, 'file', uploaded_file)
+    if isinstance(raw, io.BytesIO):
+        return raw.getbuffer()
+
+    buffer = bytearray(uploaded_file.size)
+    view = memoryview(buffer)
+    uploaded_file.seek(0)
+    offset = 0
+    if hasattr(raw, 'readinto'):
+        while offset < len(buffer):
+            read = raw.readinto(view[offset:])
+            if not read:
+                break
+            offset += read
+    else:
+        for chunk in uploaded_file.chunks():
+            view[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+    return view[:offset]
+
+
+def decode_image(data):
+    """Decode encoded image bytes (jpg, png ...) into a BGR NumPy array"""
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Uploaded file is not a readable image")
+    return image
+
+
+def decode_upload(uploaded_file):
+    """Decode an uploaded image in memory, ready to hand to YOLO"""
+    return decode_image(upload_buffer(uploaded_file))
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def iter_archive_images(uploaded_file):
+    """Yield (name, bytes) for every image inside an uploaded zip or tar archive.
+
+    Members are read one at a time, so only the frames currently being
+    batched are held in memory.
+    """
+    uploaded_file.seek(0)
+    if zipfile.is_zipfile(uploaded_file):
+        uploaded_file.seek(0)
+        with zipfile.ZipFile(uploaded_file) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    yield info.filename, archive.read(info)
+        return
+
+    uploaded_file.seek(0)
+    try:
+        archive = tarfile.open(fileobj=uploaded_file, mode='r:*')
+    except tarfile.TarError:
+        raise ValueError(f"{uploaded_file.name} is not a zip or tar archive")
+    with archive:
+        for member in archive:
+            if member.isfile() and member.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield member.name, archive.extractfile(member).read()
+
+
+def iter_uploaded_images(files):
+    """Yield (name, buffer) for each image posted as 'images'/'image' or inside an 'archive'"""
+    for uploaded_file in files.getlist('images') + files.getlist('image'):
+        yield uploaded_file.name, upload_buffer(uploaded_file)
+    for archive_file in files.getlist('archive'):
+        yield from iter_archive_images(archive_file)
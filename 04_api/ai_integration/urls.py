@@ -5,9 +5,11 @@ from . import views
 urlpatterns = [
     path('', views.api_root, name='api_root'),
     path('detect/', views.detect_vehicles, name='detect_vehicles'),
+    path('detect/batch/', views.detect_vehicles_batch, name='detect_vehicles_batch'),
     path('optimize/', views.optimize_traffic, name='optimize_traffic'),  # NEW
     path('live/start/', views.start_live_detection, name='start_live_detection'),
     path('live/stop/', views.stop_live_detection, name='stop_live_detection'),
     path('live/stats/', views.get_live_stats, name='get_live_stats'),
+    path('live/cameras/', views.camera_config, name='camera_config'),
     path('models/', views.ai_models, name='ai_models'),
 ]
\ No newline at end of file
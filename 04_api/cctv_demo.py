@@ -46,14 +46,11 @@ def cctv_live_demo(rtsp_url=None):
         if key == ord('q'):
             break
         elif key == ord('d'):
-            # Run detection on current frame
-            temp_file = "cctv_snapshot.jpg"
-            cv2.imwrite(temp_file, frame)
-            
+            # Run detection on current frame (JPEG-encoded in memory, no snapshot file)
             try:
-                with open(temp_file, 'rb') as img:
-                    files = {'image': img}
-                    response = requests.post('http://127.0.0.1:8000/api/detect/', files=files)
+                ok, jpeg = cv2.imencode('.jpg', frame)
+                files = {'image': ('cctv_snapshot.jpg', jpeg.tobytes(), 'image/jpeg')}
+                response = requests.post('http://127.0.0.1:8000/api/detect/', files=files)
                 
                 if response.status_code == 200:
                     data = response.json()
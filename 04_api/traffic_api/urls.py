@@ -8,7 +8,7 @@ from django.conf.urls.static import static
 import json
 
 # ✅ FIXED: Import all needed functions including ai_models
-from ai_integration.views import start_live_detection, stop_live_detection, get_live_stats, ai_models
+from ai_integration.views import start_live_detection, stop_live_detection, get_live_stats, ai_models, detect_vehicles_batch, camera_config
 
 # =====================
 # 🚦 HOME & API INFO
@@ -25,10 +25,12 @@ def home(request):
             "upload_image": "/api/upload/",
             "ai_models": "/api/ai-models/",
             "detect_vehicles": "/api/detect/",
+            "detect_vehicles_batch": "/api/detect/batch/",
             "stats": "/stats/",
             "live_detection_start": "/api/live-detection/start/",
             "live_detection_stop": "/api/live-detection/stop/",
-            "live_detection_stats": "/api/live-detection/stats/"
+            "live_detection_stats": "/api/live-detection/stats/",
+            "live_detection_cameras": "/api/live-detection/cameras/"
         },
         "usage": "POST images to /api/upload/ for training data collection or start live detection"
     })
@@ -195,12 +197,14 @@ urlpatterns = [
     path('api/ai-models/', ai_models, name='ai-models'),
     
     path('api/detect/', detect_vehicles, name='detect'),
+    path('api/detect/batch/', detect_vehicles_batch, name='detect-batch'),
     path('stats/', stats, name='stats'),
     
     # 🎥 Live Detection Endpoints
     path('api/live-detection/start/', start_live_detection, name='start-live-detection'),
     path('api/live-detection/stop/', stop_live_detection, name='stop-live-detection'),
     path('api/live-detection/stats/', get_live_stats, name='live-detection-stats'),
+    path('api/live-detection/cameras/', camera_config, name='live-detection-cameras'),
 ]
 
 # Serve media files in development
@@ -1,15 +1,19 @@
 ﻿# Training Engine Source Package
 from .data_loader import DataLoader
 from .preprocessor import DataPreprocessor
+from .feature_store import OnlineFeatureStore
 from .model_builder import ModelTrainer
 from .evaluator import ModelEvaluator
 from .train import TrainingPipeline, main
+from .prediction_service import PredictionService
 
 __all__ = [
     'DataLoader',
     'DataPreprocessor', 
+    'OnlineFeatureStore',
     'ModelTrainer',
     'ModelEvaluator',
     'TrainingPipeline',
+    'PredictionService',
     'main'
 ]
@@ -4,6 +4,13 @@ from datetime import datetime, timedelta
 import numpy as np
 import os
 
+# 03_database/backend/queries.py plan-checks the same statement
+TRAINING_HISTORY_SQL = '''
+    SELECT * FROM traffic_data
+    WHERE timestamp >= ? AND timestamp <= ?
+    ORDER BY timestamp
+'''
+
 class DataLoader:
     def __init__(self):
         self.db_path = os.path.join(os.path.dirname(__file__), '../../traffic_data.db')
@@ -26,13 +33,7 @@ class DataLoader:
             start_date = end_date - timedelta(days=days)
             
             # Try to read data
-            query = """
-            SELECT * FROM traffic_data 
-            WHERE timestamp >= ? AND timestamp <= ?
-            ORDER BY timestamp
-            """
-            
-            df = pd.read_sql_query(query, conn, params=[start_date, end_date])
+            df = pd.read_sql_query(TRAINING_HISTORY_SQL, conn, params=[start_date, end_date])
             conn.close()
             
             if df.empty:
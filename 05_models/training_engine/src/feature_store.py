@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+# Same windows DataPreprocessor.create_features has always used
+LAGS = (1, 2, 3, 24)  # 1,2,3 hours ago, 24 hours ago (same time yesterday)
+ROLLING_WINDOWS = (3, 6)
+
+# Bumped when a feature's definition changes. 2: rolling means cover the rows
+# before the target row (they used to include it), traffic_intensity dropped.
+FEATURE_VERSION = 2
+
+NOT_A_TIME = np.datetime64('NaT', 's')
+
+
+def lag_column(lag):
+    return f'vehicle_count_lag_{lag}'
+
+
+def rolling_column(window):
+    return f'vehicle_count_rolling_{window}'
+
+
+class OnlineFeatureStore:
+    """Per-intersection lag and rolling features maintained row by row.
+
+    Every intersection owns one row of a preallocated ring buffer holding
+    its last ``max(lags) + 1`` counts, plus a running sum per rolling
+    window. Appending a ``traffic_data`` row is O(1): one write, and one
+    add and subtract per window. The same state serves both sides:
+
+    * ``append`` returns the training features of the row just added,
+      identical to ``batch_features`` (``check_consistency`` verifies
+      this);
+    * ``next_features`` returns, for many intersections at once, the
+      features of the interval after the latest row, for live inference.
+
+    Both only look at counts before the row being predicted, so no
+    feature is derived from the target.
+    """
+
+    def __init__(self, lags=LAGS, windows=ROLLING_WINDOWS, initial_capacity=64):
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        self.length = max(max(self.lags) + 1, max(self.windows))
+        self.columns = [lag_column(lag) for lag in self.lags] + [rolling_column(window) for window in self.windows]
+
+        self._index = {}  # intersection_id -> buffer row
+        self._values = np.zeros((initial_capacity, self.length))
+        self._sums = np.zeros((initial_capacity, len(self.windows)))
+        self._head = np.zeros(initial_capacity, dtype=np.int64)  # next write position
+        self._size = np.zeros(initial_capacity, dtype=np.int64)
+        self._last = np.full(initial_capacity, NOT_A_TIME)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, intersection_id):
+        return intersection_id in self._index
+
+    def _row(self, intersection_id):
+        row = self._index.get(intersection_id)
+        if row is None:
+            row = self._index[intersection_id] = len(self._index)
+            if row == len(self._head):
+                self._grow()
+        return row
+
+    def _grow(self):
+        def grown(array, fill):
+            larger = np.full((len(array) * 2,) + array.shape[1:], fill, dtype=array.dtype)
+            larger[:len(array)] = array
+            return larger
+
+        self._values = grown(self._values, 0.0)
+        self._sums = grown(self._sums, 0.0)
+        self._head = grown(self._head, 0)
+        self._size = grown(self._size, 0)
+        self._last = grown(self._last, NOT_A_TIME)
+
+    # Updates ---------------------------------------------------------------
+
+    def append(self, intersection_id, timestamp, vehicle_count):
+        """Add the next row of one intersection; returns that row's training features"""
+        row = self._row(intersection_id)
+        # Computed from the history before this row, as next_features does when serving
+        features = self._row_features(row)
+        values, sums = self._values[row], self._sums[row]
+        head, size = self._head[row], self._size[row]
+        for j, window in enumerate(self.windows):
+            if size >= window:
+                sums[j] -= values[(head - window) % self.length]
+        values[head] = vehicle_count
+        sums += vehicle_count
+        self._head[row] = (head + 1) % self.length
+        self._size[row] = min(size + 1, self.length)
+        self._last[row] = timestamp
+        return features
+
+    def update_last(self, intersection_id, vehicle_count):
+        """Replace the newest count of one intersection (e.g. a still-open interval)"""
+        row = self._index[intersection_id]
+        newest = (self._head[row] - 1) % self.length
+        self._sums[row] += vehicle_count - self._values[row, newest]
+        self._values[row, newest] = vehicle_count
+
+    def last_timestamp(self, intersection_id):
+        row = self._index.get(intersection_id)
+        return NOT_A_TIME if row is None else self._last[row]
+
+    # Features --------------------------------------------------------------
+
+    def _row_features(self, row):
+        """Features of the row about to be appended: lag k is the k-th newest stored count"""
+        values, head, size = self._values[row], self._head[row], self._size[row]
+        features = {}
+        for lag in self.lags:
+            features[lag_column(lag)] = values[(head - lag) % self.length] if size >= lag else np.nan
+        for j, window in enumerate(self.windows):
+            features[rolling_column(window)] = self._sums[row, j] / min(size, window) if size else np.nan
+        return features
+
+    def next_features(self, intersection_ids, pad=False):
+        """Features for the interval after each intersection's latest row.
+
+        Returns ``(known, features, last_timestamps)``: the positions in
+        ``intersection_ids`` that have any history, a dict of feature
+        arrays for those, and their latest row timestamps. Lag k is the
+        k-th newest count; rolling means cover the newest counts. Lags
+        with too little history are NaN, or the oldest count with ``pad``.
+        """
+        known = [i for i, intersection_id in enumerate(intersection_ids) if intersection_id in self._index]
+        rows = np.array([self._index[intersection_ids[i]] for i in known], dtype=np.int64)
+        head, size = self._head[rows], self._size[rows]
+
+        features = {}
+        for lag in self.lags:
+            values = self._values[rows, (head - np.minimum(lag, size)) % self.length]
+            features[lag_column(lag)] = values if pad else np.where(size >= lag, values, np.nan)
+        for j, window in enumerate(self.windows):
+            features[rolling_column(window)] = self._sums[rows, j] / np.maximum(np.minimum(size, window), 1)
+        return np.array(known, dtype=np.int64), features, self._last[rows]
+
+    # Batches ---------------------------------------------------------------
+
+    def build_frame(self, df):
+        """Append every row of ``df`` in order; returns the training feature columns on df's index.
+
+        ``df`` needs intersection_id, timestamp and vehicle_count and must
+        be sorted by intersection and time, as DataPreprocessor sorts it.
+        """
+        timestamps = pd.to_datetime(df['timestamp']).values.astype('datetime64[s]')
+        rows = [self.append(intersection_id, timestamp, vehicle_count)
+                for intersection_id, timestamp, vehicle_count in zip(
+                    df['intersection_id'].tolist(), timestamps, df['vehicle_count'].astype(float).tolist())]
+        return pd.DataFrame(rows, index=df.index, columns=self.columns)
+
+    def get_stats(self):
+        return {
+            'intersections': len(self._index),
+            'history_length': self.length,
+            'buffer_bytes': int(self._values.nbytes + self._sums.nbytes)
+        }
+
+
+def batch_features(df, lags=LAGS, windows=ROLLING_WINDOWS):
+    """Reference pandas implementation of the lag and rolling columns over a sorted frame"""
+    grouped = df.groupby('intersection_id')['vehicle_count']
+    features = pd.DataFrame(index=df.index)
+    for lag in lags:
+        features[lag_column(lag)] = grouped.shift(lag)
+    for window in windows:
+        # Mean of the ``window`` rows before each row; the row itself is the target
+        features[rolling_column(window)] = grouped.transform(
+            lambda counts: counts.shift(1).rolling(window, min_periods=1).mean())
+    return features
+
+
+def check_consistency(df, lags=LAGS, windows=ROLLING_WINDOWS, atol=1e-9):
+    """Compare the online store against the batch implementation on ``df``.
+
+    Returns ``{'rows': n, 'mismatches': {column: count}, 'consistent': bool}``;
+    NaNs in the same place count as equal.
+    """
+    df = df.assign(timestamp=pd.to_datetime(df['timestamp'])).sort_values(['intersection_id', 'timestamp'])
+    online = OnlineFeatureStore(lags, windows).build_frame(df)
+    batch = batch_features(df, lags, windows)
+
+    mismatches = {}
+    for column in online.columns:
+        a, b = online[column].to_numpy(dtype=np.float64), batch[column].to_numpy(dtype=np.float64)
+        same = np.isclose(a, b, rtol=0.0, atol=atol) | (np.isnan(a) & np.isnan(b))
+        if not same.all():
+            mismatches[column] = int((~same).sum())
+    return {'rows': len(df), 'mismatches': mismatches, 'consistent': not mismatches}
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(0)
+    hours = pd.date_range('2025-01-01', periods=24 * 30, freq='h')
+    sample = pd.DataFrame({
+        'intersection_id': np.repeat([f'intersection_{i}' for i in range(1, 21)], len(hours)),
+        'timestamp': np.tile(hours, 20),
+        'vehicle_count': rng.integers(5, 80, 20 * len(hours)),
+    }).sample(frac=1.0, random_state=0)
+
+    started = time.perf_counter()
+    report = check_consistency(sample)
+    print(f"{'✅' if report['consistent'] else '❌'} {report['rows']} rows checked in "
+          f"{(time.perf_counter() - started) * 1000:.0f}ms, mismatches: {report['mismatches']}")
+
+    store = OnlineFeatureStore()
+    store.build_frame(sample.sort_values(['intersection_id', 'timestamp']))
+    started = time.perf_counter()
+    store.append('intersection_1', np.datetime64('2025-02-01T00:00', 's'), 42.0)
+    print(f"Single append: {(time.perf_counter() - started) * 1e6:.1f}us")
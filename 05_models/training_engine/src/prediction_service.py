@@ -0,0 +1,218 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Time-of-day profiles live in 01_core_engine
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '01_core_engine'))
+
+from time_profiles import TimeProfiles, get_profiles, to_local_naive
+
+from .feature_store import FEATURE_VERSION, OnlineFeatureStore
+
+DEFAULT_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+DEFAULT_INTERVAL_MINUTES = 60  # DataPreprocessor lags are hourly rows
+
+
+class PredictionService:
+    """Next-interval vehicle count forecasts from the trained traffic model.
+
+    The model and its metadata are loaded once. Lag and rolling features
+    come from an ``OnlineFeatureStore`` updated in O(1) per observation -
+    the same store DataPreprocessor trains from - instead of being
+    re-derived from the database. ``forecast_many`` builds one
+    feature row per intersection for the interval after its latest
+    observation and runs a single batched ``predict``.
+
+    Observations closer together than the training interval update the
+    current interval's count instead of shifting the lags.
+    """
+
+    def __init__(self, models_dir=None, model=None, metadata=None, profiles=None, feature_store=None):
+        models_dir = models_dir or DEFAULT_MODELS_DIR
+        if model is None:
+            model = joblib.load(os.path.join(models_dir, 'traffic_model.pkl'))
+            # Saved by TrainingPipeline.save_model alongside the model it belongs to
+            store_path = os.path.join(models_dir, 'feature_store.pkl')
+            if feature_store is None and os.path.exists(store_path):
+                feature_store = joblib.load(store_path)
+        if metadata is None:
+            with open(os.path.join(models_dir, 'model_metadata.json')) as f:
+                metadata = json.load(f)
+        self.model = model
+        self.feature_names = list(metadata['feature_names'])
+        # Older metadata files predate the saved preprocessing state
+        state = metadata.get('preprocessing', {})
+        if state.get('feature_version', 1) < FEATURE_VERSION:
+            leaked = [name for name in self.feature_names
+                      if name == 'traffic_intensity' or name.startswith('vehicle_count_rolling_')]
+            if leaked:
+                raise ValueError(f"Model was trained on features computed from the target row ({leaked}); "
+                                 f"its forecasts would echo the latest count. Retrain it.")
+        unknown = [name for name in self.feature_names if name not in FEATURE_BUILDERS]
+        if unknown:
+            raise ValueError(f"Model uses features the prediction service cannot build: {unknown}")
+
+        if 'intersection_id_encoded' in self.feature_names and 'intersection_classes' not in state:
+            raise ValueError("Model uses intersection_id_encoded but its metadata has no intersection_classes; "
+                             "every intersection would get a code it never saw in training. Retrain it.")
+        self.classes = {name: code for code, name in enumerate(state.get('intersection_classes', []))}
+        self.interval = np.timedelta64(int(round((state.get('interval_minutes') or DEFAULT_INTERVAL_MINUTES) * 60)), 's')
+        # Rush-hour flags per intersection and 15-minute slot, as used in training
+        self.profiles = profiles or get_profiles()
+        # Models saved before the marker existed were trained on the fixed rush hours
+        trained = state.get('time_profiles') or TimeProfiles().identity()
+        self.profile_mismatch = trained['fingerprint'] != self.profiles.fingerprint()
+        if self.profile_mismatch:
+            print(f"⚠️ Model was trained with time profiles {trained['fingerprint']} ({trained['source']}) but "
+                  f"{self.profiles.fingerprint()} ({self.profiles.source}) are loaded; is_rush_hour will not "
+                  f"match training. Retrain or point TIME_PROFILES_PATH at the training profiles.")
+
+        # Continues from the end of the training data when the saved (or passed)
+        # DataPreprocessor.feature_store is available; an empty store is falsy
+        self.feature_store = feature_store if feature_store is not None else OnlineFeatureStore()
+        self._lock = threading.Lock()
+        self.predictions = 0
+        self.batches = 0
+
+    # State -----------------------------------------------------------------
+
+    @staticmethod
+    def _as_datetime64(timestamp):
+        """Naive local datetime64, like the training timestamps"""
+        if isinstance(timestamp, (int, float)):
+            timestamp = datetime.fromtimestamp(timestamp)
+        elif isinstance(timestamp, datetime) and timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        return np.datetime64(timestamp, 's')
+
+    def _observe(self, intersection_id, timestamp, vehicle_count):
+        last = self.feature_store.last_timestamp(intersection_id)
+        if not np.isnat(last) and timestamp - last < self.interval:
+            self.feature_store.update_last(intersection_id, vehicle_count)
+        else:
+            self.feature_store.append(intersection_id, timestamp, vehicle_count)
+
+    def observe(self, intersection_id, timestamp, vehicle_count):
+        """Record the count of one intersection; ``timestamp`` is a datetime or unix seconds"""
+        with self._lock:
+            self._observe(intersection_id, self._as_datetime64(timestamp), float(vehicle_count))
+
+    def observe_many(self, intersection_ids, timestamp, vehicle_counts):
+        """Record one batch of counts; ``timestamp`` is shared by the batch"""
+        timestamp = self._as_datetime64(timestamp)
+        with self._lock:
+            for intersection_id, vehicle_count in zip(intersection_ids, np.asarray(vehicle_counts, dtype=np.float64).tolist()):
+                self._observe(intersection_id, timestamp, vehicle_count)
+
+    def load_history(self, df):
+        """Warm up the state from a traffic_data frame (intersection_id, timestamp, vehicle_count)"""
+        df = df.assign(timestamp=to_local_naive(pd.to_datetime(df['timestamp']))).sort_values('timestamp')
+        with self._lock:
+            for intersection_id, timestamp, vehicle_count in zip(
+                    df['intersection_id'], df['timestamp'].values.astype('datetime64[s]'),
+                    df['vehicle_count'].astype(float)):
+                self._observe(intersection_id, timestamp, vehicle_count)
+
+    # Forecasts -------------------------------------------------------------
+
+    def build_features(self, intersection_ids, store_features, timestamps):
+        """Feature frame for the interval starting at ``timestamps``, in training column order"""
+        context = {
+            'intersection_ids': intersection_ids,
+            'store_features': store_features,
+            'timestamps': timestamps,
+            'service': self
+        }
+        return pd.DataFrame({name: FEATURE_BUILDERS[name](context) for name in self.feature_names},
+                            columns=self.feature_names)
+
+    def forecast_many(self, intersection_ids):
+        """Next-interval counts for all ``intersection_ids``.
+
+        NaN where nothing was observed yet, or where the model encodes
+        intersections and this one was not in its training data.
+        """
+        intersection_ids = list(intersection_ids)
+        forecast = np.full(len(intersection_ids), np.nan)
+        with self._lock:
+            # Training drops rows with missing lags, so short histories are padded
+            known, store_features, starts = self.feature_store.next_features(intersection_ids, pad=True)
+        if 'intersection_id_encoded' in self.feature_names:
+            trained = np.array([str(intersection_ids[i]) in self.classes for i in known], dtype=bool)
+            known, starts = known[trained], starts[trained]
+            store_features = {column: values[trained] for column, values in store_features.items()}
+        if not len(known):
+            return forecast
+
+        features = self.build_features([intersection_ids[i] for i in known], store_features, starts + self.interval)
+        forecast[known] = np.maximum(self.model.predict(features), 0.0)
+        self.predictions += len(known)
+        self.batches += 1
+        return forecast
+
+    def forecast(self, intersection_ids):
+        """forecast_many as an {intersection_id: count} dict, skipping intersections without data"""
+        intersection_ids = list(intersection_ids)
+        values = self.forecast_many(intersection_ids)
+        return {intersection_id: float(value) for intersection_id, value in zip(intersection_ids, values)
+                if not np.isnan(value)}
+
+    def get_stats(self):
+        return {
+            'intersections': len(self.feature_store),
+            'features': len(self.feature_names),
+            'interval_minutes': int(self.interval.astype(np.int64)) / 60,
+            'time_profiles': self.profiles.fingerprint(),
+            'profile_mismatch': self.profile_mismatch,
+            'predictions': self.predictions,
+            'batches': self.batches
+        }
+
+
+# Feature builders ------------------------------------------------------------
+#
+# Each mirrors a DataPreprocessor.create_features column for the interval
+# being forecast. Lags and rolling means only cover counts before the target
+# row in training, so the latest observations fill them exactly.
+
+def _hours(context):
+    return (context['timestamps'] - context['timestamps'].astype('datetime64[D]')).astype(np.int64) // 3600
+
+
+def _days_of_week(context):
+    return (context['timestamps'].astype('datetime64[D]').astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+
+
+def _rush_hours(context):
+    _, rush = context['service'].profiles.lookup_times(context['intersection_ids'], context['timestamps'])
+    return rush.astype(bool)
+
+
+def _intersection_codes(context):
+    classes = context['service'].classes
+    return np.array([classes.get(str(intersection_id), -1) for intersection_id in context['intersection_ids']])
+
+
+def _from_store(column):
+    return lambda context: context['store_features'][column]
+
+
+FEATURE_BUILDERS = {
+    'hour': _hours,
+    'day_of_week': _days_of_week,
+    'is_weekend': lambda context: (_days_of_week(context) >= 5).astype(int),
+    'month': lambda context: context['timestamps'].astype('datetime64[M]').astype(np.int64) % 12 + 1,
+    'is_rush_hour': _rush_hours,
+    'hour_sin': lambda context: np.sin(2 * np.pi * _hours(context) / 24),
+    'hour_cos': lambda context: np.cos(2 * np.pi * _hours(context) / 24),
+    'day_sin': lambda context: np.sin(2 * np.pi * _days_of_week(context) / 7),
+    'day_cos': lambda context: np.cos(2 * np.pi * _days_of_week(context) / 7),
+    'intersection_id_encoded': _intersection_codes,
+}
+FEATURE_BUILDERS.update({column: _from_store(column) for column in OnlineFeatureStore().columns})
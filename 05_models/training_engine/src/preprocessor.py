@@ -1,18 +1,34 @@
-﻿import pandas as pd
+﻿import os
+import sys
+
+import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
 
+# Time-of-day profiles live in 01_core_engine
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '01_core_engine'))
+
+from time_profiles import get_profiles, to_local_naive
+
+from .feature_store import FEATURE_VERSION, OnlineFeatureStore
+
 class DataPreprocessor:
-    def __init__(self):
+    def __init__(self, profiles=None):
         self.scaler = StandardScaler()
         self.label_encoders = {}
         self.feature_columns = []
+        # Rush-hour flags per intersection and 15-minute slot (default: 7-9h and 16-18h)
+        self.profiles = profiles or get_profiles()
+        # Fitted state the prediction service needs to rebuild features online
+        self.interval_minutes = None
+        # Lag/rolling state after the last training row; can warm up live inference
+        self.feature_store = None
     
     def create_features(self, df):
         """Create time-based and traffic features"""
-        # Convert timestamp
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        # Convert timestamp; profiles and time features use local wall-clock time
+        df['timestamp'] = to_local_naive(pd.to_datetime(df['timestamp']))
         df = df.sort_values(['intersection_id', 'timestamp'])
         
         # Time-based features
@@ -20,7 +36,7 @@ class DataPreprocessor:
         df['day_of_week'] = df['timestamp'].dt.dayofweek
         df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
         df['month'] = df['timestamp'].dt.month
-        df['is_rush_hour'] = ((df['hour'] >= 7) & (df['hour'] <= 9)) | ((df['hour'] >= 16) & (df['hour'] <= 18))
+        _, df['is_rush_hour'] = self.profiles.lookup_times(df['intersection_id'], df['timestamp'].values)
         
         # Cyclical features for time
         df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
@@ -33,21 +49,18 @@ class DataPreprocessor:
             self.label_encoders['intersection_id'] = LabelEncoder()
             df['intersection_id_encoded'] = self.label_encoders['intersection_id'].fit_transform(df['intersection_id'])
         
-        # Traffic intensity (normalize vehicle count)
-        if 'vehicle_count' in df.columns:
-            max_count = df['vehicle_count'].max()
-            if max_count > 0:
-                df['traffic_intensity'] = df['vehicle_count'] / max_count
-        
-        # Lag features (previous time periods)
-        for lag in [1, 2, 3, 24]:  # 1,2,3 hours ago, 24 hours ago (same time yesterday)
-            lag_col = f'vehicle_count_lag_{lag}'
-            df[lag_col] = df.groupby('intersection_id')['vehicle_count'].shift(lag)
+        # Typical spacing between rows of one intersection (lags are counted in rows)
+        step = df.groupby('intersection_id')['timestamp'].diff().median()
+        if pd.notna(step):
+            self.interval_minutes = step.total_seconds() / 60
         
-        # Rolling statistics
+        # Lag features (previous time periods) and rolling statistics over the rows
+        # before each one, built by the same online store that serves live inference
+        # (see feature_store.check_consistency). Nothing is derived from the row's own
+        # count, which is the target - the old traffic_intensity column was.
         if 'vehicle_count' in df.columns:
-            df['vehicle_count_rolling_3'] = df.groupby('intersection_id')['vehicle_count'].rolling(3, min_periods=1).mean().reset_index(0, drop=True)
-            df['vehicle_count_rolling_6'] = df.groupby('intersection_id')['vehicle_count'].rolling(6, min_periods=1).mean().reset_index(0, drop=True)
+            self.feature_store = OnlineFeatureStore()
+            df = df.join(self.feature_store.build_frame(df))
         
         return df
     
@@ -75,7 +88,7 @@ class DataPreprocessor:
         self.feature_columns = [
             'hour', 'day_of_week', 'is_weekend', 'month', 'is_rush_hour',
             'hour_sin', 'hour_cos', 'day_sin', 'day_cos',
-            'intersection_id_encoded', 'traffic_intensity'
+            'intersection_id_encoded'
         ]
         
         # Add lag and rolling features if they exist
@@ -95,3 +108,14 @@ class DataPreprocessor:
         
         print(f"✅ Final dataset: {X.shape[0]} samples, {X.shape[1]} features")
         return X, y, self.feature_columns
+    
+    def get_state(self):
+        """JSON-serializable preprocessing state saved next to the model"""
+        encoder = self.label_encoders.get('intersection_id')
+        return {
+            'feature_version': FEATURE_VERSION,
+            'intersection_classes': [str(c) for c in encoder.classes_] if encoder is not None else [],
+            'interval_minutes': self.interval_minutes,
+            # is_rush_hour depends on the profiles; serving checks it uses the same ones
+            'time_profiles': self.profiles.identity()
+        }
@@ -83,13 +83,20 @@ class TrainingPipeline:
         # Save model
         joblib.dump(model, model_path)
         
+        # Lag/rolling state after the last training row, so PredictionService
+        # can forecast straight away instead of waiting for max-lag new rows
+        if self.preprocessor.feature_store is not None:
+            joblib.dump(self.preprocessor.feature_store, os.path.join(self.settings.MODELS_DIR, 'feature_store.pkl'))
+        
         # Save metadata
         metadata = {
             'feature_names': feature_names,
             'metrics': metrics,
             'model_type': type(model).__name__,
             'training_date': datetime.now().isoformat(),
-            'feature_count': len(feature_names)
+            'feature_count': len(feature_names),
+            # Needed by PredictionService to build features for live forecasts
+            'preprocessing': self.preprocessor.get_state()
         }
         
         with open(metadata_path, 'w') as f:
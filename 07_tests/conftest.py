@@ -0,0 +1,45 @@
+# conftest.py
+"""Shared fixtures for modules that do work when they are imported"""
+import importlib
+import os
+import sys
+import types
+from unittest import mock
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, '03_database'))
+
+
+@pytest.fixture(scope='session')
+def database(tmp_path_factory):
+    """backend.database, imported from a scratch directory"""
+    for module in ('pydantic', 'dotenv', 'motor'):
+        pytest.importorskip(module)
+    # Importing backend.database initialises traffic_data.db in the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('cwd'))
+    try:
+        return importlib.import_module('backend.database')
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture(scope='session')
+def final_api():
+    """04_api/final_api, imported without PostgreSQL migrations or a YOLO model"""
+    pytest.importorskip('flask')
+    pytest.importorskip('psycopg2')
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, '04_api'))
+    # final_api loads and warms up YOLO at import; a stub detector stands in for the import only
+    saved = sys.modules.get('lightweight_detector')
+    sys.modules['lightweight_detector'] = types.SimpleNamespace(LightweightTrafficAnalyzer=mock.Mock)
+    try:
+        with mock.patch.dict(os.environ, {'TRAFFIC_DB_MIGRATE': '0'}):
+            return importlib.import_module('final_api')
+    finally:
+        if saved is None:
+            del sys.modules['lightweight_detector']
+        else:
+            sys.modules['lightweight_detector'] = saved
@@ -1,10 +1,16 @@
 ﻿import cv2
-from ultralytics import YOLO
+import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+from model_registry import get_model
+from postprocess import extract_detections
+
 class InstantTrafficAI:
     def __init__(self):
-        self.model = YOLO('yolov8n.pt')  # Auto-downloads 5MB model
+        self.model = get_model('yolov8n.pt')  # Auto-downloads 5MB model
         self.vehicle_classes = [2, 3, 5, 7]  # COCO dataset classes
         
     def analyze_webcam(self):
@@ -45,12 +51,9 @@ class InstantTrafficAI:
         return self.get_traffic_decision(vehicle_count)
     
     def count_vehicles(self, results):
-        count = 0
-        if results and results[0].boxes is not None:
-            for box in results[0].boxes:
-                if int(box.cls) in self.vehicle_classes and box.conf > 0.5:
-                    count += 1
-        return count
+        if not results:
+            return 0
+        return len(extract_detections(results[0], class_ids=self.vehicle_classes, min_conf=0.5))
     
     def get_traffic_decision(self, vehicle_count):
         congestion = 'High' if vehicle_count > 12 else 'Medium' if vehicle_count > 5 else 'Low'
@@ -0,0 +1,50 @@
+# test_bulk_ingest.py
+"""Bulk traffic_data uploads on the FastAPI backend: NDJSON parsing and per-row validation"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('pydantic')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '03_database'))
+
+from backend.bulk import is_ndjson, read_ndjson, validate_rows
+
+ROW = b'{"intersection_id": "A", "vehicle_count": 3, "average_speed": 40.0, "traffic_light_id": "L1"}'
+
+
+async def chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def parse(data, size=7):
+    async def collect():
+        return [item async for item in read_ndjson(chunked(data, size))]
+    return asyncio.run(collect())
+
+
+def test_ndjson_lines_survive_arbitrary_chunk_boundaries():
+    body = ROW + b'\n\n' + ROW.replace(b'"A"', b'"B"') + b'\n' + ROW.replace(b'"A"', b'"C"')
+    rows = parse(body)
+
+    assert [index for index, _ in rows] == [0, 1, 2]
+    assert [row['intersection_id'] for _, row in rows] == ['A', 'B', 'C']
+
+
+def test_bad_rows_are_reported_by_index_and_good_rows_kept(database):
+    body = b'\n'.join([ROW, b'{not json', ROW.replace(b'3', b'"many"')])
+    valid, errors = validate_rows(parse(body), database.TrafficData)
+
+    assert len(valid) == 1 and valid[0].intersection_id == 'A'
+    assert [error['index'] for error in errors] == [1, 2]
+    assert 'Invalid JSON' in errors[0]['errors'][0]['msg']
+    assert errors[1]['errors'][0]['loc'] == ['vehicle_count']
+
+
+def test_ndjson_content_types():
+    assert is_ndjson('application/x-ndjson; charset=utf-8')
+    assert not is_ndjson('application/json')
+    assert not is_ndjson(None)
@@ -0,0 +1,59 @@
+# test_corridor.py
+"""Corridor green-wave offsets: bandwidth, full solve and incremental updates"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01_core_engine'))
+
+from corridor import Corridor
+
+
+def corridor(n=4, length=500.0, speed=36.0, **kwargs):
+    ids = [f'J{i}' for i in range(n)]
+    # 36 km/h over 500 m: 50 s per link
+    return Corridor(ids, [(ids[i], ids[i + 1], length, speed) for i in range(n - 1)], **kwargs)
+
+
+def test_outbound_progression_gives_the_full_green_band():
+    road = corridor(cycle=90, inbound_weight=0.0)
+    plan = road.optimize()
+
+    assert plan['outbound_bandwidth'] == 45.0
+    assert [signal['offset'] for signal in plan['signals']] == [0.0, 50.0, 10.0, 60.0]
+
+
+def test_optimize_is_at_least_as_good_as_every_start():
+    road = corridor(n=5, cycle=80)
+    road.green = np.array([40.0, 30.0, 50.0, 35.0, 45.0])
+    starts = [np.zeros(5), road._ideal_offsets(), np.mod(road.inbound_time, road.cycle)]
+    start_scores = []
+    for start in starts:
+        road.offset = np.round(start)
+        start_scores.append(road._score(*road.bandwidth()))
+
+    plan = road.optimize()
+    assert road._score(plan['outbound_bandwidth'], plan['inbound_bandwidth']) >= max(start_scores)
+
+
+def test_update_counts_keeps_the_common_cycle():
+    road = corridor(cycle=90)
+    road.set_all_counts(np.full((4, 2), 10.0))
+    before = road.green.copy()
+
+    plan = road.update_counts('J2', [[40, 5]])
+
+    assert plan['cycle'] == 90
+    assert road.green[2] > before[2]
+    assert np.array_equal(np.delete(road.green, 2), np.delete(before, 2))
+    assert 'offsets_changed' in plan
+
+
+def test_links_must_join_neighbouring_signals():
+    with pytest.raises(ValueError):
+        Corridor(['A', 'B', 'C'], [('A', 'C', 500, 40), ('A', 'B', 500, 40)])
+    with pytest.raises(ValueError):
+        Corridor(['A', 'B', 'C'], [('A', 'B', 500, 40)])
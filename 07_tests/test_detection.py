@@ -98,7 +98,7 @@ def test_api_detection():
         print(f"❌ Unexpected error: {type(e).__name__}: {e}")
 
 def test_multiple_images():
-    """Test with multiple images if available"""
+    """Test with multiple images if available - sent as one batch request"""
     image_folder = "../test_images/"
     
     if os.path.exists(image_folder):
@@ -107,30 +107,33 @@ def test_multiple_images():
         
         if image_files:
             print(f"\n🔍 Found {len(image_files)} test images")
+            print(f"\n{'='*50}")
+            print(f"Testing batch detection on {len(image_files)} images")
             
-            for i, img_file in enumerate(image_files[:3]):  # Test first 3
-                img_path = os.path.join(image_folder, img_file)
-                print(f"\n{'='*50}")
-                print(f"Testing image {i+1}: {img_file}")
-                
+            try:
+                files = [
+                    ('images', (img_file, open(os.path.join(image_folder, img_file), 'rb'), 'image/jpeg'))
+                    for img_file in image_files
+                ]
                 try:
-                    with open(img_path, 'rb') as img:
-                        files = {'image': img}
-                        response = requests.post("http://127.0.0.1:8000/api/detect/", files=files)
+                    response = requests.post("http://127.0.0.1:8000/api/detect/batch/", files=files)
+                finally:
+                    for _, (_, img, _) in files:
+                        img.close()
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    for item in result.get('results', []):
+                        if item.get('success'):
+                            print(f"✅ {item['image']}: detected {item['vehicles_detected']} vehicles")
+                        else:
+                            print(f"❌ {item['image']}: {item.get('error')}")
+                    print(f"⏱️ Batch processing time: {result.get('processing_time')}")
+                else:
+                    print(f"❌ Failed: {response.status_code}")
                     
-                    if response.status_code == 200:
-                        result = response.json()
-                        if 'detections' in result:
-                            count = len(result['detections'])
-                            print(f"✅ Detected {count} vehicles")
-                        elif 'counts' in result:
-                            total = sum(result['counts'].values())
-                            print(f"✅ Total vehicles: {total}")
-                    else:
-                        print(f"❌ Failed: {response.status_code}")
-                        
-                except Exception as e:
-                    print(f"❌ Error: {e}")
+            except Exception as e:
+                print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
     print("🧪 SMART TRAFFIC OPTIMIZER - API TEST")
@@ -0,0 +1,74 @@
+# test_feature_store.py
+"""OnlineFeatureStore: O(1) lag/rolling features that match the batch frame and serving"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('sklearn')
+pytest.importorskip('joblib')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '05_models', 'training_engine'))
+
+from src.feature_store import OnlineFeatureStore, check_consistency, lag_column, rolling_column
+
+
+def hourly_frame(intersections=3, hours=60, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2025-01-01', periods=hours, freq='h')
+    return pd.DataFrame({
+        'intersection_id': np.repeat([f'I{i}' for i in range(intersections)], hours),
+        'timestamp': np.tile(timestamps, intersections),
+        'vehicle_count': rng.integers(0, 80, intersections * hours),
+    })
+
+
+def test_online_store_matches_the_batch_implementation():
+    report = check_consistency(hourly_frame().sample(frac=1.0, random_state=1))
+    assert report['consistent'], report['mismatches']
+
+
+def test_training_features_never_include_the_target_row():
+    store = OnlineFeatureStore()
+    first = store.append('A', np.datetime64('2025-01-01T00:00', 's'), 10.0)
+    second = store.append('A', np.datetime64('2025-01-01T01:00', 's'), 1000.0)
+
+    assert np.isnan(first[rolling_column(3)]) and np.isnan(first[lag_column(1)])
+    assert second[lag_column(1)] == 10.0
+    assert second[rolling_column(3)] == 10.0  # the 1000 being predicted is not in it
+
+
+def test_serving_features_equal_the_next_training_row():
+    df = hourly_frame(intersections=2, hours=40)
+    store = OnlineFeatureStore()
+    store.build_frame(df.iloc[:-1].sort_values(['intersection_id', 'timestamp']))
+
+    last = df.iloc[-1]
+    _, serving, _ = store.next_features([last['intersection_id']])
+    training = store.append(last['intersection_id'], np.datetime64(last['timestamp'], 's'), float(last['vehicle_count']))
+    for column in store.columns:
+        assert serving[column][0] == pytest.approx(training[column], nan_ok=True)
+
+
+def test_update_last_replaces_the_open_interval():
+    store = OnlineFeatureStore(lags=(1,), windows=(2,))
+    store.append('A', np.datetime64('2025-01-01T00:00', 's'), 10.0)
+    store.append('A', np.datetime64('2025-01-01T01:00', 's'), 20.0)
+    store.update_last('A', 40.0)
+
+    _, features, _ = store.next_features(['A'])
+    assert features[lag_column(1)][0] == 40.0
+    assert features[rolling_column(2)][0] == 25.0
+
+
+def test_store_grows_past_its_initial_capacity():
+    store = OnlineFeatureStore(initial_capacity=2)
+    for i in range(5):
+        store.append(f'I{i}', np.datetime64('2025-01-01T00:00', 's'), float(i))
+    known, features, _ = store.next_features([f'I{i}' for i in range(5)] + ['missing'])
+
+    assert len(store) == 5
+    assert known.tolist() == [0, 1, 2, 3, 4]
+    assert features[lag_column(1)].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
@@ -0,0 +1,85 @@
+# test_final_api_bulk.py
+"""POST /traffic-data/bulk on the Flask API: bad readings are rejected one by one"""
+import csv
+import io
+
+import pytest
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def copy_expert(self, sql, buffer):
+        self.conn.copied.extend(csv.reader(io.StringIO(buffer.getvalue())))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.copied = []
+        self.committed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def copy_target(monkeypatch, final_api):
+    conn = FakeConnection()
+    monkeypatch.setattr(final_api, 'get_db_connection', lambda: conn)
+    return conn
+
+
+GOOD = {'intersection_id': 'INT_001', 'vehicle_count': 12, 'avg_speed': 31.5}
+
+
+@pytest.mark.parametrize('bad', [
+    dict(GOOD, vehicle_count=3.7),
+    dict(GOOD, vehicle_count=-1),
+    dict(GOOD, queue_length=-2),
+    dict(GOOD, intersection_id='X' * 51),
+    dict(GOOD, traffic_light_id='L' * 51),
+    dict(GOOD, congestion_level='c' * 21),
+    dict(GOOD, avg_speed=10000),
+    dict(GOOD, avg_speed=float('nan')),
+    dict(GOOD, timestamp='yesterday'),
+    {'intersection_id': 'INT_001'},
+])
+def test_validate_reading_rejects_values_copy_would_fail_on(final_api, bad):
+    with pytest.raises(ValueError):
+        final_api._validate_reading(bad)
+
+
+def test_validate_reading_accepts_integral_strings_and_floats(final_api):
+    row = final_api._validate_reading(dict(GOOD, vehicle_count='7', queue_length=4.0, avg_speed='9999.99'))
+    assert row[:5] == ('INT_001', 7, 9999.99, 4, 'medium')
+
+
+def test_one_bad_row_does_not_fail_the_batch(final_api, copy_target):
+    readings = [GOOD, dict(GOOD, intersection_id='X' * 51), dict(GOOD, vehicle_count=5)]
+    response = final_api.app.test_client().post('/traffic-data/bulk', json=readings)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['received'], body['inserted'], body['rejected']) == (3, 2, 1)
+    assert body['errors'][0]['index'] == 1
+    assert [row[1] for row in copy_target.copied] == ['12', '5']
+    assert copy_target.committed
+
+
+def test_ndjson_body_reports_invalid_lines(final_api, copy_target):
+    body = b'{"intersection_id": "INT_001", "vehicle_count": 1, "avg_speed": 20}\nnot json\n'
+    response = final_api.app.test_client().post('/traffic-data/bulk', data=body,
+                                                 content_type='application/x-ndjson')
+
+    assert response.get_json()['errors'][0]['index'] == 1
+    assert len(copy_target.copied) == 1
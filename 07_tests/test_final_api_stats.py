@@ -0,0 +1,58 @@
+# test_final_api_stats.py
+"""GET /stats on the Flask API: summary table, and the full-scan fallback before migration 3"""
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+import psycopg2.errors
+
+from backend.queries import PG_STATS_FULL, PG_STATS_SUMMARY
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.row = None
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(sql)
+        if sql == PG_STATS_SUMMARY and not self.conn.migrated:
+            raise psycopg2.errors.UndefinedTable('relation "traffic_stats" does not exist')
+        # total_records, vehicle_sum, speed_sum, speed_count, intersections
+        self.row = (4, 40, 120, 3, 2)
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, migrated):
+        self.migrated = migrated
+        self.executed = []
+        self.rolled_back = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('migrated', [True, False])
+def test_stats_response(monkeypatch, final_api, migrated):
+    conn = FakeConnection(migrated)
+    monkeypatch.setattr(final_api, 'get_db_connection', lambda: conn)
+
+    response = final_api.app.test_client().get('/stats')
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'total_records': 4, 'unique_intersections': 2, 'average_vehicles': 10.0, 'average_speed': 40.0
+    }
+    assert (PG_STATS_FULL in conn.executed) == (not migrated)
+    assert conn.rolled_back == (not migrated)
@@ -0,0 +1,91 @@
+# test_frame_pipeline.py
+"""DropOldestQueue and FramePipeline: bounded stages that keep the newest frames"""
+import os
+import sys
+import threading
+from queue import Empty
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+from frame_pipeline import DropOldestQueue, FramePipeline
+
+
+def test_full_queue_drops_the_oldest_item():
+    queue = DropOldestQueue(maxsize=2)
+    for item in range(5):
+        queue.put(item)
+
+    assert [queue.get(timeout=0), queue.get(timeout=0)] == [3, 4]
+    assert queue.get_stats() == {'depth': 0, 'capacity': 2, 'received': 5, 'dropped': 3}
+
+
+def test_closed_queue_drains_then_raises_empty():
+    queue = DropOldestQueue()
+    queue.put('last')
+    queue.close()
+
+    assert queue.get(timeout=0) == 'last'
+    with pytest.raises(Empty):
+        queue.get(timeout=1)
+
+
+def frames(count):
+    source = iter(range(count))
+    return lambda: next(source, None)
+
+
+def test_every_frame_flows_through_when_stages_keep_up():
+    processed = []
+    pipeline = FramePipeline(frames(20), lambda frame: frame * 10,
+                             lambda frame, results: processed.append((frame, results)),
+                             capture_queue_size=32, result_queue_size=32)
+    pipeline.start()
+    pipeline.wait()
+
+    assert processed == [(frame, frame * 10) for frame in range(20)]
+    stats = pipeline.get_stats()
+    assert stats['capture']['frames'] == stats['inference']['frames'] == stats['postprocess']['frames'] == 20
+
+
+def test_slow_inference_drops_stale_frames_instead_of_queueing():
+    busy, release = threading.Event(), threading.Event()
+    inferred = []
+
+    def infer(frame):
+        if frame == 0:
+            busy.set()
+            release.wait(timeout=2)  # capture races ahead while the first frame is inferred
+        inferred.append(frame)
+        return frame
+
+    source = frames(50)
+
+    def read_frame():
+        frame = source()
+        if frame == 1:
+            busy.wait(timeout=2)
+        elif frame is None:
+            release.set()
+        return frame
+
+    pipeline = FramePipeline(read_frame, infer, lambda frame, results: None, capture_queue_size=2)
+    pipeline.start()
+    pipeline.wait()
+
+    # Only the newest frames survived in the capture queue
+    assert inferred == [0, 48, 49]
+    assert pipeline.get_stats()['capture']['dropped'] == 47
+
+
+def test_skipped_frames_are_passed_through_without_counting_as_inferred():
+    results = []
+    pipeline = FramePipeline(frames(4), lambda frame: frame if frame % 2 else None,
+                             lambda frame, detections: results.append(detections),
+                             capture_queue_size=8, result_queue_size=8)
+    pipeline.start()
+    pipeline.wait()
+
+    assert results == [None, 1, None, 3]
+    assert pipeline.get_stats()['inference']['frames'] == 2
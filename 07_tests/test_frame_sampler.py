@@ -0,0 +1,68 @@
+# test_frame_sampler.py
+"""AdaptiveFrameSampler: stride follows scene activity, CPU budget and latency"""
+import os
+import sys
+import threading
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+from frame_sampler import AdaptiveFrameSampler
+
+
+def still_frame():
+    return np.full((72, 128, 3), 80, dtype=np.uint8)
+
+
+def test_first_frame_is_due_then_every_stride():
+    sampler = AdaptiveFrameSampler(initial_stride=3)
+    assert [sampler.is_due() for _ in range(7)] == [True, False, False, True, False, False, True]
+
+
+def test_idle_scene_backs_off_and_motion_recovers():
+    sampler = AdaptiveFrameSampler(cpu_budget=None, min_stride=2, idle_stride_factor=4)
+    sampler.sample(still_frame())  # first frame counts as active
+    assert sampler.stride == 2
+
+    sampler.sample(still_frame())
+    assert sampler.stride == 8
+
+    busy = still_frame()
+    busy[:, :64] = 255
+    sampler.sample(busy)
+    assert sampler.stride == 2
+
+
+def test_slow_inference_raises_the_stride_past_the_target_latency():
+    sampler = AdaptiveFrameSampler(cpu_budget=None, target_latency=0.05, min_stride=1, idle_stride_factor=1)
+    for _ in range(10):
+        sampler.record_inference(0.2)
+    sampler.sample(still_frame())
+    assert sampler.stride > 1
+
+    for _ in range(50):
+        sampler.record_inference(0.01)
+    sampler.sample(still_frame())
+    assert sampler.stride == 1
+
+
+def test_concurrent_is_due_calls_sample_exactly_once_per_stride():
+    sampler = AdaptiveFrameSampler(initial_stride=4)
+    due = []
+
+    def capture():
+        for _ in range(1000):
+            due.append(sampler.is_due())
+
+    threads = [threading.Thread(target=capture) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sampler.frames_seen == 4000
+    assert sum(due) == sampler.frames_sampled == 1000
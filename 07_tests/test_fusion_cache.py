@@ -0,0 +1,53 @@
+# test_fusion_cache.py
+"""SimpleFusionEngine decision cache: same answers as uncached, LRU bounded"""
+import itertools
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('numpy')
+if sys.version_info < (3, 12):
+    pytest.skip('simple_fusion.py uses PEP 701 f-strings', allow_module_level=True)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01_core_engine'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'fusion_engine'))
+
+from simple_fusion import FusionDecisionCache, SimpleFusionEngine
+from time_profiles import TimeProfiles
+
+
+def test_cached_decisions_match_uncached_ones():
+    cached = SimpleFusionEngine(profiles=TimeProfiles())
+    uncached = SimpleFusionEngine(cache_size=0, profiles=TimeProfiles())
+
+    for count, level, green in itertools.product(range(25), ['Low', 'Medium', 'High', 'Unknown'], [20, 30]):
+        vision = {'vehicle_count': count, 'congestion_level': level}
+        traffic = {'intersection_id': 'A', 'current_green_time': green}
+        for _ in range(2):
+            assert cached.fuse_data(vision, traffic) == uncached.fuse_data(vision, traffic)
+
+    assert cached.cache.get_stats()['hits'] >= 25 * 4 * 2
+
+
+def test_response_carries_the_callers_vision_data():
+    engine = SimpleFusionEngine(profiles=TimeProfiles())
+    traffic = {'intersection_id': 'A'}
+    engine.fuse_data({'vehicle_count': 5, 'congestion_level': 'Low', 'camera': 1}, traffic)
+
+    second = {'vehicle_count': 6, 'congestion_level': 'Low', 'camera': 2}
+    result = engine.fuse_data(second, traffic)
+    assert result['vision_data_used'] is second
+    assert engine.cache.get_stats()['hits'] == 1
+
+
+def test_cache_evicts_the_least_recently_used_entry():
+    cache = FusionDecisionCache(maxsize=2)
+    cache.put('a', (30, 'x'))
+    cache.put('b', (40, 'y'))
+    cache.get('a')
+    cache.put('c', (50, 'z'))
+
+    assert cache.get('b') is None
+    assert cache.get('a') == (30, 'x')
+    assert cache.get_stats()['evictions'] == 1
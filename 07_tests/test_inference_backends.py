@@ -0,0 +1,56 @@
+# test_inference_backends.py
+"""CPU inference backends: export reuse and fallback to PyTorch"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('ultralytics')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+import inference_backends
+from inference_backends import ONNX, OPENVINO, PYTORCH, export_weights, load_model
+
+
+class FakeYOLO:
+    exports = []
+
+    def __init__(self, weights, task=None):
+        self.weights = weights
+
+    def export(self, format, **kwargs):
+        FakeYOLO.exports.append(format)
+        return f"{os.path.splitext(self.weights)[0]}.{format}"
+
+
+@pytest.fixture(autouse=True)
+def fake_yolo(monkeypatch):
+    FakeYOLO.exports = []
+    monkeypatch.setattr(inference_backends, 'YOLO', FakeYOLO)
+
+
+def test_pytorch_loads_the_weights_directly(tmp_path):
+    model, backend = load_model(str(tmp_path / 'yolov8n.pt'))
+    assert backend == PYTORCH and model.weights.endswith('yolov8n.pt')
+
+
+def test_existing_onnx_export_is_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(inference_backends, 'ONNXRUNTIME_AVAILABLE', True)
+    (tmp_path / 'yolov8n.onnx').write_bytes(b'')
+
+    model, backend = load_model(str(tmp_path / 'yolov8n.pt'), ONNX)
+    assert backend == ONNX and model.weights == str(tmp_path / 'yolov8n.onnx')
+    assert FakeYOLO.exports == []
+
+
+def test_missing_runtime_falls_back_to_pytorch(tmp_path, monkeypatch):
+    monkeypatch.setattr(inference_backends, 'OPENVINO_AVAILABLE', False)
+
+    model, backend = load_model(str(tmp_path / 'yolov8n.pt'), OPENVINO)
+    assert backend == PYTORCH and model.weights.endswith('yolov8n.pt')
+
+
+def test_unknown_backends_are_rejected():
+    with pytest.raises(ValueError):
+        export_weights('yolov8n.pt', 'tensorrt')
@@ -0,0 +1,105 @@
+# test_inference_scheduler.py
+"""BatchInferenceScheduler: one forward pass per tick across cameras, stale frames replaced"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+from inference_scheduler import BatchInferenceScheduler
+
+
+class BatchModel:
+    """Returns one result per frame and records each batch"""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def __call__(self, frames, **kwargs):
+        self.batches.append(list(frames))
+        if self.error:
+            raise self.error
+        return [f"result:{frame}" for frame in frames]
+
+
+@pytest.fixture
+def scheduler():
+    schedulers = []
+
+    def make(model, **kwargs):
+        scheduler = BatchInferenceScheduler(model, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.stop()
+
+
+def test_frames_from_several_cameras_share_one_forward_pass(scheduler):
+    model = BatchModel()
+    batcher = scheduler(model, max_batch_size=3, max_wait=1.0)
+    for camera_id in ('a', 'b', 'c'):
+        batcher.register_camera(camera_id)
+
+    futures = [batcher.submit(camera_id, camera_id) for camera_id in ('a', 'b', 'c')]
+
+    assert [future.result(timeout=2) for future in futures] == [['result:a'], ['result:b'], ['result:c']]
+    assert model.batches == [['a', 'b', 'c']]
+    assert batcher.get_stats()['avg_batch_size'] == 3
+
+
+def test_a_newer_frame_replaces_the_queued_one(scheduler):
+    model = BatchModel()
+    batcher = scheduler(model, max_batch_size=8, max_wait=0.3)
+    batcher.register_camera('a')
+
+    stale = batcher.submit('a', 'old')
+    fresh = batcher.submit('a', 'new')
+
+    assert fresh.result(timeout=2) == ['result:new']
+    assert stale.cancelled()
+    assert model.batches == [['new']]
+    assert batcher.get_stats()['frames_replaced'] == 1
+
+
+def test_results_reach_the_camera_callback(scheduler):
+    received = []
+    delivered = threading.Event()
+    batcher = scheduler(BatchModel(), max_wait=0)
+    batcher.register_camera('a', on_result=lambda results: (received.append(results), delivered.set()))
+
+    batcher.submit('a', 'frame')
+    assert delivered.wait(timeout=2)
+    assert received == [['result:frame']]
+
+
+def test_model_errors_fail_every_frame_in_the_batch(scheduler):
+    batcher = scheduler(BatchModel(error=RuntimeError('cuda out of memory')), max_batch_size=2, max_wait=1.0)
+    batcher.register_camera('a')
+    batcher.register_camera('b')
+
+    futures = [batcher.submit('a', 1), batcher.submit('b', 2)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match='out of memory'):
+            future.result(timeout=2)
+
+
+def test_frames_without_a_result_are_failed_not_left_pending(scheduler):
+    batcher = scheduler(lambda frames, **kwargs: ['result:only-one'], max_batch_size=2, max_wait=1.0)
+    batcher.register_camera('a')
+    batcher.register_camera('b')
+
+    first, second = batcher.submit('a', 1), batcher.submit('b', 2)
+    assert first.result(timeout=2) == ['result:only-one']
+    with pytest.raises(RuntimeError, match='1 results for a batch of 2'):
+        second.result(timeout=2)
+
+
+def test_unregistered_cameras_are_rejected(scheduler):
+    batcher = scheduler(BatchModel())
+    with pytest.raises(KeyError):
+        batcher.submit('unknown', 'frame')
@@ -0,0 +1,124 @@
+# test_ingest_buffer.py
+"""Write-behind IngestBuffer: group commit, retries, bisection and dead-lettering"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '03_database'))
+
+from backend.ingest_buffer import IngestBuffer, IngestBufferFull
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def read_dead_letters(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_readings_are_group_committed(tmp_path):
+    batches = []
+
+    async def flush(items):
+        batches.append(list(items))
+        return [f'id-{item}' for item in items]
+
+    async def scenario():
+        buffer = IngestBuffer(flush, max_batch=10, max_delay_ms=20, dead_letter_path=str(tmp_path / 'dead.ndjson'))
+        await buffer.start()
+        ids = await asyncio.gather(*(buffer.submit(i, durable=True) for i in range(25)))
+        await buffer.stop()
+        return buffer, ids
+
+    buffer, ids = run(scenario())
+    assert ids == [f'id-{i}' for i in range(25)]
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert buffer.get_stats()['flushed'] == 25
+
+
+def test_transient_failure_is_retried(tmp_path):
+    attempts = []
+
+    async def flush(items):
+        attempts.append(len(items))
+        if len(attempts) < 3:
+            raise RuntimeError('database is locked')
+        return list(items)
+
+    async def scenario():
+        buffer = IngestBuffer(flush, max_delay_ms=5, retry_backoff_ms=1, dead_letter_path=str(tmp_path / 'dead.ndjson'))
+        await buffer.start()
+        result = await buffer.submit('a', durable=True)
+        await buffer.stop()
+        return buffer, result
+
+    buffer, result = run(scenario())
+    assert result == 'a'
+    assert buffer.retries == 2
+    assert buffer.dead_lettered == 0
+
+
+def test_bad_row_is_isolated_and_dead_lettered(tmp_path):
+    path = str(tmp_path / 'dead.ndjson')
+
+    async def flush(items):
+        if 'bad' in items:
+            raise ValueError('bad row')
+        return list(items)
+
+    async def scenario():
+        buffer = IngestBuffer(flush, max_batch=10, max_delay_ms=20, max_retries=1, retry_backoff_ms=1,
+                              dead_letter_path=path)
+        await buffer.start()
+        results = await asyncio.gather(*(buffer.submit(item, durable=True) for item in ['a', 'b', 'bad', 'c']),
+                                       return_exceptions=True)
+        await buffer.stop()
+        return buffer, results
+
+    buffer, results = run(scenario())
+    assert results[:2] == ['a', 'b'] and results[3] == 'c'
+    assert isinstance(results[2], ValueError)
+    assert (buffer.flushed, buffer.dead_lettered) == (3, 1)
+    assert [record['reading'] for record in read_dead_letters(path)] == ['bad']
+
+
+def test_stop_does_not_hang_on_a_stuck_writer(tmp_path):
+    path = str(tmp_path / 'dead.ndjson')
+
+    async def flush(items):
+        await asyncio.sleep(60)
+
+    async def scenario():
+        buffer = IngestBuffer(flush, max_delay_ms=1, dead_letter_path=path)
+        await buffer.start()
+        await buffer.submit('in-flight')
+        await asyncio.sleep(0.02)
+        await buffer.submit('queued')
+        await asyncio.wait_for(buffer.stop(timeout=0.05), 5)
+
+    run(scenario())
+    assert sorted(record['reading'] for record in read_dead_letters(path)) == ['in-flight', 'queued']
+
+
+def test_full_queue_pushes_back():
+    async def flush(items):
+        await asyncio.sleep(60)
+
+    async def scenario():
+        buffer = IngestBuffer(flush, max_batch=1, max_delay_ms=1, max_queue=1, dead_letter_path=None)
+        await buffer.start()
+        await buffer.submit('first')
+        await asyncio.sleep(0.01)  # picked up by the stuck flusher
+        await buffer.submit('second')
+        with pytest.raises(IngestBufferFull):
+            await buffer.submit('third', timeout=0.01)
+        await buffer.stop(timeout=0.01)
+        return buffer
+
+    buffer = run(scenario())
+    assert len(buffer.dead_letters) == 2  # no dead-letter file: kept in memory
@@ -0,0 +1,83 @@
+# test_migrations.py
+"""SQLite schema migrations and the traffic_data query plan check"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '03_database'))
+
+from backend.migrations import SQLITE_MIGRATIONS, migrate_sqlite, sqlite_version
+from backend.queries import Query
+from backend.query_plans import check_sqlite_plan, explain_sqlite, main
+
+LATEST = SQLITE_MIGRATIONS[-1][0]
+
+
+def indexes(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+
+
+def test_fresh_database_is_migrated_once():
+    conn = sqlite3.connect(':memory:')
+    assert migrate_sqlite(conn) == [version for version, _, _ in SQLITE_MIGRATIONS]
+    assert migrate_sqlite(conn) == []
+    assert sqlite_version(conn) == LATEST
+    assert {'idx_traffic_intersection_time', 'idx_traffic_timestamp', 'idx_traffic_intersection_count'} <= indexes(conn)
+
+
+def test_pre_migration_database_keeps_its_rows_and_loses_the_redundant_index():
+    conn = sqlite3.connect(':memory:')
+    # Schema created by the old init_database(), before versioning
+    conn.execute('''
+        CREATE TABLE traffic_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, intersection_id TEXT NOT NULL, vehicle_count INTEGER NOT NULL,
+            average_speed REAL NOT NULL, traffic_light_id TEXT NOT NULL, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)
+    ''')
+    conn.execute('CREATE INDEX idx_intersection_id ON traffic_data(intersection_id)')
+    conn.execute("INSERT INTO traffic_data (intersection_id, vehicle_count, average_speed, traffic_light_id) "
+                 "VALUES ('A', 5, 30.0, 'L1')")
+    conn.commit()
+
+    migrate_sqlite(conn)
+
+    assert 'idx_intersection_id' not in indexes(conn)
+    assert conn.execute('SELECT COUNT(*) FROM traffic_data').fetchone()[0] == 1
+
+
+def test_failed_migration_rolls_back_and_keeps_the_version():
+    conn = sqlite3.connect(':memory:')
+    broken = SQLITE_MIGRATIONS[:1] + [(2, 'broken', ['CREATE TABLE extra (x INTEGER)', 'NOT SQL'])]
+
+    with pytest.raises(sqlite3.OperationalError):
+        migrate_sqlite(conn, broken)
+    assert sqlite_version(conn) == 1
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'extra'").fetchone()[0] == 0
+
+
+def test_every_registered_query_uses_an_index():
+    conn = sqlite3.connect(':memory:')
+    migrate_sqlite(conn)
+    rejected = {query.name: problems for query, _, problems in explain_sqlite(conn) if problems}
+    assert rejected == {}
+    assert main([]) == 0
+
+
+def test_plan_check_rejects_scans_and_sorts():
+    query = Query('q', 'SELECT 1', ())
+    assert check_sqlite_plan(query, ['SCAN traffic_data'])
+    assert check_sqlite_plan(query, ['SCAN traffic_data USING INDEX idx_traffic_timestamp'])
+    assert check_sqlite_plan(query, ['USE TEMP B-TREE FOR ORDER BY'])
+    assert not check_sqlite_plan(query, ['SEARCH traffic_data USING INDEX idx_traffic_timestamp (timestamp>?)'])
+    assert not check_sqlite_plan(query._replace(bounded=True), ['SCAN traffic_data USING INDEX idx_traffic_timestamp'])
+
+
+def test_training_history_query_is_the_plan_checked_one():
+    pytest.importorskip('pandas')
+    pytest.importorskip('sklearn')
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '05_models', 'training_engine'))
+    from backend.queries import SQLITE_TRAINING_HISTORY
+    from src.data_loader import TRAINING_HISTORY_SQL
+
+    assert TRAINING_HISTORY_SQL == SQLITE_TRAINING_HISTORY
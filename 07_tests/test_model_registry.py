@@ -0,0 +1,61 @@
+# test_model_registry.py
+"""ModelRegistry: one shared instance per resolved weight file and backend"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('ultralytics')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+import model_registry
+from model_registry import ModelRegistry
+
+
+class FakeModel:
+    names = {2: 'car'}
+
+    def __call__(self, *args, **kwargs):
+        return []
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+
+    def load_model(weights, backend):
+        calls.append((weights, backend))
+        return FakeModel(), backend
+
+    monkeypatch.setattr(model_registry, 'load_model', load_model)
+    return calls
+
+
+def test_paths_to_the_same_file_share_one_model(tmp_path, monkeypatch, loads):
+    weights = tmp_path / 'yolov8n.pt'
+    weights.write_bytes(b'')
+    link = tmp_path / 'current.pt'
+    link.symlink_to(weights)
+    monkeypatch.chdir(tmp_path)
+
+    registry = ModelRegistry()
+    model = registry.get('yolov8n.pt', warmup=False)
+    assert registry.get(str(weights), warmup=False) is model
+    assert registry.get(str(link), warmup=False) is model
+    assert len(loads) == 1
+
+
+def test_backends_are_cached_separately(tmp_path, loads):
+    weights = str(tmp_path / 'yolov8n.pt')
+    registry = ModelRegistry()
+
+    assert registry.get(weights, warmup=False, backend='pytorch') is not registry.get(weights, warmup=False, backend='onnx')
+    assert [backend for _, backend in loads] == ['pytorch', 'onnx']
+
+
+def test_memory_is_not_reported_without_psutil(tmp_path, monkeypatch, loads):
+    monkeypatch.setattr(model_registry, 'PSUTIL_AVAILABLE', False)
+    stats = ModelRegistry().get(str(tmp_path / 'yolov8n.pt'), warmup=False).get_stats()
+    assert stats['memory_mb'] is None
@@ -0,0 +1,57 @@
+# test_optimization_history.py
+"""OptimizationHistory ring buffers, segment spill and flush on close"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01_core_engine'))
+
+from optimization_history import OptimizationHistory
+
+
+def record(history, intersection_id, timestamps):
+    for ts in timestamps:
+        history.append(intersection_id, float(ts), int(ts), 1, 30, 0)
+
+
+def test_ring_keeps_the_last_capacity_rows():
+    history = OptimizationHistory(capacity=3)
+    record(history, 'A', range(5))
+
+    rows = history.query('A')
+    assert rows['timestamp'].tolist() == [2.0, 3.0, 4.0]
+    assert history.latest('A', 1)['vehicle_count'].tolist() == [4]
+
+
+def test_evicted_rows_spill_to_segments_and_stay_queryable(tmp_path):
+    history = OptimizationHistory(capacity=2, spill_dir=str(tmp_path), segment_rows=3)
+    record(history, 'A', range(6))  # 4 evicted: one full segment, one row pending
+
+    assert history.get_stats()['segments'] == 1
+    assert history.get_stats()['pending_spill_rows'] == 1
+    assert history.query('A')['timestamp'].tolist() == [float(ts) for ts in range(6)]
+    assert history.query('A', start=1, end=2)['timestamp'].tolist() == [1.0, 2.0]
+
+
+def test_close_writes_the_partial_segment(tmp_path):
+    history = OptimizationHistory(capacity=2, spill_dir=str(tmp_path), segment_rows=100)
+    record(history, 'A', range(5))
+    history.close()
+
+    reopened = OptimizationHistory(capacity=2, spill_dir=str(tmp_path), segment_rows=100)
+    assert reopened.query('A', include_spilled=True)['timestamp'].tolist() == [0.0, 1.0, 2.0]
+    record(reopened, 'A', range(10, 13))
+    reopened.close()
+    # Segment numbering continues after the files already on disk
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_append_many_matches_single_appends():
+    history = OptimizationHistory(capacity=10)
+    history.append_many(['A', 'B', 'A'], 5.0, [1, 2, 3], [0, 1, 2], [20, 30, 40], [0, 0, 1])
+
+    assert history.query('A')['vehicle_count'].tolist() == [1, 3]
+    assert sorted(history.intersections()) == ['A', 'B']
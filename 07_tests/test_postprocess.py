@@ -0,0 +1,62 @@
+# test_postprocess.py
+"""Vectorized YOLO post-processing: filtering, scaling, counting and IoU"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+from postprocess import box_iou, class_ids_for, counts_by_name, extract_detections, to_dicts
+
+NAMES = {0: 'person', 2: 'car', 3: 'motorcycle', 5: 'bus', 7: 'truck'}
+
+
+class Boxes:
+    def __init__(self, cls, conf, xyxy):
+        self.cls, self.conf, self.xyxy = np.array(cls), np.array(conf), np.array(xyxy, dtype=float)
+
+    def __len__(self):
+        return len(self.cls)
+
+
+def result(cls, conf, xyxy):
+    return SimpleNamespace(boxes=Boxes(cls, conf, xyxy))
+
+
+def test_class_and_confidence_filters_match_a_per_box_loop():
+    rng = np.random.default_rng(0)
+    cls = rng.choice(list(NAMES), 200)
+    conf = rng.random(200)
+    xyxy = np.sort(rng.random((200, 4)) * 640, axis=1)
+    vehicles = class_ids_for(NAMES, ['car', 'motorcycle', 'bus', 'truck'])
+
+    detections = extract_detections(result(cls, conf, xyxy), class_ids=vehicles, min_conf=0.5)
+
+    expected = [i for i in range(200) if cls[i] != 0 and conf[i] >= 0.5]
+    assert detections['cls'].tolist() == cls[expected].tolist()
+    assert np.allclose(detections['x2'], xyxy[expected, 2])
+
+
+def test_boxes_are_rescaled_and_serialized():
+    detections = extract_detections(result([2], [0.876], [[10, 20, 30, 40]]), scale=(2.0, 0.5))
+
+    assert to_dicts(detections, NAMES) == [{'vehicle': 'car', 'confidence': 0.88, 'bbox': [20.0, 10.0, 60.0, 20.0]}]
+
+
+def test_empty_results_give_an_empty_array():
+    assert len(extract_detections(SimpleNamespace(boxes=None))) == 0
+    assert len(extract_detections(result([], [], np.empty((0, 4))))) == 0
+
+
+def test_counts_by_name():
+    detections = extract_detections(result([2, 3, 3, 7], [0.9] * 4, [[0, 0, 1, 1]] * 4))
+    assert counts_by_name(detections, NAMES) == {'car': 1, 'motorcycle': 2, 'truck': 1}
+
+
+def test_box_iou():
+    iou = box_iou([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    np.testing.assert_allclose(iou, [[1.0, 1 / 3, 0.0]])
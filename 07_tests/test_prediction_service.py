@@ -0,0 +1,130 @@
+# test_prediction_service.py
+"""PredictionService: features built online match training, and leaky models are refused"""
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('sklearn')
+pytest.importorskip('joblib')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '05_models', 'training_engine'))
+
+from src.feature_store import FEATURE_VERSION, OnlineFeatureStore, lag_column
+from src.prediction_service import PredictionService
+from src.preprocessor import DataPreprocessor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01_core_engine'))
+from time_profiles import TimeProfiles
+
+
+class RecordingModel:
+    """Predicts lag 1 and keeps the feature frames it was given"""
+
+    def __init__(self):
+        self.frames = []
+
+    def predict(self, features):
+        self.frames.append(features)
+        return features[lag_column(1)].to_numpy()
+
+
+def training_frame(hours=48):
+    timestamps = pd.date_range('2025-01-06', periods=hours, freq='h')
+    return pd.DataFrame({
+        'intersection_id': ['A'] * hours,
+        'timestamp': timestamps,
+        'vehicle_count': np.arange(hours) % 24 + 1,
+    })
+
+
+def fitted_service(df, model=None, metadata_overrides=None):
+    preprocessor = DataPreprocessor(profiles=TimeProfiles())
+    X, _, feature_names = preprocessor.prepare_features(df.copy())
+    metadata = {'feature_names': feature_names, 'preprocessing': preprocessor.get_state()}
+    metadata.update(metadata_overrides or {})
+    service = PredictionService(model=model or RecordingModel(), metadata=metadata, profiles=TimeProfiles())
+    return service, X
+
+
+def test_training_uses_no_target_derived_features():
+    _, X = fitted_service(training_frame())
+    assert 'traffic_intensity' not in X.columns
+
+
+def test_online_features_match_the_training_row():
+    df = training_frame()
+    service, X = fitted_service(df)
+    service.load_history(df.iloc[:-1])
+
+    service.forecast_many(['A'])
+    online = service.model.frames[-1].iloc[0].astype(float)
+    assert online.to_dict() == pytest.approx(X.iloc[-1].astype(float).to_dict())
+
+
+def test_forecast_skips_unknown_intersections():
+    df = training_frame()
+    service, _ = fitted_service(df)
+    service.observe('A', datetime(2025, 1, 8, 0, 0), 30)
+
+    assert list(service.forecast(['A', 'unknown'])) == ['A']
+    assert np.isnan(service.forecast_many(['unknown'])[0])
+
+
+def test_models_trained_on_the_target_are_refused():
+    metadata = {'feature_names': ['hour', 'traffic_intensity'], 'preprocessing': {'feature_version': 1}}
+    with pytest.raises(ValueError, match='Retrain'):
+        PredictionService(model=RecordingModel(), metadata=metadata, profiles=TimeProfiles())
+
+
+def test_models_without_intersection_classes_are_refused():
+    metadata = {'feature_names': ['hour', 'intersection_id_encoded']}  # as the shipped model_metadata.json
+    with pytest.raises(ValueError, match='intersection_classes'):
+        PredictionService(model=RecordingModel(), metadata=metadata, profiles=TimeProfiles())
+
+
+def test_intersections_the_model_never_saw_are_not_forecast():
+    service, _ = fitted_service(training_frame())
+    service.observe('A', datetime(2025, 1, 8, 0, 0), 30)
+    service.observe('B', datetime(2025, 1, 8, 0, 0), 30)
+
+    forecast = service.forecast_many(['A', 'B'])
+    assert not np.isnan(forecast[0]) and np.isnan(forecast[1])
+
+
+def test_profile_mismatch_is_reported():
+    timestamps = pd.date_range('2025-01-06', periods=24 * 28, freq='h')
+    learned = TimeProfiles.learn(['A'] * len(timestamps), timestamps.values, np.where(timestamps.hour == 11, 90, 10))
+    metadata = {'feature_names': ['hour'], 'preprocessing': {'feature_version': FEATURE_VERSION}}
+    service = PredictionService(model=RecordingModel(), metadata=metadata, profiles=learned)
+
+    assert service.get_stats()['profile_mismatch']
+
+
+def test_an_empty_feature_store_is_kept():
+    store = OnlineFeatureStore()
+    metadata = {'feature_names': ['hour'], 'preprocessing': {'feature_version': FEATURE_VERSION}}
+    service = PredictionService(model=RecordingModel(), metadata=metadata, profiles=TimeProfiles(), feature_store=store)
+
+    service.observe('A', datetime(2025, 1, 8, 0, 0), 30)
+    assert service.feature_store is store and 'A' in store
+
+
+def test_saved_feature_store_warms_up_the_service(tmp_path):
+    import joblib
+    import json
+
+    df = training_frame()
+    preprocessor = DataPreprocessor(profiles=TimeProfiles())
+    _, _, feature_names = preprocessor.prepare_features(df.copy())
+    joblib.dump(RecordingModel(), tmp_path / 'traffic_model.pkl')
+    joblib.dump(preprocessor.feature_store, tmp_path / 'feature_store.pkl')
+    (tmp_path / 'model_metadata.json').write_text(json.dumps(
+        {'feature_names': feature_names, 'preprocessing': preprocessor.get_state()}))
+
+    service = PredictionService(models_dir=str(tmp_path), profiles=TimeProfiles())
+    assert 'A' in service.feature_store
+    assert not np.isnan(service.forecast_many(['A'])[0])
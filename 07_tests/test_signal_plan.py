@@ -0,0 +1,68 @@
+# test_signal_plan.py
+"""SignalPlanSolver: Webster and max-pressure plans, batched over intersections"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01_core_engine'))
+
+from signal_plan import MAX_PRESSURE, SignalPlanSolver, pcu_count, pcu_matrix
+
+
+def test_pcu_weights():
+    assert pcu_count({'car': 2, 'motorcycle': 5, 'tuktuk': 2, 'horse_cart': 1}) == 4 + 5 + 3 + 2
+
+
+def test_webster_cycle_and_splits():
+    solver = SignalPlanSolver()
+    # Flow ratios 0.4 and 0.2: C = (1.5 * 8 + 5) / (1 - 0.6) = 42.5s
+    plan = solver.solve([[24, 12]])
+
+    assert plan['cycle'][0] == pytest.approx(42.5, abs=1)
+    assert plan['cycle'][0] == plan['green'][0].sum() + 2 * solver.lost_time
+    assert plan['green'][0].tolist() == [23, 12]
+    assert not plan['oversaturated'][0]
+
+
+def test_greens_respect_bounds_and_oversaturation_uses_the_longest_cycle():
+    solver = SignalPlanSolver(min_green=10, max_green=60)
+    plan = solver.solve([[200, 1, 0]])
+
+    assert plan['oversaturated'][0]
+    assert plan['green'][0].min() >= 10 and plan['green'][0].max() <= 60
+    assert plan['cycle'][0] == plan['green'][0].sum() + 3 * solver.lost_time
+
+
+def test_padded_batch_rows_match_single_intersections():
+    intersections = [
+        [{'car': 6, 'motorcycle': 20}, {'motorcycle': 3}],
+        [{'car': 2}, {'bus': 4}, {'car': 1, 'motorcycle': 8}, {'tuktuk': 2}],
+    ]
+    solver = SignalPlanSolver()
+    pcu, mask = pcu_matrix(intersections)
+    batch = solver.solve(pcu, mask)
+
+    for i, phases in enumerate(intersections):
+        single = solver.solve_phases(phases)
+        assert batch['cycle'][i] == single['cycle']
+        assert batch['green'][i][:len(phases)].tolist() == single['green']
+    assert batch['green'][0][2:].tolist() == [0, 0]
+
+
+def test_max_pressure_serves_the_phase_with_the_most_pressure():
+    solver = SignalPlanSolver()
+    plan = solver.solve_phases([{'car': 10}, {'car': 12}], mode=MAX_PRESSURE,
+                               downstream=[{'car': 0}, {'car': 8}], cycle_length=90)
+
+    # Pressure 20 vs 24 - 16 = 8
+    assert plan['next_phase'] == 0
+    assert plan['green'][0] > plan['green'][1]
+    assert plan['cycle'] == 90
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        SignalPlanSolver().solve([[1, 2]], mode='fixed')
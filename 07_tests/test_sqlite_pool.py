@@ -0,0 +1,65 @@
+# test_sqlite_pool.py
+"""ConnectionPool: per-thread WAL connections, split read/write executors"""
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip('pydantic')
+pytest.importorskip('dotenv')
+pytest.importorskip('motor')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '03_database'))
+
+
+@pytest.fixture
+def pool(database, tmp_path):
+    pool = database.ConnectionPool(str(tmp_path / 'pool.db'), read_workers=2)
+    yield pool
+    pool.close_all()
+
+
+def test_connections_use_wal_and_the_pool_path(pool, tmp_path):
+    async def check():
+        mode = await pool.read(lambda conn: conn.execute('PRAGMA journal_mode').fetchone()[0])
+        path = await pool.write(lambda conn: conn.execute('PRAGMA database_list').fetchone()['file'])
+        return mode, path
+
+    mode, path = asyncio.run(check())
+    assert mode == 'wal'
+    assert os.path.realpath(path) == os.path.realpath(str(tmp_path / 'pool.db'))
+
+
+def test_each_thread_reuses_one_connection(pool):
+    def thread_connection(conn):
+        return threading.current_thread().name, id(conn)
+
+    async def run():
+        return [await pool.write(thread_connection) for _ in range(5)]
+
+    assert len(set(asyncio.run(run()))) == 1
+
+
+def test_reads_see_committed_writes_and_failed_writes_roll_back(pool):
+    def setup(conn):
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.commit()
+
+    def insert_then_fail(conn):
+        conn.execute('INSERT INTO t VALUES (2)')
+        raise RuntimeError('boom')
+
+    def insert(conn):
+        conn.execute('INSERT INTO t VALUES (1)')
+        conn.commit()
+
+    async def run():
+        await pool.write(setup)
+        await pool.write(insert)
+        with pytest.raises(RuntimeError):
+            await pool.write(insert_then_fail)
+        return await pool.read(lambda conn: [row[0] for row in conn.execute('SELECT x FROM t')])
+
+    assert asyncio.run(run()) == [1]
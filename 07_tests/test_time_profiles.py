@@ -0,0 +1,90 @@
+# test_time_profiles.py
+"""Per-intersection time-of-day profiles: default rush hours, learning, identity and local time"""
+import os
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01_core_engine'))
+
+from time_profiles import OFF_PEAK_FACTOR, RUSH_FACTOR, TimeProfiles, to_local_naive
+
+
+def test_default_profile_reproduces_fixed_rush_hours():
+    profiles = TimeProfiles()
+    assert profiles.lookup('any', datetime(2025, 1, 6, 8, 30)) == (pytest.approx(RUSH_FACTOR), True)
+    assert profiles.lookup('any', datetime(2025, 1, 6, 12, 0)) == (pytest.approx(OFF_PEAK_FACTOR), False)
+
+
+def test_learned_profile_marks_the_busy_hour():
+    timestamps = pd.date_range('2025-01-06', periods=24 * 7 * 4, freq='h')
+    counts = np.where(timestamps.hour == 11, 100, 10)
+    profiles = TimeProfiles.learn(['A'] * len(timestamps), timestamps.values, counts)
+
+    assert profiles.lookup('A', datetime(2025, 2, 3, 11, 15))[1]
+    assert not profiles.lookup('A', datetime(2025, 2, 3, 8, 15))[1]
+    # Unknown intersections keep the default profile
+    assert profiles.lookup('B', datetime(2025, 2, 3, 8, 15))[1]
+
+
+def test_identity_tracks_table_contents(tmp_path):
+    default = TimeProfiles()
+    assert default.fingerprint() == TimeProfiles().fingerprint()
+
+    timestamps = pd.date_range('2025-01-06', periods=24 * 7, freq='h')
+    learned = TimeProfiles.learn(['A'] * len(timestamps), timestamps.values, np.arange(len(timestamps)))
+    assert learned.fingerprint() != default.fingerprint()
+    assert learned.identity()['source'] == 'learned'
+
+    path = str(tmp_path / 'profiles.npz')
+    learned.save(path)
+    assert TimeProfiles.load(path).fingerprint() == learned.fingerprint()
+
+
+@pytest.mark.skipif(not hasattr(time, 'tzset'), reason='needs time.tzset')
+def test_aware_timestamps_are_slotted_in_local_time(monkeypatch):
+    monkeypatch.setenv('TZ', 'Europe/Berlin')
+    time.tzset()
+    try:
+        aware = pd.to_datetime(['2025-01-06T07:30:00+00:00', '2025-07-07T07:30:00+00:00'])
+        local = to_local_naive(aware)
+        assert [str(value)[11:16] for value in local.astype('datetime64[m]')] == ['08:30', '09:30']
+        # Naive input is already local
+        naive = pd.to_datetime(['2025-01-06 08:30'])
+        assert (to_local_naive(naive) == naive.values).all()
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_from_sqlite_reads_a_bounded_window(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / 'traffic.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE traffic_data (intersection_id TEXT, timestamp TEXT, vehicle_count INTEGER)')
+    # Four weeks of hourly counts ending two days ago
+    end = pd.Timestamp.now().floor('h') - pd.Timedelta(days=2)
+    timestamps = pd.date_range(end=end, periods=24 * 7 * 4, freq='h')
+    conn.executemany('INSERT INTO traffic_data VALUES (?, ?, ?)', [
+        ('A', str(ts), 100 if ts.hour == 11 else 10) for ts in timestamps])
+    conn.commit()
+    conn.close()
+
+    profiles = TimeProfiles.from_sqlite(path)
+    assert profiles.lookup('A', end.replace(hour=11, minute=15).to_pydatetime())[1]
+    # Nothing inside the window: default profile
+    assert TimeProfiles.from_sqlite(path, days=1).fingerprint() == TimeProfiles().fingerprint()
+
+
+def test_profile_query_is_the_plan_checked_one():
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '03_database'))
+    from backend.queries import SQLITE_PROFILE_HISTORY_SINCE
+    from time_profiles import PROFILE_HISTORY_SQL
+
+    assert PROFILE_HISTORY_SQL == SQLITE_PROFILE_HISTORY_SINCE
@@ -0,0 +1,61 @@
+# test_tracker.py
+"""MultiObjectTracker: vectorized association, gating, birth and death of tracks"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '02_ai_vision', 'vision_engine'))
+
+from tracker import MultiObjectTracker
+
+
+def box(x, y, size=20):
+    return [x, y, x + size, y + size]
+
+
+@pytest.mark.parametrize('method', ['greedy', 'hungarian'])
+@pytest.mark.parametrize('metric', ['centroid', 'iou'])
+def test_moving_vehicles_keep_their_ids(method, metric):
+    tracker = MultiObjectTracker(metric=metric, method=method)
+    first = tracker.update([box(0, 0), box(200, 0)], ['car', 'bus'], frame_num=0)
+    # Detection order swaps between frames; ids follow the vehicles
+    second = tracker.update([box(203, 2), box(4, 1)], ['bus', 'car'], frame_num=1)
+
+    assert second.tolist() == [first[1], first[0]]
+    assert len(tracker) == 2
+
+
+def test_class_and_distance_gates_start_new_tracks():
+    tracker = MultiObjectTracker(max_distance=50)
+    [car] = tracker.update([box(0, 0)], ['car'], frame_num=0)
+    ids = tracker.update([box(2, 0), box(4, 0), box(300, 0)], ['truck', 'car', 'car'], frame_num=1)
+
+    assert ids[1] == car
+    assert car not in (ids[0], ids[2]) and ids[0] != ids[2]
+
+
+def test_hungarian_assignment_minimises_total_cost():
+    tracker = MultiObjectTracker(method='hungarian', max_distance=50)
+    if tracker.method != 'hungarian':
+        pytest.skip('scipy is not installed')
+    a, b = tracker.update([box(0, 0), box(30, 0)], ['car', 'car'], frame_num=0)
+    # Greedy gives the first detection to a (distance 10), leaving the second one
+    # out of reach of b (70 > 50); the optimum matches both (20 + 40)
+    ids = tracker.update([box(10, 0), box(-40, 0)], ['car', 'car'], frame_num=1)
+
+    assert ids.tolist() == [b, a]
+
+
+def test_stale_tracks_stop_matching_and_are_removed():
+    tracker = MultiObjectTracker(max_age=2, remove_after=4)
+    [car] = tracker.update([box(0, 0)], ['car'], frame_num=0)
+
+    [later] = tracker.update([box(0, 0)], ['car'], frame_num=3)
+    assert later != car
+
+    tracker.update([], [], frame_num=5)
+    assert tracker.removed_ids.tolist() == [car]
+    assert tracker.ids.tolist() == [later]
@@ -0,0 +1,77 @@
+# test_traffic_pagination.py
+"""Keyset pages over traffic_data: complete, stable under ties, and filterable"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '03_database'))
+
+from backend.migrations import migrate_sqlite
+from backend.queries import SQLITE_INSERT_TRAFFIC, sqlite_traffic_page
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    migrate_sqlite(conn)
+    # Three readings share every timestamp, so pages must break ties on id
+    rows = [(f'I{i % 3}', i, 30.0, 'L1', f'2025-01-01 10:{i // 3:02d}:00') for i in range(30)]
+    conn.executemany(SQLITE_INSERT_TRAFFIC, rows)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def pages(conn, limit, intersection=None, start=None, end=None):
+    filters = [value for value in (intersection, start, end) if value is not None]
+    after = None
+    while True:
+        sql = sqlite_traffic_page(intersection is not None, start is not None, end is not None, after is not None)
+        rows = conn.execute(sql, filters + list(after or ()) + [limit]).fetchall()
+        if rows:
+            yield rows
+        if len(rows) < limit:
+            return
+        after = (rows[-1][5], rows[-1][0])  # (timestamp, id)
+
+
+def newest_first(conn, where='', params=()):
+    return conn.execute(f'SELECT * FROM traffic_data {where} ORDER BY timestamp DESC, id DESC', params).fetchall()
+
+
+@pytest.mark.parametrize('limit', [1, 4, 7, 30, 50])
+def test_pages_cover_every_row_once_in_order(conn, limit):
+    walked = [row for page in pages(conn, limit) for row in page]
+    assert walked == newest_first(conn)
+
+
+def test_filters_combine_with_the_keyset(conn):
+    walked = [row for page in pages(conn, 2, intersection='I1', start='2025-01-01 10:02:00',
+                                    end='2025-01-01 10:08:00') for row in page]
+    expected = newest_first(conn, 'WHERE intersection_id = ? AND timestamp >= ? AND timestamp < ?',
+                            ('I1', '2025-01-01 10:02:00', '2025-01-01 10:08:00'))
+    assert walked == expected and len(expected) == 6
+
+
+def test_rows_inserted_after_the_first_page_do_not_shift_later_pages(conn):
+    walk = pages(conn, 10)
+    first = next(walk)
+    conn.execute(SQLITE_INSERT_TRAFFIC, ('I0', 99, 30.0, 'L1', '2025-01-01 11:00:00'))
+    rest = [row for page in walk for row in page]
+
+    assert first + rest == newest_first(conn)[1:]
+
+
+def test_pages_and_exports_share_the_iso_timestamp_form(conn, database):
+    conn.row_factory = sqlite3.Row
+    row = next(pages(conn, 1))[0]
+    assert database.row_to_dict(row)['timestamp'] == '2025-01-01T10:09:00'
+
+
+def test_page_cursor_round_trip_and_rejection(database):
+    cursor = database.encode_cursor('2025-01-01 10:00:00', 42)
+    assert database.decode_cursor(cursor) == ('2025-01-01 10:00:00', 42)
+    with pytest.raises(ValueError):
+        database.decode_cursor('not-a-cursor')
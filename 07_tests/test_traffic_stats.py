@@ -0,0 +1,85 @@
+# test_traffic_stats.py
+"""Trigger-maintained traffic_data aggregates: kept exact, verified and rebuilt on drift"""
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '03_database'))
+
+from backend.migrations import SQLITE_MIGRATIONS, migrate_sqlite
+from backend.queries import (
+    SQLITE_DELETE_TRAFFIC, SQLITE_INSERT_TRAFFIC, SQLITE_INTERSECTION_STATS, SQLITE_STATS_FULL, SQLITE_STATS_SUMMARY
+)
+from backend.stats import rebuild_sqlite_stats, verify_sqlite_stats
+
+
+def connect():
+    conn = sqlite3.connect(':memory:')
+    migrate_sqlite(conn)
+    return conn
+
+
+def insert(conn, intersection_id, vehicle_count):
+    return conn.execute(SQLITE_INSERT_TRAFFIC, (intersection_id, vehicle_count, 30.0, 'L1', '2025-01-01 10:00:00')).lastrowid
+
+
+def per_intersection(conn):
+    return conn.execute(
+        'SELECT intersection_id, COUNT(*), SUM(vehicle_count) FROM traffic_data GROUP BY intersection_id ORDER BY 1'
+    ).fetchall()
+
+
+def test_inserts_updates_and_deletes_keep_the_summary_exact():
+    conn = connect()
+    rng = random.Random(0)
+    ids = []
+    for _ in range(500):
+        action = rng.random()
+        if action < 0.6 or not ids:
+            ids.append(insert(conn, f'I{rng.randrange(5)}', rng.randrange(50)))
+        elif action < 0.8:
+            conn.execute(SQLITE_DELETE_TRAFFIC, (ids.pop(rng.randrange(len(ids))),))
+        else:
+            conn.execute('UPDATE traffic_data SET intersection_id = ?, vehicle_count = ? WHERE id = ?',
+                         (f'I{rng.randrange(5)}', rng.randrange(50), rng.choice(ids)))
+        assert conn.execute(SQLITE_STATS_SUMMARY).fetchone() == conn.execute(SQLITE_STATS_FULL).fetchone()
+    conn.commit()
+
+    assert conn.execute(SQLITE_INTERSECTION_STATS).fetchall() == per_intersection(conn)
+    assert verify_sqlite_stats(conn)['consistent']
+
+
+def test_last_reading_of_an_intersection_removes_it():
+    conn = connect()
+    row = insert(conn, 'A', 5)
+    insert(conn, 'B', 7)
+    conn.execute(SQLITE_DELETE_TRAFFIC, (row,))
+
+    assert conn.execute(SQLITE_STATS_SUMMARY).fetchone() == (1, 7, 1)
+    assert conn.execute(SQLITE_INTERSECTION_STATS).fetchall() == [('B', 1, 7)]
+
+
+def test_existing_rows_are_counted_when_the_stats_migration_runs():
+    conn = sqlite3.connect(':memory:')
+    migrate_sqlite(conn, SQLITE_MIGRATIONS[:2])
+    for count in (3, 4, 5):
+        insert(conn, 'A', count)
+    conn.commit()
+
+    migrate_sqlite(conn)
+    assert conn.execute(SQLITE_STATS_SUMMARY).fetchone() == (3, 12, 1)
+
+
+def test_drift_is_reported_and_repaired():
+    conn = connect()
+    insert(conn, 'A', 5)
+    conn.execute('UPDATE traffic_stats SET vehicle_sum = 999')
+    conn.commit()
+
+    result = verify_sqlite_stats(conn)
+    assert not result['consistent']
+    assert result['drift'] == {'vehicle_sum': {'summary': 999, 'actual': 5}}
+
+    rebuild_sqlite_stats(conn)
+    assert verify_sqlite_stats(conn)['consistent']
@@ -1,9 +1,20 @@
 # traffic_optimizer/views.py - Add this function
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '01_core_engine'))
+
+from signal_plan import MAX_PRESSURE, WEBSTER, SignalPlanSolver
+
+# Webster cycle/splits with PCU weights (motorcycle=1.0, car=2.0, tuktuk=1.5, bus=3.0)
+signal_solver = SignalPlanSolver(min_green=15, max_green=60)
+
 @api_view(['POST'])
 def optimize_traffic_signal(request):
     """
     Calculate optimal green time based on vehicle counts
     Expected input: {"lane_data": [{"lane_id": 1, "vehicles": {"car": 2, "motorcycle": 5, "tuktuk": 1}}, ...]}
+    Optional: "mode": "webster" (default) or "max_pressure", "cycle_length" (max_pressure only)
     """
     try:
         data = request.data
@@ -12,53 +23,50 @@ def optimize_traffic_signal(request):
         if not lane_data:
             return Response({"error": "No lane data provided"}, status=400)
         
-        # Calculate total vehicles per lane
+        # Each lane is served by its own phase; flows are PCU-weighted
+        mode = data.get('mode', WEBSTER)
+        if mode not in (WEBSTER, MAX_PRESSURE):
+            return Response({"error": f"Unknown mode {mode!r}; use {WEBSTER!r} or {MAX_PRESSURE!r}"}, status=400)
         lane_totals = []
         for lane in lane_data:
-            lane_id = lane.get('lane_id')
             vehicles = lane.get('vehicles', {})
-            total = sum(vehicles.values())
             lane_totals.append({
-                "lane_id": lane_id,
-                "total_vehicles": total,
+                "lane_id": lane.get('lane_id'),
+                "total_vehicles": sum(vehicles.values()),
                 "vehicle_breakdown": vehicles
             })
         
-        # Simple optimization algorithm (you can improve this)
-        total_all_lanes = sum(item['total_vehicles'] for item in lane_totals)
-        
-        if total_all_lanes == 0:
-            # No traffic - use minimum green time
-            green_times = [{"lane_id": item['lane_id'], "green_time": 15} for item in lane_totals]
-        else:
-            # Proportional allocation with minimum 15s and maximum 60s
-            green_times = []
-            for item in lane_totals:
-                proportion = item['total_vehicles'] / total_all_lanes
-                green_time = max(15, min(60, int(proportion * 120)))  # 120s cycle
-                green_times.append({
-                    "lane_id": item['lane_id'],
-                    "green_time": green_time,
-                    "allocation_percentage": round(proportion * 100, 1)
-                })
+        plan = signal_solver.solve_phases(
+            [item['vehicle_breakdown'] for item in lane_totals],
+            mode=mode,
+            cycle_length=data.get('cycle_length', 120)
+        )
+        total_green = sum(plan['green'])
         
-        # Prioritize lanes with more motorcycles (Cambodia-specific)
-        for i, item in enumerate(lane_totals):
-            motorcycles = item['vehicle_breakdown'].get('motorcycle', 0)
-            if motorcycles > 5:  # If many motorcycles, add bonus time
-                green_times[i]['green_time'] = min(70, green_times[i]['green_time'] + 10)
-                green_times[i]['motorcycle_bonus'] = True
+        green_times = []
+        for item, green_time, pcu in zip(lane_totals, plan['green'], plan['pcu']):
+            green_times.append({
+                "lane_id": item['lane_id'],
+                "green_time": green_time,
+                "pcu": round(pcu, 1),
+                "allocation_percentage": round(green_time / total_green * 100, 1) if total_green else 0
+            })
+        total_all_lanes = sum(item['total_vehicles'] for item in lane_totals)
         
         return Response({
             "success": True,
             "message": "Traffic signal optimization calculated",
-            "cycle_duration": 120,  # 2-minute cycle
-            "optimization_method": "proportional_with_motorcycle_priority",
+            "cycle_duration": plan['cycle'],  # greens + lost time, always consistent
+            "optimization_method": mode,
             "green_times": green_times,
+            "next_phase_lane_id": lane_totals[plan['next_phase']]['lane_id'],
+            "degree_of_saturation": round(plan['degree_of_saturation'], 2),
+            "oversaturated": plan['oversaturated'],
             "summary": {
                 "total_vehicles": total_all_lanes,
+                "total_pcu": round(sum(plan['pcu']), 1),
                 "lanes_optimized": len(lane_totals),
-                "average_green_time": sum(g['green_time'] for g in green_times) / len(green_times)
+                "average_green_time": total_green / len(green_times)
             }
         })
         
@@ -6,6 +6,12 @@ import time
 import os
 import json
 from datetime import datetime
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '02_ai_vision', 'vision_engine'))
+
+from postprocess import boxes_of, extract_detections
+from tracker import MultiObjectTracker
 
 print("🚗 YOUTUBE VEHICLE TRACKER")
 print("==============================")
@@ -47,7 +53,7 @@ class VehicleTracker:
         
         # Tracking data
         self.tracked_vehicles = {}  # vehicle_id -> {'type': type, 'history': [], 'frames_seen': 0}
-        self.next_vehicle_id = 0
+        self.tracker = MultiObjectTracker(max_distance=50, max_age=30, remove_after=30, class_gating=False)
         self.vehicle_counts = []  # vehicles per frame
         
         # Statistics
@@ -121,43 +127,20 @@ class VehicleTracker:
         
         return True
     
-    def match_vehicle(self, x, y, w, h):
-        """Match new detection with existing tracked vehicles"""
-        center_x = x + w // 2
-        center_y = y + h // 2
-        
-        for vehicle_id, vehicle_data in self.tracked_vehicles.items():
-            if not vehicle_data['history']:
-                continue
-                
-            # Get last known position
-            last_x, last_y = vehicle_data['history'][-1]
-            
-            # Calculate distance
-            distance = np.sqrt((center_x - last_x)**2 + (center_y - last_y)**2)
-            
-            # If close enough, it's probably the same vehicle
-            if distance < 50:  # Threshold in pixels
-                return vehicle_id
-        
-        return None
-    
     def update_tracker(self, detections):
         """Update vehicle tracker with new detections"""
         current_frame_vehicles = 0
         matched_ids = []
         
-        for detection in detections:
+        # Match all detections to existing vehicles in one vectorized step (50 px gate)
+        boxes = np.array([(x, y, x + w, y + h) for x, y, w, h, _, _ in detections]).reshape(-1, 4)
+        vehicle_ids = self.tracker.update(boxes, [d[5] for d in detections], self.frame_count)
+        
+        for vehicle_id, detection in zip(vehicle_ids.tolist(), detections):
             x, y, w, h, confidence, vehicle_type = detection
             
-            # Try to match with existing vehicle
-            vehicle_id = self.match_vehicle(x, y, w, h)
-            
-            if vehicle_id is None:
+            if vehicle_id not in self.tracked_vehicles:
                 # New vehicle
-                vehicle_id = self.next_vehicle_id
-                self.next_vehicle_id += 1
-                
                 self.tracked_vehicles[vehicle_id] = {
                     'type': vehicle_type,
                     'history': [],
@@ -180,15 +163,9 @@ class VehicleTracker:
             matched_ids.append((vehicle_id, detection))
             current_frame_vehicles += 1
         
-        # Remove vehicles not seen in last 30 frames
-        to_remove = []
-        for vehicle_id, vehicle_data in self.tracked_vehicles.items():
-            if vehicle_id not in [vid for vid, _ in matched_ids]:
-                if self.frame_count - vehicle_data['first_seen'] - vehicle_data['frames_seen'] > 30:
-                    to_remove.append(vehicle_id)
-        
-        for vehicle_id in to_remove:
-            del self.tracked_vehicles[vehicle_id]
+        # Remove vehicles the tracker dropped (not seen in last 30 frames)
+        for vehicle_id in self.tracker.removed_ids.tolist():
+            self.tracked_vehicles.pop(vehicle_id, None)
         
         self.vehicle_counts.append(current_frame_vehicles)
         
@@ -208,29 +185,16 @@ class VehicleTracker:
         
         detections = []
         
-        # Parse detections
+        # Parse detections, scaling coordinates back to display size
+        scale = (display_width / 640, display_height / 480)
         for result in results:
-            if result.boxes is not None:
-                for box in result.boxes:
-                    cls = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    
-                    if cls in VEHICLE_CLASSES:
-                        # Get bounding box
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        
-                        # Scale coordinates back to display size
-                        scale_x = display_width / 640
-                        scale_y = display_height / 480
-                        
-                        x1, x2 = int(x1 * scale_x), int(x2 * scale_x)
-                        y1, y2 = int(y1 * scale_y), int(y2 * scale_y)
-                        
-                        width = x2 - x1
-                        height = y2 - y1
-                        vehicle_type = VEHICLE_CLASSES[cls]
-                        
-                        detections.append((x1, y1, width, height, confidence, vehicle_type))
+            dets = extract_detections(result, class_ids=list(VEHICLE_CLASSES), scale=scale)
+            boxes = boxes_of(dets).astype(int)
+            boxes[:, 2:] -= boxes[:, :2]  # xyxy -> xywh
+            
+            for (x1, y1, width, height), confidence, cls in zip(
+                    boxes.tolist(), dets['conf'].tolist(), dets['cls'].tolist()):
+                detections.append((x1, y1, width, height, confidence, VEHICLE_CLASSES[cls]))
         
         # Update tracker
         tracked_vehicles, vehicle_count = self.update_tracker(detections)
@@ -283,7 +247,7 @@ class VehicleTracker:
         y_offset += 30
         
         # Total unique vehicles
-        cv2.putText(frame, f"Total Unique: {self.next_vehicle_id}", (20, y_offset), 
+        cv2.putText(frame, f"Total Unique: {self.tracker.next_id}", (20, y_offset), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
         y_offset += 30
         
@@ -409,7 +373,7 @@ class VehicleTracker:
         
         print(f"📈 Statistics:")
         print(f"   Total Frames Processed: {self.frame_count}")
-        print(f"   Total Unique Vehicles Tracked: {self.next_vehicle_id}")
+        print(f"   Total Unique Vehicles Tracked: {self.tracker.next_id}")
         print(f"   Max Vehicles in Frame: {max(self.vehicle_counts) if self.vehicle_counts else 0}")
         print(f"   Avg Vehicles per Frame: {np.mean(self.vehicle_counts):.1f}")
         print(f"   Video Duration: {video_duration:.1f} seconds")
@@ -431,7 +395,7 @@ class VehicleTracker:
         report_data = {
             'youtube_url': self.youtube_url,
             'total_frames': int(self.frame_count),
-            'unique_vehicles': int(self.next_vehicle_id),
+            'unique_vehicles': int(self.tracker.next_id),
             'max_vehicles_per_frame': int(max(self.vehicle_counts) if self.vehicle_counts else 0),
             'avg_vehicles_per_frame': float(np.mean(self.vehicle_counts)),
             'processing_time': float(total_time),
@@ -8,6 +8,12 @@ import json
 from datetime import datetime
 import matplotlib.pyplot as plt
 from collections import Counter
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '02_ai_vision', 'vision_engine'))
+
+from postprocess import boxes_of, extract_detections
+from tracker import MultiObjectTracker
 
 print("🚗 YOUTUBE TRAFFIC ANALYZER")
 print("================================")
@@ -61,7 +67,7 @@ class TrafficAnalyzer:
         
         # Tracking system
         self.tracked_objects = {}
-        self.next_id = 0
+        self.tracker = MultiObjectTracker(max_distance=50, max_age=30, remove_after=60)
         self.frame_history = []
         
         # Traffic statistics
@@ -211,43 +217,37 @@ class TrafficAnalyzer:
         # Run YOLO detection
         results = model(process_frame, conf=0.25, iou=0.5, verbose=False)
         
+        # Scale to original frame size
+        scale = (frame.shape[1] / processing_width, frame.shape[0] / processing_height)
+        
         detections = []
         
         for result in results:
-            if result.boxes is not None:
-                for box in result.boxes:
-                    cls_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    
-                    if cls_id in VEHICLE_CLASSES:
-                        # Get bounding box
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        
-                        # Scale to original frame size
-                        scale_x = frame.shape[1] / processing_width
-                        scale_y = frame.shape[0] / processing_height
-                        
-                        x1, x2 = int(x1 * scale_x), int(x2 * scale_x)
-                        y1, y2 = int(y1 * scale_y), int(y2 * scale_y)
-                        
-                        width = x2 - x1
-                        height = y2 - y1
-                        
-                        # Calculate center
-                        center_x = x1 + width // 2
-                        center_y = y1 + height // 2
-                        
-                        object_type = VEHICLE_CLASSES[cls_id]
-                        color = VEHICLE_COLORS.get(object_type, VEHICLE_COLORS['default'])
-                        
-                        detections.append({
-                            'bbox': (x1, y1, width, height),
-                            'center': (center_x, center_y),
-                            'type': object_type,
-                            'confidence': confidence,
-                            'color': color,
-                            'zone': self.get_zone(center_y)
-                        })
+            # Class filtering and rescaling as whole-array operations
+            dets = extract_detections(result, class_ids=list(VEHICLE_CLASSES), scale=scale)
+            boxes = boxes_of(dets).astype(int)
+            widths = boxes[:, 2] - boxes[:, 0]
+            heights = boxes[:, 3] - boxes[:, 1]
+            
+            # Calculate centers
+            centers_x = boxes[:, 0] + widths // 2
+            centers_y = boxes[:, 1] + heights // 2
+            zones = self.get_zones(centers_y)
+            
+            for cls_id, confidence, x1, y1, width, height, center_x, center_y, zone in zip(
+                    dets['cls'].tolist(), dets['conf'].tolist(), boxes[:, 0].tolist(), boxes[:, 1].tolist(),
+                    widths.tolist(), heights.tolist(), centers_x.tolist(), centers_y.tolist(), zones.tolist()):
+                object_type = VEHICLE_CLASSES[cls_id]
+                color = VEHICLE_COLORS.get(object_type, VEHICLE_COLORS['default'])
+                
+                detections.append({
+                    'bbox': (x1, y1, width, height),
+                    'center': (center_x, center_y),
+                    'type': object_type,
+                    'confidence': confidence,
+                    'color': color,
+                    'zone': zone
+                })
         
         return detections
     
@@ -262,38 +262,24 @@ class TrafficAnalyzer:
         else:
             return 2  # Exit zone
     
+    def get_zones(self, ys):
+        """Vectorized get_zone for an array of y coordinates"""
+        zone_height = max(self.height // 3, 1)
+        return np.clip(np.asarray(ys) // zone_height, 0, 2)
+    
     def track_objects(self, detections, frame_num):
         """Track objects across frames"""
         current_ids = []
         
-        if not hasattr(self, 'max_distance'):
-            self.max_distance = 50  # pixels
+        # Vectorized association: same type, within 50 px, seen in the last 30 frames
+        boxes = np.array([(x, y, x + w, y + h) for x, y, w, h in (d['bbox'] for d in detections)]).reshape(-1, 4)
+        track_ids = self.tracker.update(boxes, [d['type'] for d in detections], frame_num)
         
-        for detection in detections:
+        for obj_id, detection in zip(track_ids.tolist(), detections):
             center_x, center_y = detection['center']
             
-            # Find matching existing track
-            matched_id = None
-            min_distance = float('inf')
-            
-            for obj_id, obj_data in self.tracked_objects.items():
-                if obj_data['last_seen'] < frame_num - 30:  # Skip stale tracks
-                    continue
-                
-                # Calculate distance to last known position
-                last_x, last_y = obj_data['positions'][-1]
-                distance = np.sqrt((center_x - last_x)**2 + (center_y - last_y)**2)
-                
-                # Same type and close enough
-                if (obj_data['type'] == detection['type'] and 
-                    distance < self.max_distance and 
-                    distance < min_distance):
-                    min_distance = distance
-                    matched_id = obj_id
-            
-            if matched_id is not None:
+            if obj_id in self.tracked_objects:
                 # Update existing track
-                obj_id = matched_id
                 self.tracked_objects[obj_id]['positions'].append((center_x, center_y))
                 self.tracked_objects[obj_id]['last_seen'] = frame_num
                 self.tracked_objects[obj_id]['frames'] += 1
@@ -303,9 +289,6 @@ class TrafficAnalyzer:
                     self.update_speed_estimate(obj_id)
             else:
                 # Create new track
-                obj_id = self.next_id
-                self.next_id += 1
-                
                 self.tracked_objects[obj_id] = {
                     'type': detection['type'],
                     'positions': [(center_x, center_y)],
@@ -423,7 +406,7 @@ class TrafficAnalyzer:
         y_offset += 25
         
         # Total unique objects
-        cv2.putText(overlay, f"Total Unique: {self.next_id}", (20, y_offset),
+        cv2.putText(overlay, f"Total Unique: {self.tracker.next_id}", (20, y_offset),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
         y_offset += 25
         
@@ -572,7 +555,7 @@ class TrafficAnalyzer:
     def reset_tracking(self):
         """Reset tracking data"""
         self.tracked_objects.clear()
-        self.next_id = 0
+        self.tracker = MultiObjectTracker(max_distance=50, max_age=30, remove_after=60)
         print("🔄 Tracking data cleared")
     
     def generate_traffic_report(self):
@@ -585,7 +568,7 @@ class TrafficAnalyzer:
         
         print(f"\n📈 SUMMARY STATISTICS")
         print(f"   Total Frames Processed: {self.frame_count:,}")
-        print(f"   Unique Objects Tracked: {self.next_id:,}")
+        print(f"   Unique Objects Tracked: {self.tracker.next_id:,}")
         print(f"   Peak Traffic Density: {max(self.vehicle_counts_per_frame) if self.vehicle_counts_per_frame else 0}")
         print(f"   Average Objects per Frame: {np.mean(self.vehicle_counts_per_frame):.1f}")
         print(f"   Video Duration: {video_duration:.1f} seconds")
@@ -622,7 +605,7 @@ class TrafficAnalyzer:
             'video_duration': video_duration,
             'analysis_duration': total_time,
             'frames_processed': self.frame_count,
-            'unique_objects': self.next_id,
+            'unique_objects': self.tracker.next_id,
             'peak_density': int(max(self.vehicle_counts_per_frame)) if self.vehicle_counts_per_frame else 0,
             'avg_density': float(np.mean(self.vehicle_counts_per_frame)),
             'object_distribution': dict(type_counts),